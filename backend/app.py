@@ -6,14 +6,35 @@ import jwt
 import datetime
 from functools import wraps
 import uuid
+import time
 from werkzeug.security import generate_password_hash, check_password_hash
 import logging
 from dotenv import load_dotenv
 import requests
 import re
+from write_queue import GroupCommitQueue
+from idempotency import IdempotencyStore, idempotent
+from schemas import REGISTER_SCHEMA, LOGIN_SCHEMA, MESSAGE_SCHEMA, CHAT_SCHEMA, post_schema
+from query_hooks import instrument_client
+from metrics import AppMetrics, MetricsRegistry
+from query_trace import QueryTracer, query_budget
+from profiling import RequestProfiler
+from health import HealthProber
+from structured_logging import configure_logging
+from response_cache import ResponseCache, cached_response
+from singleflight import SingleFlight
+from conditional import conditional_response, ordered_rows_etag, rows_etag
+from compression import Compressor
+from records import FastJSONProvider, post_null_columns
+from list_formats import list_response, representation, representation_etag, requested_layout
+from projection import (POST_FIELDS, POST_REQUIRED, MESSAGE_FIELDS, MESSAGE_REQUIRED, PROFILE_FIELDS,
+                        PROFILE_REQUIRED, requested_fields, select_list)
+from geo import cell_count, covering_cells, location_columns, parse_area
+from delta_feed import Watermark, parse_watermark, parse_timestamp, format_watermark, next_position, next_deleted_since
 
 # ------------------ Configure logging first ------------------
-logging.basicConfig(level=logging.INFO)
+# Queued JSON lines with request ids; see structured_logging.py for LOG_* settings
+log_pipeline = configure_logging()
 logger = logging.getLogger(__name__)
 
 # ------------------ Load environment variables from .env ------------------
@@ -38,6 +59,11 @@ logger.info(f"GOOGLE_CLIENT_SECRET: {'SET' if GOOGLE_CLIENT_SECRET else 'NOT SET
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production')
+# orjson-backed jsonify (stdlib fallback); FAST_JSON=false keeps Flask's default provider
+if os.environ.get('FAST_JSON', 'true').lower() in ('1', 'true', 'yes'):
+    app.json = FastJSONProvider(app)
+    logger.info(f"JSON encoder: {'orjson' if FastJSONProvider.enabled else 'stdlib'}")
+log_pipeline.init_app(app)
 
 # Initialize CORS
 CORS(app, supports_credentials=True, origins=[
@@ -54,17 +80,37 @@ SUPABASE_URL = os.environ.get('SUPABASE_URL')
 SUPABASE_KEY = os.environ.get('SUPABASE_SERVICE_KEY')  # Use service role key for server-side
 SUPABASE_ANON_KEY = os.environ.get('SUPABASE_ANON_KEY')  # optional, for frontend simulation
 
+# Offline stand-in (fake_supabase.py) for benchmarks and load tests without a project
+SUPABASE_FAKE = os.environ.get('SUPABASE_FAKE', 'false').lower() in ('1', 'true', 'yes')
+
 # Validate environment variables
-if not SUPABASE_URL or not SUPABASE_KEY:
+if not SUPABASE_FAKE and (not SUPABASE_URL or not SUPABASE_KEY):
     raise ValueError("SUPABASE_URL or SUPABASE_SERVICE_KEY not set in .env")
 
 # Initialize Supabase client
-try:
-    supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-    logger.info("Supabase client initialized successfully")
-except Exception as e:
-    logger.error(f"Failed to initialize Supabase client: {e}")
-    supabase = None
+if SUPABASE_FAKE:
+    from fake_supabase import FakeSupabase
+    fake_client = FakeSupabase(
+        latency_ms=float(os.environ.get('SUPABASE_FAKE_LATENCY_MS', 0)),
+        jitter_ms=float(os.environ.get('SUPABASE_FAKE_JITTER_MS', 0)),
+        seed=int(os.environ.get('SUPABASE_FAKE_SEED', 0)),
+        max_connections=int(os.environ.get('SUPABASE_FAKE_MAX_CONNECTIONS', 0))
+    )
+    logger.warning("Using the in-process fake Supabase client (SUPABASE_FAKE); data is not persisted")
+    if os.environ.get('SUPABASE_FAKE_DATASET'):
+        # Synthetic marketplace from insert_sample_data.py ("tiny", "small", "medium" or "large")
+        from insert_sample_data import load_into_fake
+        loaded = load_into_fake(fake_client, os.environ['SUPABASE_FAKE_DATASET'],
+                                seed=int(os.environ.get('SUPABASE_FAKE_SEED', 0)))
+        logger.warning(f"Loaded synthetic dataset into the fake client: {loaded}")
+    supabase = instrument_client(fake_client)
+else:
+    try:
+        supabase: Client = instrument_client(create_client(SUPABASE_URL, SUPABASE_KEY))
+        logger.info("Supabase client initialized successfully")
+    except Exception as e:
+        logger.error(f"Failed to initialize Supabase client: {e}")
+        supabase = None
 
 # Database table names
 TABLES = {
@@ -72,9 +118,118 @@ TABLES = {
     'posts': 'marketplace_posts',
     'chats': 'user_chats',
     'messages': 'chat_messages',
-    'profiles': 'user_profiles'
+    'profiles': 'user_profiles',
+    'post_deletions': 'marketplace_post_deletions'
 }
 
+# Optional group-commit queue for chat message inserts
+MESSAGE_WRITE_QUEUE_ENABLED = os.environ.get('MESSAGE_WRITE_QUEUE', 'false').lower() in ('1', 'true', 'yes')
+MESSAGE_WRITE_QUEUE_MAX_BATCH = int(os.environ.get('MESSAGE_WRITE_QUEUE_MAX_BATCH', 50))
+MESSAGE_WRITE_QUEUE_MAX_LATENCY_MS = float(os.environ.get('MESSAGE_WRITE_QUEUE_MAX_LATENCY_MS', 5))
+MESSAGE_WRITE_QUEUE_FLUSH_WORKERS = int(os.environ.get('MESSAGE_WRITE_QUEUE_FLUSH_WORKERS', 2))
+
+message_write_queue = None
+if MESSAGE_WRITE_QUEUE_ENABLED and supabase:
+    message_write_queue = GroupCommitQueue(
+        supabase,
+        TABLES['messages'],
+        max_batch=MESSAGE_WRITE_QUEUE_MAX_BATCH,
+        max_latency_ms=MESSAGE_WRITE_QUEUE_MAX_LATENCY_MS,
+        flush_workers=MESSAGE_WRITE_QUEUE_FLUSH_WORKERS
+    )
+    logger.info(f"Message write queue enabled (batch={MESSAGE_WRITE_QUEUE_MAX_BATCH}, latency={MESSAGE_WRITE_QUEUE_MAX_LATENCY_MS}ms)")
+
+# Completed responses for retried POSTs carrying an Idempotency-Key header
+idempotency_store = IdempotencyStore(
+    ttl_seconds=float(os.environ.get('IDEMPOTENCY_TTL_SECONDS', 24 * 3600)),
+    max_entries=int(os.environ.get('IDEMPOTENCY_MAX_ENTRIES', 10000))
+)
+
+# Prometheus-style /metrics; set METRICS_MULTIPROC_DIR to aggregate across gunicorn workers
+app_metrics = AppMetrics(MetricsRegistry(
+    multiproc_dir=os.environ.get('METRICS_MULTIPROC_DIR'),
+    flush_interval=float(os.environ.get('METRICS_FLUSH_INTERVAL', 1.0))
+))
+app_metrics.init_app(app, token=os.environ.get('METRICS_TOKEN'))
+if supabase:
+    supabase.add_observer(app_metrics.observe_query)
+
+# Per-request query traces: Server-Timing header, optional debug JSON, @query_budget warnings
+query_tracer = QueryTracer(
+    server_timing=os.environ.get('SERVER_TIMING', 'true').lower() in ('1', 'true', 'yes'),
+    debug=os.environ.get('QUERY_TRACE_DEBUG', 'false').lower() in ('1', 'true', 'yes')
+)
+query_tracer.init_app(app, supabase)
+
+# On-demand sampling profiler for single requests; disabled unless PROFILE_TOKEN is set
+request_profiler = RequestProfiler(
+    token=os.environ.get('PROFILE_TOKEN'),
+    profile_dir=os.environ.get('PROFILE_DIR'),
+    interval_ms=float(os.environ.get('PROFILE_INTERVAL_MS', 1.0)),
+    max_seconds=float(os.environ.get('PROFILE_MAX_SECONDS', 30))
+)
+request_profiler.init_app(app)
+
+# gzip/brotli for text and JSON responses; COMPRESSION=false leaves it to a reverse proxy
+compressor = None
+if os.environ.get('COMPRESSION', 'true').lower() in ('1', 'true', 'yes'):
+    compressor = Compressor(
+        min_size=int(os.environ.get('COMPRESSION_MIN_BYTES', 1024)),
+        gzip_level=int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6)),
+        brotli_level=int(os.environ.get('COMPRESSION_BROTLI_LEVEL', 5))
+    )
+    compressor.init_app(app)
+    compressor.add_observer(app_metrics.observe_compression)
+
+# Rendered GET /api/posts responses; post writes invalidate, POSTS_CACHE_TTL_SECONDS=0 disables
+POSTS_CACHE_TTL_SECONDS = float(os.environ.get('POSTS_CACHE_TTL_SECONDS', 10))
+posts_cache = None
+if POSTS_CACHE_TTL_SECONDS > 0:
+    posts_cache = ResponseCache(
+        'posts',
+        ttl_seconds=POSTS_CACHE_TTL_SECONDS,
+        max_entries=int(os.environ.get('POSTS_CACHE_MAX_ENTRIES', 1000)),
+        max_bytes=int(os.environ.get('POSTS_CACHE_MAX_MB', 64)) * 1024 * 1024
+    )
+    posts_cache.add_observer(app_metrics.observe_cache)
+
+def posts_filters():
+    """Filters of GET /api/posts; ilike filters are case-insensitive, so they are lowercased"""
+    args = request.args
+    return (args.get('user_type') or '', (args.get('location') or '').lower(),
+            (args.get('search') or '').lower(), args.get('author_id') or '')
+
+def posts_projection():
+    """Validated ``?fields=`` of GET /api/posts (raises ValueError)"""
+    return requested_fields(POST_FIELDS, POST_REQUIRED)
+
+def posts_cache_key():
+    try:
+        fields = posts_projection()
+    except ValueError:
+        # The view answers 400, which is not cached
+        fields = request.args.get('fields')
+    return posts_filters() + (fields,) + representation()
+
+# Concurrent identical reads share one Supabase query; SINGLEFLIGHT=false turns this off
+read_flights = None
+if os.environ.get('SINGLEFLIGHT', 'true').lower() in ('1', 'true', 'yes'):
+    read_flights = SingleFlight('reads', wait_timeout=float(os.environ.get('SINGLEFLIGHT_WAIT_TIMEOUT', 10)))
+    read_flights.add_observer(app_metrics.observe_singleflight)
+
+def shared_read(key, query):
+    """``query.execute()``, run once for all concurrent callers with the same key"""
+    if read_flights is None:
+        return query.execute()
+    return read_flights.do(key, query.execute)
+
+def invalidate_posts_cache():
+    if posts_cache is not None:
+        posts_cache.invalidate()
+    if read_flights is not None:
+        # Readers arriving after the write must not join a query that started before it
+        read_flights.forget()
+
 # JWT configuration
 JWT_SECRET = os.environ.get('JWT_SECRET', 'your-jwt-secret-change-in-production')
 JWT_ALGORITHM = 'HS256'
@@ -221,13 +376,14 @@ def require_auth(f):
 # ------------------ Authentication Routes ------------------
 
 @app.route('/api/auth/register', methods=['POST'])
+@query_budget(3)
+@idempotent(idempotency_store)
 def register():
     try:
         data = request.get_json()
-        required_fields = ['username', 'email', 'password', 'user_type', 'contact']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({'error': f'Missing required field: {field}'}), 400
+        validation_error = REGISTER_SCHEMA.first_error(data)
+        if validation_error:
+            return jsonify(validation_error), 400
         
         existing_user = supabase.table(TABLES['users']).select('id').eq('email', data['email']).execute()
         if existing_user.data:
@@ -284,11 +440,13 @@ def register():
         return jsonify({'error': 'Internal server error'}), 500
 
 @app.route('/api/auth/login', methods=['POST'])
+@query_budget(1)
 def login():
     try:
         data = request.get_json()
-        if not data.get('email') or not data.get('password'):
-            return jsonify({'error': 'Email and password are required'}), 400
+        validation_error = LOGIN_SCHEMA.first_error(data)
+        if validation_error:
+            return jsonify(validation_error), 400
         
         result = supabase.table(TABLES['users']).select('*').eq('email', data['email']).execute()
         if not result.data:
@@ -318,6 +476,7 @@ def login():
 # ------------------ User Info Route ------------------
 
 @app.route('/api/users/<user_id>', methods=['GET'])
+@query_budget(1)
 @require_auth
 def get_user_info(user_id):
     """Get user information by ID"""
@@ -347,11 +506,13 @@ def get_user_info(user_id):
 
 # Public minimal user info (safe fields only)
 @app.route('/api/users/<user_id>/public', methods=['GET'])
+@query_budget(1)
 def get_user_public(user_id):
     """Return non-sensitive info for displaying on post cards (no auth required)."""
     try:
         # Limit fields to safe subset
-        result = supabase.table(TABLES['users']).select('id, name, user_type').eq('id', user_id).limit(1).execute()
+        result = shared_read(('user_public', user_id),
+                             supabase.table(TABLES['users']).select('id, name, user_type').eq('id', user_id).limit(1))
         if result.data:
             user = result.data[0]
             return jsonify({'id': user['id'], 'name': user.get('name', 'User'), 'user_type': user.get('user_type', '')}), 200
@@ -364,6 +525,7 @@ def get_user_public(user_id):
 # ------------------ Google OAuth Routes ------------------
 
 @app.route('/api/auth/google/url', methods=['POST'])
+@query_budget(0)
 def get_google_auth_url_route():
     """Get Google OAuth authorization URL"""
     try:
@@ -384,6 +546,7 @@ def get_google_auth_url_route():
         return jsonify({'error': 'Internal server error'}), 500
 
 @app.route('/api/auth/google/callback', methods=['GET'])
+@query_budget(2)
 def google_oauth_callback():
     """Handle Google OAuth callback"""
     try:
@@ -434,15 +597,25 @@ def google_oauth_callback():
 
 # ------------------ Marketplace Routes ------------------
 
+def posts_search_filter(search: str) -> str:
+    return f"crop_name.ilike.%{search}%,crop_details.ilike.%{search}%,requirements.ilike.%{search}%,organization.ilike.%{search}%"
+
 @app.route('/api/posts', methods=['GET'])
+@query_budget(1)
+@cached_response(posts_cache, posts_cache_key)
 def get_posts():
     try:
+        try:
+            requested_layout()
+            fields = posts_projection()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         user_type = request.args.get('user_type')
         location = request.args.get('location')
         search = request.args.get('search')
         author_id = request.args.get('author_id')
         
-        query = supabase.table(TABLES['posts']).select('*').order('created_at', desc=True)
+        query = supabase.table(TABLES['posts']).select(select_list(fields)).order('created_at', desc=True)
         
         if user_type:
             query = query.eq('user_type', user_type)
@@ -451,27 +624,203 @@ def get_posts():
         if location:
             query = query.ilike('location', f'%{location}%')
         if search:
-            query = query.or_(f"crop_name.ilike.%{search}%,crop_details.ilike.%{search}%,requirements.ilike.%{search}%,organization.ilike.%{search}%")
+            query = query.or_(posts_search_filter(search))
         
-        result = query.execute()
-        return jsonify({'posts': result.data, 'count': len(result.data)}), 200
+        result = shared_read(('posts',) + posts_filters() + (fields,), query)
+        posts = result.data
+        return conditional_response(representation_etag(rows_etag(posts)),
+                                    lambda: list_response({'posts': posts, 'count': len(posts)}, 'posts',
+                                                          post_null_columns))
         
     except Exception as e:
         logger.error(f"Get posts error: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+# Delta feed: GET /api/posts/changes?since=<watermark>
+POST_CHANGES_MAX_LIMIT = 1000
+POST_CHANGES_LAG_SECONDS = float(os.environ.get('POST_CHANGES_LAG_SECONDS', 5))
+POST_TOMBSTONE_RETENTION_DAYS = float(os.environ.get('POST_TOMBSTONE_RETENTION_DAYS', 30))
+_last_tombstone_prune = 0.0
+
+def post_changes_query(since, limit, user_type=None, author_id=None):
+    """Posts after ``since`` (at or after it for a bare timestamp) in (updated_at, id) order"""
+    # One order= parameter: PostgREST uses only one of several, which would lose the id tiebreak
+    query = supabase.table(TABLES['posts']).select('*').order('updated_at,id').limit(limit)
+    if since is not None:
+        ts, row_id = since.position
+        if row_id:
+            # The plain gte lets the updated_at index bound the scan; the OR resumes exactly after the last row
+            query = query.gte('updated_at', ts).or_(f'updated_at.gt.{ts},and(updated_at.eq.{ts},id.gt.{row_id})')
+        else:
+            # A bare timestamp (caught up) resumes at it inclusively; '' is not a UUID to compare ids with
+            query = query.gte('updated_at', ts)
+    if user_type:
+        query = query.eq('user_type', user_type)
+    if author_id:
+        query = query.eq('author_id', author_id)
+    return query
+
+@app.route('/api/posts/changes', methods=['GET'])
+@query_budget(2)
+def get_post_changes():
+    """Posts created or updated after ``since``, plus ids of posts deleted since then.
+
+    Without ``since`` this is a full sync, paged like any other call. Keep
+    calling with the returned ``watermark`` until ``has_more`` is false.
+    ``reset: true`` means the watermark is older than the deletions log (or
+    too many posts were deleted since), so the client must drop its copy
+    and start over without ``since``.
+    """
+    try:
+        try:
+            since = parse_watermark(request.args.get('since'))
+            limit = min(max(int(request.args.get('limit', 500)), 1), POST_CHANGES_MAX_LIMIT)
+            requested_layout()
+        except ValueError:
+            return jsonify({'error': 'Invalid since, limit or format'}), 400
+        user_type = request.args.get('user_type')
+        author_id = request.args.get('author_id')
+
+        now = datetime.datetime.utcnow()
+        horizon = now - datetime.timedelta(days=POST_TOMBSTONE_RETENTION_DAYS)
+        if since is not None and parse_timestamp(since.deleted_since) < horizon:
+            return jsonify({'posts': [], 'deleted': [], 'watermark': None, 'has_more': False, 'reset': True}), 200
+        # A full sync only needs the deletions that happen from now on (less the lag, see delta_feed)
+        if since is not None:
+            deleted_since = since.deleted_since
+        else:
+            deleted_since = (now - datetime.timedelta(seconds=POST_CHANGES_LAG_SECONDS)).isoformat()
+
+        posts = post_changes_query(since, limit + 1, user_type, author_id).execute().data or []
+        has_more = len(posts) > limit
+        posts = posts[:limit]
+
+        deleted = []
+        if since is not None:
+            deletions = supabase.table(TABLES['post_deletions']).select('post_id, deleted_at') \
+                .gt('deleted_at', deleted_since).order('deleted_at').limit(POST_CHANGES_MAX_LIMIT + 1)
+            if user_type:
+                deletions = deletions.eq('user_type', user_type)
+            if author_id:
+                deletions = deletions.eq('author_id', author_id)
+            deleted = [{'id': d['post_id'], 'deleted_at': d['deleted_at']} for d in deletions.execute().data or []]
+            if len(deleted) > POST_CHANGES_MAX_LIMIT:
+                return jsonify({'posts': [], 'deleted': [], 'watermark': None, 'has_more': False, 'reset': True}), 200
+
+        last_row = (posts[-1]['updated_at'], posts[-1]['id']) if posts else None
+        position = next_position(since.position if since is not None else None, last_row, has_more,
+                                 [p['updated_at'] for p in posts if p.get('updated_at')], now,
+                                 POST_CHANGES_LAG_SECONDS)
+        if since is not None:
+            deleted_since = next_deleted_since(deleted_since, now, POST_CHANGES_LAG_SECONDS)
+        watermark = Watermark(position[0], position[1], deleted_since)
+        return list_response({'posts': posts, 'deleted': deleted, 'watermark': format_watermark(watermark),
+                              'has_more': has_more, 'reset': False}, 'posts', post_null_columns), 200
+
+    except Exception as e:
+        logger.error(f"Get post changes error: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+def record_post_deletion(post: dict):
+    """Tombstone for the delta feed; entries past the retention window are pruned hourly"""
+    global _last_tombstone_prune
+    now = datetime.datetime.utcnow()
+    supabase.table(TABLES['post_deletions']).insert({
+        'post_id': post['id'],
+        'user_type': post.get('user_type'),
+        'author_id': post.get('author_id'),
+        'deleted_at': now.isoformat()
+    }).execute()
+    if time.monotonic() - _last_tombstone_prune > 3600:
+        _last_tombstone_prune = time.monotonic()
+        horizon = now - datetime.timedelta(days=POST_TOMBSTONE_RETENTION_DAYS)
+        supabase.table(TABLES['post_deletions']).delete().lt('deleted_at', horizon.isoformat()).execute()
+
+# "Near me" search: GET /api/posts/nearby
+NEARBY_DEFAULT_RADIUS_KM = 50
+NEARBY_MAX_RADIUS_KM = float(os.environ.get('NEARBY_MAX_RADIUS_KM', 200))
+NEARBY_MAX_LIMIT = 200
+NEARBY_MAX_CELLS = 400
+NEARBY_MAX_CANDIDATES = 20000
+
+@app.route('/api/posts/nearby', methods=['GET'])
+@query_budget(2)
+def get_nearby_posts():
+    """Posts within ``radius_km`` of ``lat``/``lon`` (or of the place ``near`` names), or inside ``bbox``, nearest first.
+
+    The geohash cells covering the area give the candidates through the
+    indexed ``geo_cell`` column. Candidates are fetched with just their
+    coordinates, exact distances are computed here, and only the nearest
+    ``limit`` posts are fetched in full.
+    """
+    try:
+        try:
+            requested_layout()
+            limit = min(max(int(request.args.get('limit', 50)), 1), NEARBY_MAX_LIMIT)
+            area = parse_area(request.args, NEARBY_DEFAULT_RADIUS_KM, NEARBY_MAX_RADIUS_KM)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if cell_count(area.bbox) > NEARBY_MAX_CELLS:
+            return jsonify({'error': 'Search area is too large'}), 400
+        user_type = request.args.get('user_type')
+        search = request.args.get('search')
+
+        query = supabase.table(TABLES['posts']).select('id, latitude, longitude, created_at') \
+            .in_('geo_cell', covering_cells(area.bbox)).limit(NEARBY_MAX_CANDIDATES)
+        if user_type:
+            query = query.eq('user_type', user_type)
+        if search:
+            query = query.or_(posts_search_filter(search))
+        candidates = query.execute().data or []
+
+        ranked = []
+        # Posts are geocoded to gazetteer places, so many share coordinates
+        distances = {}
+        for row in candidates:
+            point = (row.get('latitude'), row.get('longitude'))
+            if point[0] is None or point[1] is None:
+                continue
+            if point not in distances:
+                distances[point] = area.contains(*point)
+            distance = distances[point]
+            if distance is not None:
+                ranked.append((distance, row['created_at'] or '', row['id']))
+        # Nearest first; among equally near posts (same place), newest first
+        ranked.sort(key=lambda r: r[1], reverse=True)
+        ranked.sort(key=lambda r: r[0])
+        ranked = ranked[:limit]
+
+        posts = []
+        if ranked:
+            rows = supabase.table(TABLES['posts']).select('*').in_('id', [r[2] for r in ranked]).execute().data or []
+            by_id = {row['id']: row for row in rows}
+            for distance, _, post_id in ranked:
+                if post_id in by_id:
+                    posts.append({**by_id[post_id], 'distance_km': round(distance, 2)})
+
+        center = {'latitude': area.latitude, 'longitude': area.longitude,
+                  'place': f'{area.place.name}, {area.place.state}' if area.place else None}
+        payload = {'posts': posts, 'count': len(posts), 'center': center, 'radius_km': area.radius_km,
+                   'truncated': len(candidates) >= NEARBY_MAX_CANDIDATES}
+        # The list is the nearest `limit` rows, so the tag covers exactly which rows, in which order
+        etag = ordered_rows_etag(posts, extra=f"truncated={payload['truncated']}")
+        return conditional_response(representation_etag(etag),
+                                    lambda: list_response(payload, 'posts', post_null_columns))
+
+    except Exception as e:
+        logger.error(f"Get nearby posts error: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
 @app.route('/api/posts', methods=['POST'])
+@query_budget(1)
 @require_auth
+@idempotent(idempotency_store)
 def create_post():
     try:
         data = request.get_json()
-        if request.user_type == 'farmer':
-            required_fields = ['crop_name', 'crop_details', 'quantity', 'location']
-        else:
-            required_fields = ['name', 'organization', 'requirements', 'location']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({'error': f'Missing required field: {field}'}), 400
+        validation_error = post_schema(request.user_type).first_error(data)
+        if validation_error:
+            return jsonify(validation_error), 400
         
         post_data = {
             'id': str(uuid.uuid4()),
@@ -495,8 +844,10 @@ def create_post():
                 'requirements': data['requirements'],
                 'location': data['location']
             })
+        post_data.update(location_columns(data['location']))
         
         result = supabase.table(TABLES['posts']).insert(post_data).execute()
+        invalidate_posts_cache()
         if result.data:
             return jsonify({'message': 'Post created successfully', 'post': result.data[0]}), 201
         else:
@@ -508,6 +859,7 @@ def create_post():
 
 # Update a marketplace post
 @app.route('/api/posts/<post_id>', methods=['PUT'])
+@query_budget(2)
 @require_auth
 def update_post(post_id):
     try:
@@ -534,9 +886,16 @@ def update_post(post_id):
         if not update_payload:
             return jsonify({'error': 'No valid fields to update'}), 400
 
+        validation_error = post_schema(post.get('user_type')).first_error(update_payload, partial=True)
+        if validation_error:
+            return jsonify(validation_error), 400
+
+        if 'location' in update_payload:
+            update_payload.update(location_columns(update_payload['location']))
         update_payload['updated_at'] = datetime.datetime.utcnow().isoformat()
 
         result = supabase.table(TABLES['posts']).update(update_payload).eq('id', post_id).execute()
+        invalidate_posts_cache()
         if result.data:
             return jsonify({'message': 'Post updated successfully', 'post': result.data[0]}), 200
         else:
@@ -547,11 +906,12 @@ def update_post(post_id):
 
 # Delete a marketplace post
 @app.route('/api/posts/<post_id>', methods=['DELETE'])
+@query_budget(4)
 @require_auth
 def delete_post(post_id):
     try:
         # Fetch the existing post
-        existing = supabase.table(TABLES['posts']).select('id, author_id').eq('id', post_id).limit(1).execute()
+        existing = supabase.table(TABLES['posts']).select('id, author_id, user_type').eq('id', post_id).limit(1).execute()
         if not existing.data:
             return jsonify({'error': 'Post not found'}), 404
         post = existing.data[0]
@@ -561,6 +921,13 @@ def delete_post(post_id):
             return jsonify({'error': 'Unauthorized'}), 403
 
         result = supabase.table(TABLES['posts']).delete().eq('id', post_id).execute()
+        invalidate_posts_cache()
+        if result.data:
+            # The post is gone either way; a missing tombstone must not turn that into a 500
+            try:
+                record_post_deletion(post)
+            except Exception as e:
+                logger.error(f"Failed to record deletion of post {post_id} for the delta feed: {e}")
         if result.data is not None:
             return jsonify({'message': 'Post deleted successfully'}), 200
         else:
@@ -572,6 +939,7 @@ def delete_post(post_id):
 # ------------------ Chat Routes ------------------
 
 @app.route('/api/chats', methods=['GET'])
+# No @query_budget yet: one user and one last-message lookup per chat (2N+1 queries)
 @require_auth
 def get_user_chats():
     try:
@@ -600,18 +968,20 @@ def get_user_chats():
         return jsonify({'error': 'Internal server error'}), 500
 
 @app.route('/api/chats', methods=['POST'])
+@query_budget(2)
 @require_auth
+@idempotent(idempotency_store)
 def create_or_get_chat():
     try:
         current_user_id = request.user_id
         data = request.get_json()
-        other_user_id = data.get('other_user_id')
-
-        if not other_user_id:
-            return jsonify({'error': 'Missing other_user_id'}), 400
+        validation_error = CHAT_SCHEMA.first_error(data)
+        if validation_error:
+            return jsonify(validation_error), 400
+        other_user_id = data['other_user_id']
 
         # Check for existing chat in either direction
-        chat_query = supabase.table(TABLES['chats']).select('*').or_(f'user1_id.eq.{current_user_id},user2_id.eq.{other_user_id}').or_(f'user1_id.eq.{other_user_id},user2_id.eq.{current_user_id}').limit(1).execute()
+        chat_query = supabase.table(TABLES['chats']).select('*').or_(f'and(user1_id.eq.{current_user_id},user2_id.eq.{other_user_id}),and(user1_id.eq.{other_user_id},user2_id.eq.{current_user_id})').limit(1).execute()
         
         if chat_query.data:
             return jsonify({'chat': chat_query.data[0]}), 200
@@ -621,7 +991,7 @@ def create_or_get_chat():
             'id': str(uuid.uuid4()),
             'user1_id': current_user_id,
             'user2_id': other_user_id,
-            'created_at': datetime.utcnow().isoformat()
+            'created_at': datetime.datetime.utcnow().isoformat()
         }
         
         insert_result = supabase.table(TABLES['chats']).insert(new_chat).execute()
@@ -632,9 +1002,15 @@ def create_or_get_chat():
         return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
 
 @app.route('/api/chats/<chat_id>/messages', methods=['GET'])
+@query_budget(2)
 @require_auth
 def get_chat_messages(chat_id):
     try:
+        try:
+            requested_layout()
+            fields = requested_fields(MESSAGE_FIELDS, MESSAGE_REQUIRED)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         chat_res = supabase.table(TABLES['chats']).select('id, user1_id, user2_id').eq('id', chat_id).limit(1).execute()
         if not chat_res.data:
             return jsonify({'error': 'Chat not found'}), 404
@@ -642,19 +1018,23 @@ def get_chat_messages(chat_id):
         if chat['user1_id'] != request.user_id and chat['user2_id'] != request.user_id:
             return jsonify({'error': 'Unauthorized'}), 403
 
-        msgs = supabase.table(TABLES['messages']).select('*').eq('chat_id', chat_id).order('created_at', desc=False).execute()
-        return jsonify({'messages': msgs.data or []}), 200
+        msgs = supabase.table(TABLES['messages']).select(select_list(fields)).eq('chat_id', chat_id).order('created_at', desc=False).execute()
+        messages = msgs.data or []
+        return conditional_response(representation_etag(rows_etag(messages)),
+                                    lambda: list_response({'messages': messages}, 'messages'))
     except Exception as e:
         logger.error(f"Get chat messages error: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 @app.route('/api/chats/<chat_id>/messages', methods=['POST'])
+@query_budget(2)
 @require_auth
 def send_message(chat_id):
     try:
         data = request.get_json()
-        message_text = data.get('message')
-        if not message_text:
-            return jsonify({'error': 'Message text is required'}), 400
+        validation_error = MESSAGE_SCHEMA.first_error(data)
+        if validation_error:
+            return jsonify(validation_error), 400
+        message_text = data['message']
         
         chat_result = supabase.table(TABLES['chats']).select('*').eq('id', chat_id).execute()
         if not chat_result.data:
@@ -670,9 +1050,13 @@ def send_message(chat_id):
             'message': message_text,
             'created_at': datetime.datetime.utcnow().isoformat()
         }
-        result = supabase.table(TABLES['messages']).insert(message_data).execute()
-        if result.data:
-            return jsonify({'message': 'Message sent successfully', 'message_data': result.data[0]}), 201
+        if message_write_queue:
+            stored_message = message_write_queue.insert(message_data)
+        else:
+            result = supabase.table(TABLES['messages']).insert(message_data).execute()
+            stored_message = result.data[0] if result.data else None
+        if stored_message:
+            return jsonify({'message': 'Message sent successfully', 'message_data': stored_message}), 201
         else:
             return jsonify({'error': 'Failed to send message'}), 500
     except Exception as e:
@@ -682,10 +1066,16 @@ def send_message(chat_id):
 # ------------------ Profile Routes ------------------
 
 @app.route('/api/profile', methods=['GET'])
+@query_budget(1)
 @require_auth
 def get_profile():
     try:
-        result = supabase.table(TABLES['profiles']).select('*').eq('user_id', request.user_id).execute()
+        try:
+            fields = requested_fields(PROFILE_FIELDS, PROFILE_REQUIRED)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        result = shared_read(('profile', request.user_id, fields),
+                             supabase.table(TABLES['profiles']).select(select_list(fields)).eq('user_id', request.user_id))
         if result.data:
             return jsonify({'profile': result.data[0]}), 200
         else:
@@ -696,16 +1086,49 @@ def get_profile():
 
 # ------------------ Health Check ------------------
 
+def _probe_database():
+    if not supabase:
+        raise RuntimeError('Supabase client not initialized')
+    supabase.table(TABLES['users']).select('id').limit(1).execute()
+
+# Background database prober; health endpoints only read its cached result
+health_prober = HealthProber(
+    _probe_database,
+    interval=float(os.environ.get('HEALTH_PROBE_INTERVAL', 10)),
+    failure_threshold=int(os.environ.get('HEALTH_FAILURE_THRESHOLD', 3)),
+    first_probe_timeout=float(os.environ.get('HEALTH_FIRST_PROBE_TIMEOUT', 2))
+)
+if message_write_queue:
+    health_prober.add_component('message_write_queue', message_write_queue.pool_state)
+if posts_cache is not None:
+    health_prober.add_component('posts_cache', posts_cache.stats)
+if read_flights is not None:
+    health_prober.add_component('singleflight', read_flights.stats)
+if compressor is not None:
+    health_prober.add_component('compression', compressor.stats)
+
+@app.route('/api/health/live', methods=['GET'])
+@query_budget(0)
+def liveness_check():
+    """Process is up and serving requests; never touches the database"""
+    return jsonify({'status': 'alive', 'timestamp': datetime.datetime.utcnow().isoformat()}), 200
+
+@app.route('/api/health/ready', methods=['GET'])
+@query_budget(0)
+def readiness_check():
+    health_prober.ensure_started()
+    report = health_prober.readiness()
+    return jsonify(report), 200 if report['ready'] else 503
+
 @app.route('/api/health', methods=['GET'])
+@query_budget(0)
 def health_check():
-    try:
-        if supabase:
-            supabase.table(TABLES['users']).select('id').limit(1).execute()
-            return jsonify({'status': 'healthy', 'database': 'connected', 'timestamp': datetime.datetime.utcnow().isoformat()}), 200
-        else:
-            return jsonify({'status': 'unhealthy', 'database': 'disconnected', 'timestamp': datetime.datetime.utcnow().isoformat()}), 503
-    except Exception as e:
-        return jsonify({'status': 'unhealthy', 'database': 'error', 'error': str(e), 'timestamp': datetime.datetime.utcnow().isoformat()}), 503
+    health_prober.ensure_started()
+    report = health_prober.readiness()
+    body = {'status': 'healthy' if report['ready'] else 'unhealthy', 'database': report['database'], 'timestamp': report['timestamp']}
+    if 'error' in report:
+        body['error'] = report['error']
+    return jsonify(body), 200 if report['ready'] else 503
 
 # ------------------ Run Flask ------------------
 
@@ -1,16 +1,26 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
+import os
+import atexit
 import uuid
 import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
 import logging
+from memory_store import MemoryStore
+from records import FastJSONProvider
+from schemas import REGISTER_SCHEMA, LOGIN_SCHEMA, MESSAGE_SCHEMA, post_schema
+from store_persistence import StorePersistence
+from shared_store import SharedMemoryStore, SharedStoreFull
+from structured_logging import configure_logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging (queued JSON lines, see structured_logging.py)
+log_pipeline = configure_logging()
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'dev-secret-key-change-in-production'
+app.json = FastJSONProvider(app)
+log_pipeline.init_app(app)
 
 # Initialize CORS
 CORS(app, supports_credentials=True, origins=[
@@ -22,11 +32,48 @@ CORS(app, supports_credentials=True, origins=[
     "http://127.0.0.1:8000"
 ])
 
-# In-memory storage for demo purposes
-users_db = {}
-posts_db = {}
-chats_db = {}
-messages_db = {}
+# In-memory storage for demo purposes (indexed by email, participant, chat and created_at)
+# DEMO_COMPACT_RECORDS=true holds posts/chats/messages as __slots__ records
+DEMO_COMPACT_RECORDS = os.environ.get('DEMO_COMPACT_RECORDS', 'false').lower() in ('1', 'true', 'yes')
+# DEMO_SHARED_STORE=/dev/shm/<name> shares the store between gunicorn workers
+DEMO_SHARED_STORE = os.environ.get('DEMO_SHARED_STORE')
+DEMO_DATA_DIR = os.environ.get('DEMO_DATA_DIR')
+
+if DEMO_SHARED_STORE and DEMO_DATA_DIR:
+    raise ValueError("DEMO_SHARED_STORE and DEMO_DATA_DIR cannot be used together")
+
+if DEMO_SHARED_STORE:
+    store = SharedMemoryStore(
+        DEMO_SHARED_STORE,
+        capacity=int(os.environ.get('DEMO_SHARED_STORE_MB', 512)) * 1024 * 1024,
+        compact=DEMO_COMPACT_RECORDS
+    )
+    logger.info(f"Demo store shared between processes via {DEMO_SHARED_STORE}")
+else:
+    store = MemoryStore(compact=DEMO_COMPACT_RECORDS)
+
+# Optional durability: append-only log + snapshots under DEMO_DATA_DIR
+persistence = None
+if DEMO_DATA_DIR:
+    persistence = StorePersistence(
+        store,
+        DEMO_DATA_DIR,
+        snapshot_every=int(os.environ.get('DEMO_SNAPSHOT_EVERY', 100000)),
+        snapshot_interval=float(os.environ.get('DEMO_SNAPSHOT_INTERVAL', 300)),
+        fsync_interval=float(os.environ.get('DEMO_FSYNC_INTERVAL', 1))
+    )
+    persistence.open()
+    atexit.register(persistence.close)
+
+@app.before_request
+def refresh_store():
+    """Pick up writes made by other worker processes (shared store only)"""
+    store.refresh()
+
+def store_full_response(e):
+    """503 for writes the shared store has no room for, even after compaction"""
+    logger.error(f"Demo store full: {e}")
+    return jsonify({'error': 'Demo store is full; raise DEMO_SHARED_STORE_MB or reset the data'}), 503
 
 # Helper functions
 def generate_jwt_token(user_id, user_type):
@@ -61,14 +108,13 @@ def register():
     try:
         data = request.get_json()
         
-        # Validate required fields
-        required_fields = ['username', 'email', 'password', 'user_type', 'contact']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({'error': f'Missing required field: {field}'}), 400
+        # Validate input
+        validation_error = REGISTER_SCHEMA.first_error(data)
+        if validation_error:
+            return jsonify(validation_error), 400
         
         # Check if user already exists
-        if data['email'] in [user['email'] for user in users_db.values()]:
+        if store.get_user_by_email(data['email']):
             return jsonify({'error': 'User with this email already exists'}), 409
         
         # Create user
@@ -84,7 +130,10 @@ def register():
             'updated_at': datetime.datetime.utcnow().isoformat()
         }
         
-        users_db[user_id] = user_data
+        try:
+            store.add_user(user_data)
+        except KeyError:
+            return jsonify({'error': 'User with this email already exists'}), 409
         
         # Generate token
         token = generate_jwt_token(user_id, data['user_type'])
@@ -101,6 +150,8 @@ def register():
             }
         }), 201
         
+    except SharedStoreFull as e:
+        return store_full_response(e)
     except Exception as e:
         logger.error(f"Registration error: {e}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -112,16 +163,12 @@ def login():
         data = request.get_json()
         
         # Validate required fields
-        if not data.get('email') or not data.get('password'):
-            return jsonify({'error': 'Email and password are required'}), 400
+        validation_error = LOGIN_SCHEMA.first_error(data)
+        if validation_error:
+            return jsonify(validation_error), 400
         
         # Find user by email
-        user = None
-        for u in users_db.values():
-            if u['email'] == data['email']:
-                user = u
-                break
-        
+        user = store.get_user_by_email(data['email'])
         if not user:
             return jsonify({'error': 'Invalid credentials'}), 401
         
@@ -156,27 +203,19 @@ def get_posts():
         user_type = request.args.get('user_type')
         location = request.args.get('location')
         search = request.args.get('search')
-        
-        posts = list(posts_db.values())
-        
-        # Apply filters
-        if user_type:
-            posts = [p for p in posts if p['user_type'] == user_type]
-        
-        if location:
-            posts = [p for p in posts if location.lower() in p['location'].lower()]
-        
-        if search:
-            search_lower = search.lower()
-            posts = [p for p in posts if (
-                (p.get('crop_name', '').lower().find(search_lower) != -1) or
-                (p.get('crop_details', '').lower().find(search_lower) != -1) or
-                (p.get('requirements', '').lower().find(search_lower) != -1) or
-                (p.get('organization', '').lower().find(search_lower) != -1)
-            )]
-        
-        # Sort by creation date
-        posts.sort(key=lambda x: x['created_at'], reverse=True)
+        author_id = request.args.get('author_id')
+        limit = request.args.get('limit', type=int)
+        offset = request.args.get('offset', 0, type=int)
+        
+        # Newest first, served from the created_at index
+        posts = store.query_posts(
+            user_type=user_type,
+            location=location,
+            search=search,
+            author_id=author_id,
+            limit=limit,
+            offset=offset
+        )
         
         return jsonify({
             'posts': posts,
@@ -198,15 +237,10 @@ def create_post():
         
         data = request.get_json()
         
-        # Validate required fields based on user type
-        if user_info['user_type'] == 'farmer':
-            required_fields = ['crop_name', 'crop_details', 'quantity', 'location']
-        else:  # buyer
-            required_fields = ['name', 'organization', 'requirements', 'location']
-        
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({'error': f'Missing required field: {field}'}), 400
+        # Validate fields based on user type
+        validation_error = post_schema(user_info['user_type']).first_error(data)
+        if validation_error:
+            return jsonify(validation_error), 400
         
         post_data = {
             'id': str(uuid.uuid4()),
@@ -232,13 +266,15 @@ def create_post():
                 'location': data['location']
             })
         
-        posts_db[post_data['id']] = post_data
+        store.add_post(post_data)
         
         return jsonify({
             'message': 'Post created successfully',
             'post': post_data
         }), 201
         
+    except SharedStoreFull as e:
+        return store_full_response(e)
     except Exception as e:
         logger.error(f"Create post error: {e}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -255,31 +291,29 @@ def get_user_chats():
         
         user_chats = []
         
-        for chat_id, chat in chats_db.items():
-            if chat['user1_id'] == user_info['user_id'] or chat['user2_id'] == user_info['user_id']:
-                other_user_id = chat['user1_id'] if chat['user2_id'] == user_info['user_id'] else chat['user2_id']
-                
-                # Get other user info
-                other_user = users_db.get(other_user_id, {})
-                
-                # Get last message
-                last_message = None
-                for msg in messages_db.values():
-                    if msg['chat_id'] == chat_id:
-                        if not last_message or msg['created_at'] > last_message['created_at']:
-                            last_message = msg
-                
-                chat_detail = {
-                    'chat_id': chat_id,
-                    'other_user': {
-                        'id': other_user_id,
-                        'name': other_user.get('username', 'Unknown'),
-                        'user_type': other_user.get('user_type', 'Unknown')
-                    },
-                    'last_message': last_message,
-                    'created_at': chat['created_at']
-                }
-                user_chats.append(chat_detail)
+        for chat in store.chats_for_user(user_info['user_id']):
+            chat_id = chat['id']
+            other_user_id = chat['user1_id'] if chat['user2_id'] == user_info['user_id'] else chat['user2_id']
+            
+            # Get other user info
+            other_user = store.get_user(other_user_id) or {}
+            
+            # Get last message
+            last_message = store.last_message(chat_id)
+            
+            chat_detail = {
+                'chat_id': chat_id,
+                'other_user': {
+                    'id': other_user_id,
+                    'name': other_user.get('username', 'Unknown'),
+                    'user_type': other_user.get('user_type', 'Unknown')
+                },
+                'last_message': last_message,
+                'created_at': chat['created_at']
+            }
+            user_chats.append(chat_detail)
+        
+        user_chats.sort(key=lambda c: c['created_at'], reverse=True)
         
         return jsonify({
             'chats': user_chats,
@@ -300,13 +334,13 @@ def send_message(chat_id):
             return jsonify({'error': 'Authentication required'}), 401
         
         data = request.get_json()
-        message_text = data.get('message')
-        
-        if not message_text:
-            return jsonify({'error': 'Message text is required'}), 400
+        validation_error = MESSAGE_SCHEMA.first_error(data)
+        if validation_error:
+            return jsonify(validation_error), 400
+        message_text = data['message']
         
         # Verify the user is a participant in this chat
-        chat = chats_db.get(chat_id)
+        chat = store.get_chat(chat_id)
         if not chat:
             return jsonify({'error': 'Chat not found'}), 404
         
@@ -322,13 +356,15 @@ def send_message(chat_id):
             'created_at': datetime.datetime.utcnow().isoformat()
         }
         
-        messages_db[message_data['id']] = message_data
+        store.add_message(message_data)
         
         return jsonify({
             'message': 'Message sent successfully',
             'message_data': message_data
         }), 201
         
+    except SharedStoreFull as e:
+        return store_full_response(e)
     except Exception as e:
         logger.error(f"Send message error: {e}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -343,7 +379,7 @@ def get_profile():
         if not user_info:
             return jsonify({'error': 'Authentication required'}), 401
         
-        user = users_db.get(user_info['user_id'])
+        user = store.get_user(user_info['user_id'])
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
@@ -381,38 +417,39 @@ def health_check():
 def setup_demo_data():
     """Setup demo data for testing"""
     try:
-        # Create demo users
-        farmer_id = str(uuid.uuid4())
-        buyer_id = str(uuid.uuid4())
-        
-        users_db[farmer_id] = {
-            'id': farmer_id,
-            'username': 'Demo Farmer',
-            'email': 'farmer@demo.com',
-            'password_hash': generate_password_hash('demo123'),
-            'user_type': 'farmer',
-            'contact': '9876543210',
-            'created_at': datetime.datetime.utcnow().isoformat(),
-            'updated_at': datetime.datetime.utcnow().isoformat()
-        }
+        # Create demo users (reused if setup has already run)
+        farmer = store.get_user_by_email('farmer@demo.com')
+        buyer = store.get_user_by_email('buyer@demo.com')
+        farmer_id = farmer['id'] if farmer else str(uuid.uuid4())
+        buyer_id = buyer['id'] if buyer else str(uuid.uuid4())
+        
+        if not farmer:
+            store.add_user({
+                'id': farmer_id,
+                'username': 'Demo Farmer',
+                'email': 'farmer@demo.com',
+                'password_hash': generate_password_hash('demo123'),
+                'user_type': 'farmer',
+                'contact': '9876543210',
+                'created_at': datetime.datetime.utcnow().isoformat(),
+                'updated_at': datetime.datetime.utcnow().isoformat()
+            })
         
-        users_db[buyer_id] = {
-            'id': buyer_id,
-            'username': 'Demo Buyer',
-            'email': 'buyer@demo.com',
-            'password_hash': generate_password_hash('demo123'),
-            'user_type': 'buyer',
-            'contact': '9876543211',
-            'created_at': datetime.datetime.utcnow().isoformat(),
-            'updated_at': datetime.datetime.utcnow().isoformat()
-        }
+        if not buyer:
+            store.add_user({
+                'id': buyer_id,
+                'username': 'Demo Buyer',
+                'email': 'buyer@demo.com',
+                'password_hash': generate_password_hash('demo123'),
+                'user_type': 'buyer',
+                'contact': '9876543211',
+                'created_at': datetime.datetime.utcnow().isoformat(),
+                'updated_at': datetime.datetime.utcnow().isoformat()
+            })
         
         # Create demo posts
-        farmer_post_id = str(uuid.uuid4())
-        buyer_post_id = str(uuid.uuid4())
-        
-        posts_db[farmer_post_id] = {
-            'id': farmer_post_id,
+        store.add_post({
+            'id': str(uuid.uuid4()),
             'user_type': 'farmer',
             'author_id': farmer_id,
             'crop_name': 'Organic Tomatoes',
@@ -421,10 +458,10 @@ def setup_demo_data():
             'location': 'Mumbai, Maharashtra',
             'created_at': datetime.datetime.utcnow().isoformat(),
             'updated_at': datetime.datetime.utcnow().isoformat()
-        }
+        })
         
-        posts_db[buyer_post_id] = {
-            'id': buyer_post_id,
+        store.add_post({
+            'id': str(uuid.uuid4()),
             'user_type': 'buyer',
             'author_id': buyer_id,
             'name': 'Green Restaurant',
@@ -433,7 +470,7 @@ def setup_demo_data():
             'location': 'Mumbai, Maharashtra',
             'created_at': datetime.datetime.utcnow().isoformat(),
             'updated_at': datetime.datetime.utcnow().isoformat()
-        }
+        })
         
         return jsonify({
             'message': 'Demo data created successfully',
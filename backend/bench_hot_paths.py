@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the per-request CPU work: JWT tokens, password hashing,
+validation, sanitising, timestamps, pagination, JSON encoding of a 500-post
+``GET /api/posts`` and a 1000-message ``GET /api/chats/<id>/messages``
+payload with each JSON provider, the columnar layout of the posts, and
+gzip compression of the posts.
+
+Each case is calibrated so that one sample takes at least ``--min-time``
+seconds. ``--repeat`` samples are then timed with the garbage collector
+off, as ``timeit`` does. The report uses the median time per call, with
+the interquartile range as the noise estimate, so one slow sample does
+not move the result.
+
+    python bench_hot_paths.py                          # run everything
+    python bench_hot_paths.py --filter jwt json        # only matching cases
+    python bench_hot_paths.py --save baseline.json     # record a baseline
+    python bench_hot_paths.py --compare baseline.json  # faster/slower than the baseline?
+
+A change is reported as faster or slower only if it is larger than
+``--threshold`` percent and larger than the combined noise of both runs.
+Anything smaller is reported as "same". The exit status is 1 if any case
+got slower, so the comparison can gate CI. Compare runs from the same
+machine and Python version; both are stored in the baseline.
+"""
+
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Any, Tuple
+
+from flask import Flask, jsonify
+
+from insert_sample_data import MarketplaceGenerator
+from compression import Compressor
+from list_formats import to_columnar
+from records import FastJSONProvider, RecordJSONProvider, post_null_columns
+from utils import (generate_jwt_token, verify_jwt_token, hash_password, verify_password, validate_user_data,
+                   validate_post_data, sanitize_input, format_timestamp, paginate_results)
+
+SECRET = 'bench-secret-0123456789abcdef0123456789'
+USER = {'username': 'farmer_john', 'email': 'john@farm.com', 'password': 'Secure#Pass123',
+        'user_type': 'farmer', 'contact': '9876543210'}
+POST = {'crop_name': 'Organic Tomatoes', 'crop_details': 'Fresh, pesticide-free',
+        'quantity': '50', 'location': 'Guntur, Andhra Pradesh'}
+BUYER_POST = {'name': 'Green Restaurant', 'organization': 'Restaurant',
+              'requirements': 'Need <b>fresh</b> vegetables   daily & "organic" only', 'location': 'Mumbai, Maharashtra'}
+UNSAFE_TEXT = "  Fresh <script>alert('x')</script> tomatoes & onions,   \"Grade A\"  " * 4
+
+def build_cases() -> List[Tuple[str, Callable[[], Any]]]:
+    token = generate_jwt_token('7f3c1d2e-9a4b-4c5d-8e6f-0a1b2c3d4e5f', 'farmer', SECRET)
+    hashed = hash_password(USER['password'])
+    recent = (datetime.datetime.utcnow() - datetime.timedelta(hours=3)).isoformat()
+    posts = list(MarketplaceGenerator(seed=1, users=200, posts=500).marketplace_posts())
+    payload = {'posts': posts, 'count': len(posts)}
+    messages = list(MarketplaceGenerator(seed=1, users=200, chats=50, messages=1000).chat_messages())
+    messages_payload = {'messages': messages, 'count': len(messages)}
+    results = list(range(1000))
+    body = json.dumps(payload).encode()
+    compressor = Compressor()
+
+    default_app = Flask('bench_default_json')
+    record_app = Flask('bench_record_json')
+    record_app.json = RecordJSONProvider(record_app)
+    fast_app = Flask('bench_fast_json')
+    fast_app.json = FastJSONProvider(fast_app)
+
+    def jsonify_with(flask_app: Flask, data: Dict[str, Any]) -> Callable[[], Any]:
+        def run():
+            with flask_app.app_context():
+                return jsonify(data)
+        return run
+
+    return [
+        ('jwt.generate', lambda: generate_jwt_token('7f3c1d2e-9a4b-4c5d-8e6f-0a1b2c3d4e5f', 'farmer', SECRET)),
+        ('jwt.verify', lambda: verify_jwt_token(token, SECRET)),
+        ('password.hash', lambda: hash_password(USER['password'])),
+        ('password.verify', lambda: verify_password(USER['password'], hashed)),
+        ('validate_user_data', lambda: validate_user_data(USER)),
+        ('validate_post_data.farmer', lambda: validate_post_data(POST, 'farmer')),
+        ('validate_post_data.buyer', lambda: validate_post_data(BUYER_POST, 'buyer')),
+        ('sanitize_input', lambda: sanitize_input(UNSAFE_TEXT)),
+        ('format_timestamp', lambda: format_timestamp(recent)),
+        ('paginate_results', lambda: paginate_results(results, page=7, per_page=20)),
+        ('json.dumps.posts500', lambda: json.dumps(payload)),
+        ('json.jsonify.posts500', jsonify_with(default_app, payload)),
+        ('json.jsonify_records.posts500', jsonify_with(record_app, payload)),
+        ('json.jsonify_fast.posts500', jsonify_with(fast_app, payload)),
+        ('json.columnar_fast.posts500',
+         lambda: jsonify_with(fast_app, {**payload, 'posts': to_columnar(posts, post_null_columns)})()),
+        ('json.jsonify.messages1000', jsonify_with(default_app, messages_payload)),
+        ('json.jsonify_fast.messages1000', jsonify_with(fast_app, messages_payload)),
+        ('gzip.posts500', lambda: compressor.compress(body, 'gzip')),
+    ]
+
+def calibrate(fn: Callable[[], Any], min_time: float) -> int:
+    """Smallest power-of-ten loop count whose run takes at least ``min_time``"""
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - started >= min_time or loops >= 10 ** 7:
+            return loops
+        loops *= 10
+
+def measure(fn: Callable[[], Any], repeat: int, min_time: float) -> Dict[str, Any]:
+    fn()
+    loops = calibrate(fn, min_time)
+    # Calls slower than a sample need fewer samples to be stable, and would take too long otherwise
+    if loops == 1:
+        repeat = max(3, min(repeat, 5))
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            samples.append((time.perf_counter() - started) / loops)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    samples.sort()
+    quartiles = statistics.quantiles(samples, n=4) if len(samples) > 1 else [samples[0]] * 3
+    median = statistics.median(samples)
+    return {
+        'median_ns': median * 1e9,
+        'min_ns': samples[0] * 1e9,
+        'iqr_ns': (quartiles[2] - quartiles[0]) * 1e9,
+        'rel_iqr': (quartiles[2] - quartiles[0]) / median if median else 0.0,
+        'ops_per_s': 1 / median if median else 0.0,
+        'loops': loops,
+        'repeat': repeat,
+    }
+
+def format_ns(ns: float) -> str:
+    if ns >= 1e6:
+        return f'{ns / 1e6:.2f} ms'
+    if ns >= 1e3:
+        return f'{ns / 1e3:.2f} µs'
+    return f'{ns:.0f} ns'
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def verdict(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> Tuple[float, str]:
+    change = (current['median_ns'] - baseline['median_ns']) / baseline['median_ns'] * 100
+    noise = (current['rel_iqr'] + baseline['rel_iqr']) * 100
+    if abs(change) < max(threshold, noise):
+        return change, 'same'
+    return change, 'slower' if change > 0 else 'faster'
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filter', nargs='+', help='only cases whose name contains one of these')
+    parser.add_argument('--repeat', type=int, default=15, help='timed samples per case')
+    parser.add_argument('--min-time', type=float, default=0.05, help='minimum seconds per sample')
+    parser.add_argument('--save', help='write results to this JSON file')
+    parser.add_argument('--compare', help='baseline JSON file from --save')
+    parser.add_argument('--threshold', type=float, default=5.0, help='smallest change in percent to report')
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline['meta']['python'] != platform.python_version():
+            print(f"warning: baseline was recorded on Python {baseline['meta']['python']}")
+
+    cases = build_cases()
+    if args.filter:
+        cases = [(name, fn) for name, fn in cases if any(part in name for part in args.filter)]
+
+    header = f"{'case':<32}{'median':>12}{'±iqr':>8}{'ops/s':>14}"
+    if baseline:
+        header += f"{'baseline':>12}{'change':>9}  verdict"
+    print(header)
+    print('-' * len(header))
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for name, fn in cases:
+        result = results[name] = measure(fn, args.repeat, args.min_time)
+        line = (f"{name:<32}{format_ns(result['median_ns']):>12}{result['rel_iqr'] * 100:>7.1f}%"
+                f"{result['ops_per_s']:>14,.0f}")
+        previous = baseline['results'].get(name) if baseline else None
+        if previous:
+            change, label = verdict(result, previous, args.threshold)
+            line += f"{format_ns(previous['median_ns']):>12}{change:>+8.1f}%  {label}"
+        elif baseline:
+            line += f"{'-':>12}{'-':>9}  new"
+        print(line)
+
+    if args.save:
+        report = {
+            'meta': {
+                'timestamp': datetime.datetime.utcnow().isoformat() + 'Z',
+                'git_revision': git_revision(),
+                'python': platform.python_version(),
+                'implementation': platform.python_implementation(),
+                'machine': platform.machine(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'repeat': args.repeat,
+                'min_time': args.min_time,
+            },
+            'results': results,
+        }
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved {len(results)} results to {args.save}")
+
+    if baseline and any(verdict(results[n], baseline['results'][n], args.threshold)[1] == 'slower'
+                        for n in results if n in baseline['results']):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Measure memory held per post / message as plain dict rows vs __slots__ records.
+
+Rows are shaped like Supabase responses (every column present, nulls for the
+other post type's columns). Field values are created up front and shared by
+both representations, so the numbers are the per-row container overhead.
+Usage:
+
+    python bench_records.py --rows 1000000
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+import uuid
+
+from records import post_record, message_record, to_plain
+
+POST_COLUMNS = ('id', 'user_type', 'author_id', 'crop_name', 'crop_details', 'quantity', 'name',
+                'organization', 'requirements', 'location', 'price', 'unit', 'status', 'views',
+                'created_at', 'updated_at')
+
+def make_posts(n):
+    posts = []
+    for i in range(n):
+        row = dict.fromkeys(POST_COLUMNS)
+        row.update({
+            'id': str(uuid.uuid4()),
+            'author_id': str(uuid.uuid4()),
+            'location': 'Guntur, Andhra Pradesh',
+            'status': 'active',
+            'views': 0,
+            'created_at': f'2024-06-01T10:{i % 60:02d}:00',
+            'updated_at': f'2024-06-01T10:{i % 60:02d}:00'
+        })
+        if i % 2:
+            row.update({'user_type': 'farmer', 'crop_name': 'Tomatoes', 'crop_details': 'Fresh, pesticide-free', 'quantity': '50 kg'})
+        else:
+            row.update({'user_type': 'buyer', 'name': 'Green Restaurant', 'organization': 'Restaurant', 'requirements': 'Daily vegetables'})
+        posts.append(row)
+    return posts
+
+def make_messages(n):
+    chat_id = str(uuid.uuid4())
+    return [{
+        'id': str(uuid.uuid4()),
+        'chat_id': chat_id,
+        'sender_id': chat_id,
+        'message': 'Is the tomato lot still available?',
+        'message_type': 'text',
+        'is_read': False,
+        'created_at': f'2024-06-01T10:{i % 60:02d}:00'
+    } for i in range(n)]
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    held = build()
+    elapsed = time.perf_counter() - started
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return held, size, elapsed
+
+def report(label, rows, to_record):
+    n = len(rows)
+    dicts, dict_bytes, _ = measure(lambda: [dict(r) for r in rows])
+    records, record_bytes, build_s = measure(lambda: [to_record(r) for r in rows])
+    started = time.perf_counter()
+    to_plain(records)
+    convert_s = time.perf_counter() - started
+    del dicts, records
+
+    print(f"{label} ({n:,} rows)")
+    print(f"  dict rows   : {dict_bytes / n:7.1f} B/row  {dict_bytes / 2**20:8.1f} MiB")
+    print(f"  records     : {record_bytes / n:7.1f} B/row  {record_bytes / 2**20:8.1f} MiB  (built in {build_s:.2f}s)")
+    print(f"  saving      : {(dict_bytes - record_bytes) / n:7.1f} B/row  {(dict_bytes - record_bytes) / 2**20:8.1f} MiB  ({dict_bytes / record_bytes:.1f}x smaller)")
+    print(f"  to_dict all : {convert_s:.2f}s ({convert_s / n * 1e6:.2f} us/row)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    args = parser.parse_args()
+
+    report('posts', make_posts(args.rows), post_record)
+    report('messages', make_messages(args.rows), message_record)
+
+if __name__ == '__main__':
+    main()
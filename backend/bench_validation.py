@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark request validation: compiled schemas vs the previous
+per-call implementation (kept below as the baseline).
+
+    python bench_validation.py --iterations 200000 --bulk 5000
+"""
+
+import argparse
+import re
+import time
+
+from schemas import REGISTER_SCHEMA
+from utils import validate_user_data, validate_post_data, validate_posts_bulk
+
+USER = {'username': 'farmer_john', 'email': 'john@farm.com', 'password': 'Secure#Pass123',
+        'user_type': 'farmer', 'contact': '9876543210'}
+POST = {'crop_name': 'Organic Tomatoes', 'crop_details': 'Fresh, pesticide-free',
+        'quantity': '50', 'location': 'Guntur, Andhra Pradesh'}
+
+def legacy_validate_user_data(data):
+    """Previous utils.validate_user_data: uncompiled patterns, rebuilt per call"""
+    errors, warnings = [], []
+    for field in ['username', 'email', 'password', 'user_type', 'contact']:
+        if not data.get(field):
+            errors.append(f"{field.title()} is required")
+    if data.get('email') and re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', data['email']) is None:
+        errors.append('Invalid email format')
+    if data.get('contact') and re.match(r'^[0-9]{10}$', data['contact']) is None:
+        errors.append('Phone number must be 10 digits')
+    if data.get('password'):
+        password = data['password']
+        if len(password) < 8:
+            errors.append('Password must be at least 8 characters long')
+        for pattern, message in ((r'[A-Z]', 'uppercase letters'), (r'[a-z]', 'lowercase letters'),
+                                 (r'[0-9]', 'numbers'), (r'[!@#$%^&*(),.?":{}|<>]', 'special characters')):
+            if not re.search(pattern, password):
+                warnings.append(f'Consider adding {message}')
+    if data.get('username'):
+        username = data['username'].strip()
+        if len(username) < 3:
+            errors.append('Username must be at least 3 characters long')
+        if len(username) > 50:
+            errors.append('Username must be less than 50 characters')
+        if not re.match(r'^[a-zA-Z0-9_]+$', username):
+            errors.append('Username can only contain letters, numbers, and underscores')
+    if data.get('user_type') and data['user_type'] not in ['farmer', 'buyer']:
+        errors.append('User type must be either "farmer" or "buyer"')
+    return {'valid': not errors, 'errors': errors, 'warnings': warnings}
+
+def legacy_validate_post_data(data, user_type):
+    """Previous utils.validate_post_data: field maps rebuilt per call"""
+    errors, warnings = [], []
+    if user_type == 'farmer':
+        required_fields = ['crop_name', 'crop_details', 'quantity', 'location']
+        field_names = {'crop_name': 'Crop Name', 'crop_details': 'Crop Details', 'quantity': 'Quantity', 'location': 'Location'}
+    else:
+        required_fields = ['name', 'organization', 'requirements', 'location']
+        field_names = {'name': 'Organization Name', 'organization': 'Organization Type', 'requirements': 'Requirements', 'location': 'Location'}
+    for field in required_fields:
+        if not data.get(field):
+            errors.append(f"{field_names[field]} is required")
+        elif isinstance(data[field], str) and len(data[field].strip()) == 0:
+            errors.append(f"{field_names[field]} cannot be empty")
+    if data.get('location') and len(data['location'].strip()) < 3:
+        warnings.append('Location should be more specific')
+    if data.get('quantity'):
+        try:
+            if int(data['quantity']) <= 0:
+                errors.append('Quantity must be a positive number')
+        except ValueError:
+            errors.append('Quantity must be a valid number')
+    return {'valid': not errors, 'errors': errors, 'warnings': warnings}
+
+def rate(fn, iterations):
+    fn()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return iterations / (time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=200000)
+    parser.add_argument('--bulk', type=int, default=5000)
+    args = parser.parse_args()
+    n = args.iterations
+
+    cases = [
+        ('validate_user_data', lambda: legacy_validate_user_data(USER), lambda: validate_user_data(USER)),
+        ('validate_post_data', lambda: legacy_validate_post_data(POST, 'farmer'), lambda: validate_post_data(POST, 'farmer')),
+        ('register route schema', None, lambda: REGISTER_SCHEMA.validate(USER)),
+    ]
+    print(f"{'case':<24}{'baseline/s':>14}{'compiled/s':>14}{'speedup':>9}")
+    for name, baseline, compiled in cases:
+        new_rate = rate(compiled, n)
+        if baseline:
+            old_rate = rate(baseline, n)
+            print(f"{name:<24}{old_rate:>14,.0f}{new_rate:>14,.0f}{new_rate / old_rate:>8.1f}x")
+        else:
+            print(f"{name:<24}{'-':>14}{new_rate:>14,.0f}{'-':>9}")
+
+    posts = [dict(POST, crop_name=f'Crop {i}', quantity=str(i % 7)) for i in range(args.bulk)]
+    started = time.perf_counter()
+    result = validate_posts_bulk(posts, 'farmer')
+    elapsed = time.perf_counter() - started
+    print(f"bulk: {args.bulk:,} posts in {elapsed * 1000:.1f} ms ({args.bulk / elapsed:,.0f} posts/s), "
+          f"{result['invalid_count']} invalid")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark chat message inserts: single-row mode vs the group-commit queue.
+
+Uses a stand-in Supabase client that sleeps for a configurable round-trip
+time per request and only serves ``--connections`` requests at once (the
+HTTP connection pool / PostgREST pool), so the numbers reflect round trips
+saved rather than local CPU. Usage:
+
+    python bench_write_queue.py --writers 32 --messages 2000 --rtt-ms 20 --connections 8
+"""
+
+import argparse
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from write_queue import GroupCommitQueue
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+class _InsertQuery:
+    def __init__(self, client, rows):
+        self.client = client
+        self.rows = rows
+
+    def execute(self):
+        rows = self.rows if isinstance(self.rows, list) else [self.rows]
+        with self.client.connections:
+            time.sleep(self.client.rtt + self.client.per_row * len(rows))
+        with self.client.lock:
+            self.client.requests += 1
+        return _Result([dict(r) for r in rows])
+
+class _Table:
+    def __init__(self, client):
+        self.client = client
+
+    def insert(self, rows):
+        return _InsertQuery(self.client, rows)
+
+class FakeSupabase:
+    """Minimal client exposing table().insert().execute() with simulated latency"""
+
+    def __init__(self, rtt_ms: float, per_row_ms: float, connections: int):
+        self.rtt = rtt_ms / 1000.0
+        self.per_row = per_row_ms / 1000.0
+        self.connections = threading.BoundedSemaphore(connections)
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def table(self, name):
+        return _Table(self)
+
+def make_message(chat_id):
+    return {
+        'id': str(uuid.uuid4()),
+        'chat_id': chat_id,
+        'sender_id': str(uuid.uuid4()),
+        'message': 'Is the tomato lot still available?',
+        'created_at': datetime.utcnow().isoformat()
+    }
+
+def run(insert_fn, writers, messages):
+    per_writer = messages // writers
+    chat_id = str(uuid.uuid4())
+    failures = []
+
+    def worker():
+        for _ in range(per_writer):
+            row = make_message(chat_id)
+            stored = insert_fn(row)
+            if not stored or stored['id'] != row['id']:
+                failures.append(row['id'])
+
+    threads = [threading.Thread(target=worker) for _ in range(writers)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return per_writer * writers, elapsed, failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, default=32)
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--rtt-ms', type=float, default=20.0)
+    parser.add_argument('--per-row-ms', type=float, default=0.05)
+    parser.add_argument('--connections', type=int, default=8)
+    parser.add_argument('--max-batch', type=int, default=50)
+    parser.add_argument('--max-latency-ms', type=float, default=5.0)
+    parser.add_argument('--flush-workers', type=int, default=2)
+    args = parser.parse_args()
+
+    single = FakeSupabase(args.rtt_ms, args.per_row_ms, args.connections)
+
+    def single_insert(row):
+        result = single.table('chat_messages').insert(row).execute()
+        return result.data[0] if result.data else None
+
+    count, elapsed, failures = run(single_insert, args.writers, args.messages)
+    single_rate = count / elapsed
+    print(f"single-row : {count} inserts in {elapsed:.2f}s = {single_rate:,.0f} inserts/s ({single.requests} requests, {len(failures)} failures)")
+
+    batched = FakeSupabase(args.rtt_ms, args.per_row_ms, args.connections)
+    queue = GroupCommitQueue(batched, 'chat_messages', max_batch=args.max_batch, max_latency_ms=args.max_latency_ms, flush_workers=args.flush_workers)
+    count, elapsed, failures = run(queue.insert, args.writers, args.messages)
+    queue.close()
+    batched_rate = count / elapsed
+    avg_batch = queue.stats['rows'] / max(queue.stats['batches'], 1)
+    print(f"group-commit: {count} inserts in {elapsed:.2f}s = {batched_rate:,.0f} inserts/s ({batched.requests} requests, avg batch {avg_batch:.1f}, {len(failures)} failures)")
+    print(f"speedup     : {batched_rate / single_rate:.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+import gzip
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Any, Tuple
+
+from flask import Flask, request
+
+try:
+    import brotli
+except ImportError:  # pinned in requirements.txt; without it responses are gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Set by a wrapper (e.g. response_cache.cached_response) to a dict that keeps encoded bodies with a cache entry
+VARIANTS_KEY = 'farmlink.encoded_variants'
+
+COMPRESSIBLE_MIMETYPES = frozenset((
+    'application/json', 'application/msgpack', 'application/javascript', 'text/plain', 'text/html', 'text/css',
+    'text/csv',
+))
+
+class Compressor:
+    """Compresses responses for clients that send ``Accept-Encoding``.
+
+    Brotli is preferred when the ``brotli`` package is installed and the
+    client accepts it, gzip otherwise. Only 200 responses with a text, JSON
+    or MessagePack mimetype and a body of at least ``min_size`` bytes are
+    compressed; below that, headers and CPU cost more than the bytes saved.
+
+    If the request environ holds a dict under :data:`VARIANTS_KEY`, the
+    compressed body is stored there per encoding and reused next time, so
+    a cache hit is not compressed again.
+    """
+
+    def __init__(self, min_size: int = 1024, gzip_level: int = 6, brotli_level: int = 5,
+                 mimetypes: frozenset = COMPRESSIBLE_MIMETYPES):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_level = brotli_level
+        self.mimetypes = mimetypes
+        self.encodings: Tuple[str, ...] = ('br', 'gzip') if brotli is not None else ('gzip',)
+        self.observers: List[Callable[['Compressor', str, int, int, bool], None]] = []
+        self.counts: Dict[str, int] = {'compressed': 0, 'reused': 0, 'bytes_in': 0, 'bytes_out': 0}
+        self._lock = threading.Lock()
+
+    def init_app(self, app: Flask):
+        # after_request hooks run in reverse; go first in the list so the hook runs last, after
+        # the ones that read or replace the body (query trace, inline profiles)
+        app.after_request_funcs.setdefault(None, []).insert(0, self._after_request)
+
+    def add_observer(self, observer: Callable[['Compressor', str, int, int, bool], None]):
+        """Called with ``(compressor, encoding, raw_bytes, sent_bytes, reused)``"""
+        self.observers.append(observer)
+
+    def _notify(self, encoding: str, raw: int, sent: int, reused: bool):
+        with self._lock:
+            self.counts['reused' if reused else 'compressed'] += 1
+            self.counts['bytes_in'] += raw
+            self.counts['bytes_out'] += sent
+        for observer in self.observers:
+            try:
+                observer(self, encoding, raw, sent, reused)
+            except Exception as e:
+                logger.error(f"Compression observer failed: {e}")
+
+    def compress(self, data: bytes, encoding: str) -> bytes:
+        if encoding == 'br':
+            return brotli.compress(data, quality=self.brotli_level)
+        # mtime=0 keeps the output identical for identical bodies
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+
+    def _after_request(self, response):
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or response.mimetype not in self.mimetypes):
+            return response
+        response.vary.add('Accept-Encoding')
+        if 'Content-Encoding' in response.headers or 'no-transform' in response.headers.get('Cache-Control', ''):
+            return response
+
+        req = request._get_current_object()
+        encoding = req.accept_encodings.best_match(self.encodings)
+        if encoding is None:
+            return response
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+
+        variants: Optional[Dict[str, Any]] = req.environ.get(VARIANTS_KEY)
+        compressed = variants.get(encoding) if variants is not None else None
+        reused = compressed is not None
+        if compressed is None:
+            compressed = self.compress(data, encoding)
+            if variants is not None:
+                variants[encoding] = compressed
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        self._notify(encoding, len(data), len(compressed), reused)
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self.counts)
+        return {
+            'encodings': list(self.encodings),
+            'ratio': round(counts['bytes_out'] / counts['bytes_in'], 4) if counts['bytes_in'] else None,
+            **counts,
+        }
@@ -0,0 +1,70 @@
+import hashlib
+from typing import Callable, Dict, Iterable, Optional, Any
+
+from flask import Response, make_response, request
+
+# Set by a wrapper (e.g. response_cache.cached_response) that answers If-None-Match itself
+DEFER_KEY = 'farmlink.defer_conditional'
+
+def rows_etag(rows: Iterable[Dict[str, Any]], fields: tuple = ('updated_at', 'created_at')) -> str:
+    """Weak validator for a query result: row count plus the newest timestamp and its row id.
+
+    For an unbounded result (every matching row), any insert, delete or
+    edit that bumps ``updated_at`` changes it, and it is computed in one
+    pass over rows already in memory. It is deterministic across processes,
+    so any worker can answer a revalidation. It does not suit a window of a
+    larger result (a ``limit``): a row deleted inside the window can be
+    replaced by one from outside it without changing the count or the
+    newest timestamp. Use :func:`ordered_rows_etag` there.
+    """
+    count = 0
+    newest, newest_id = '', ''
+    for row in rows:
+        count += 1
+        for field in fields:
+            value = row.get(field)
+            if value and value > newest:
+                newest, newest_id = value, row.get('id') or ''
+    digest = hashlib.blake2b(f'{count}|{newest}|{newest_id}'.encode(), digest_size=10).hexdigest()
+    return f'{count}-{digest}'
+
+def ordered_rows_etag(rows: Iterable[Dict[str, Any]], extra: str = '',
+                      fields: tuple = ('updated_at', 'created_at')) -> str:
+    """Weak validator over every row's id and timestamp, in order, plus ``extra``.
+
+    For bounded or re-ranked lists, such as the nearest ``limit`` posts:
+    any change to which rows are returned, their order or their timestamps
+    changes it.
+    """
+    digest = hashlib.blake2b(extra.encode(), digest_size=10)
+    count = 0
+    for row in rows:
+        count += 1
+        stamp = next((row.get(field) for field in fields if row.get(field)), '')
+        digest.update(f"|{row.get('id') or ''}@{stamp}".encode())
+    return f'{count}-{digest.hexdigest()}'
+
+def not_modified(etag: str) -> Response:
+    response = Response(status=304)
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def matches(etag: Optional[str]) -> bool:
+    """Whether the request's ``If-None-Match`` already names ``etag``"""
+    return bool(etag) and request.if_none_match.contains_weak(etag)
+
+def conditional_response(etag: str, build: Callable[[], Any]) -> Response:
+    """304 if the client already has ``etag``, otherwise ``build()`` tagged with it.
+
+    ``build`` is only called for a full response, so a revalidation skips
+    JSON encoding entirely. ``Cache-Control: no-cache`` lets browsers keep
+    the body but revalidate on every fetch.
+    """
+    environ = request._get_current_object().environ
+    if not environ.get(DEFER_KEY) and matches(etag):
+        return not_modified(etag)
+    response = make_response(build())
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
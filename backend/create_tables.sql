@@ -41,10 +41,19 @@ CREATE TABLE IF NOT EXISTS marketplace_posts (
     organization VARCHAR(100),
     requirements TEXT,
     location VARCHAR(100) NOT NULL,
+    latitude DOUBLE PRECISION,
+    longitude DOUBLE PRECISION,
+    geo_cell VARCHAR(12),
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Coordinates for GET /api/posts/nearby on databases created before they existed;
+-- fill them for existing posts with geocode_posts.py
+ALTER TABLE marketplace_posts ADD COLUMN IF NOT EXISTS latitude DOUBLE PRECISION;
+ALTER TABLE marketplace_posts ADD COLUMN IF NOT EXISTS longitude DOUBLE PRECISION;
+ALTER TABLE marketplace_posts ADD COLUMN IF NOT EXISTS geo_cell VARCHAR(12);
+
 -- Create user_chats table
 CREATE TABLE IF NOT EXISTS user_chats (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -62,11 +71,23 @@ CREATE TABLE IF NOT EXISTS chat_messages (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Create marketplace_post_deletions table (tombstones for GET /api/posts/changes)
+CREATE TABLE IF NOT EXISTS marketplace_post_deletions (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    post_id UUID NOT NULL,
+    user_type VARCHAR(20),
+    author_id UUID,
+    deleted_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
 CREATE INDEX IF NOT EXISTS idx_users_user_type ON users(user_type);
 CREATE INDEX IF NOT EXISTS idx_posts_user_type ON marketplace_posts(user_type);
 CREATE INDEX IF NOT EXISTS idx_posts_location ON marketplace_posts(location);
+CREATE INDEX IF NOT EXISTS idx_posts_updated_at ON marketplace_posts(updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_posts_geo_cell ON marketplace_posts(geo_cell);
+CREATE INDEX IF NOT EXISTS idx_post_deletions_deleted_at ON marketplace_post_deletions(deleted_at);
 CREATE INDEX IF NOT EXISTS idx_messages_chat_id ON chat_messages(chat_id);
 
 -- Insert sample data
@@ -92,6 +113,7 @@ ALTER TABLE user_profiles ENABLE ROW LEVEL SECURITY;
 ALTER TABLE marketplace_posts ENABLE ROW LEVEL SECURITY;
 ALTER TABLE user_chats ENABLE ROW LEVEL SECURITY;
 ALTER TABLE chat_messages ENABLE ROW LEVEL SECURITY;
+ALTER TABLE marketplace_post_deletions ENABLE ROW LEVEL SECURITY;
 
 -- Create RLS policies
 CREATE POLICY "Users can view all users" ON users FOR SELECT USING (true);
@@ -106,6 +128,10 @@ CREATE POLICY "Posts can be viewed by all" ON marketplace_posts FOR SELECT USING
 CREATE POLICY "Users can insert their own posts" ON marketplace_posts FOR INSERT WITH CHECK (true);
 CREATE POLICY "Users can update their own posts" ON marketplace_posts FOR UPDATE USING (true);
 
+CREATE POLICY "Post deletions can be viewed by all" ON marketplace_post_deletions FOR SELECT USING (true);
+CREATE POLICY "Users can record post deletions" ON marketplace_post_deletions FOR INSERT WITH CHECK (true);
+CREATE POLICY "Old post deletions can be pruned" ON marketplace_post_deletions FOR DELETE USING (true);
+
 CREATE POLICY "Chats can be viewed by participants" ON user_chats FOR SELECT USING (true);
 CREATE POLICY "Users can create chats" ON user_chats FOR INSERT WITH CHECK (true);
 
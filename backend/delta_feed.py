@@ -0,0 +1,91 @@
+import datetime
+import re
+from typing import Iterable, NamedTuple, Optional, Tuple
+
+# Watermarks are "<timestamp>~<row id>~<deletions timestamp>"
+SEPARATOR = '~'
+# Post ids are UUIDs; empty once the client has caught up (the position is then a bare timestamp)
+_ID_RE = re.compile(r'([0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})?')
+
+Position = Tuple[str, str]
+
+class Watermark(NamedTuple):
+    """Where a client is in the feed.
+
+    ``updated_at``/``row_id`` is a position in (updated_at, id) order of
+    the posts. ``deleted_since`` is a separate cursor into the deletions
+    log. It starts at the time of the full sync, so paging through old
+    posts never runs into the log's retention window.
+    """
+    updated_at: str
+    row_id: str
+    deleted_since: str
+
+    @property
+    def position(self) -> Position:
+        return self.updated_at, self.row_id
+
+def parse_timestamp(value: str) -> datetime.datetime:
+    """ISO timestamp (naive, ``Z`` or offset) as naive UTC"""
+    parsed = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def _check_timestamp(value: str):
+    parse_timestamp(value)
+    if ',' in value or ')' in value:
+        raise ValueError('invalid watermark')
+
+def parse_watermark(value: Optional[str]) -> Optional[Watermark]:
+    """``None`` for a full sync; raises ValueError for anything that is not a watermark.
+
+    The parts end up inside PostgREST filter strings, so they are
+    validated strictly.
+    """
+    if not value:
+        return None
+    parts = value.split(SEPARATOR)
+    if len(parts) != 3 or not _ID_RE.fullmatch(parts[1]):
+        raise ValueError('invalid watermark')
+    _check_timestamp(parts[0])
+    _check_timestamp(parts[2])
+    return Watermark(*parts)
+
+def format_watermark(watermark: Optional[Watermark]) -> Optional[str]:
+    return None if watermark is None else SEPARATOR.join(watermark)
+
+def next_position(since: Optional[Position], last_row: Optional[Position], has_more: bool,
+                  seen: Iterable[str], now: datetime.datetime, lag_seconds: float) -> Position:
+    """Where the next poll of the posts should resume.
+
+    While pages remain, that is exactly the last row returned. Once caught
+    up, it is the newest change seen, but no later than ``now - lag_seconds``
+    and never behind ``since``. Writes are timestamped by the app servers,
+    so a row can be committed after a later-stamped one. The lag makes the
+    next poll look back far enough to pick such rows up, at the cost of
+    re-sending the last few seconds of changes. Clients apply changes by
+    id, so repeats are harmless.
+    """
+    if has_more and last_row is not None:
+        return last_row
+    safe = now - datetime.timedelta(seconds=lag_seconds)
+    newest = max((parse_timestamp(ts) for ts in seen), default=None)
+    if newest is None or newest > safe:
+        candidate: Position = (safe.isoformat(), '')
+        candidate_at = safe
+    elif last_row is not None and parse_timestamp(last_row[0]) == newest:
+        candidate, candidate_at = last_row, newest
+    else:
+        candidate, candidate_at = (newest.isoformat(), ''), newest
+    if since is not None and parse_timestamp(since[0]) >= candidate_at:
+        return since
+    return candidate
+
+def next_deleted_since(deleted_since: str, now: datetime.datetime, lag_seconds: float) -> str:
+    """Deletions cursor after a poll that returned every tombstone newer than ``deleted_since``.
+
+    Moves up to ``now - lag_seconds`` (see :func:`next_position`), never back.
+    """
+    safe = now - datetime.timedelta(seconds=lag_seconds)
+    return safe.isoformat() if safe > parse_timestamp(deleted_since) else deleted_since
@@ -0,0 +1,518 @@
+import datetime
+import functools
+import random
+import re
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Any, Callable, Iterable, Tuple
+
+from postgrest.exceptions import APIError
+
+from memory_store import HashIndex, SortedIndex, Table
+
+# Indexed columns per table; every other column still works, just by scanning
+TABLE_INDEXES: Dict[str, Dict[str, Any]] = {
+    'users': {'unique': ('email',), 'hash': ('mobile', 'google_id', 'user_type'), 'sorted': ('created_at',)},
+    'user_profiles': {'hash': ('user_id',)},
+    'marketplace_posts': {'hash': ('author_id', 'user_type', 'geo_cell'), 'sorted': ('created_at', 'updated_at')},
+    'marketplace_post_deletions': {'hash': ('post_id',), 'sorted': ('deleted_at',)},
+    'user_chats': {'hash': ('user1_id', 'user2_id'), 'sorted': ('created_at',)},
+    'chat_messages': {'hash': ('chat_id', 'sender_id'), 'sorted': ('created_at',)},
+}
+
+# UUID-typed columns (create_tables.sql); filtering them with anything else fails like Postgres does
+UUID_COLUMNS = frozenset(('id', 'user_id', 'author_id', 'post_id', 'user1_id', 'user2_id', 'chat_id', 'sender_id'))
+_UUID_RE = re.compile(r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}')
+
+# Above this many index candidates, a limited ordered query walks the sorted index instead
+SORT_SCAN_THRESHOLD = 1000
+
+class FakeResponse:
+    """Mimics ``postgrest.APIResponse``: ``data`` plus optional ``count``"""
+
+    def __init__(self, data: List[Dict[str, Any]], count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+@functools.lru_cache(maxsize=1024)
+def _like_regex(pattern: str, case_insensitive: bool) -> re.Pattern:
+    parts = []
+    for char in pattern:
+        if char == '%' or char == '*':   # PostgREST accepts * for % in URLs
+            parts.append('.*')
+        elif char == '_':
+            parts.append('.')
+        else:
+            parts.append(re.escape(char))
+    return re.compile(''.join(parts) + r'\Z', re.IGNORECASE | re.DOTALL if case_insensitive else re.DOTALL)
+
+def _coerce(row_value: Any, value: Any) -> Any:
+    """Cast a filter value (often a string from or_()) to the column's type"""
+    if row_value is None or value is None or isinstance(value, type(row_value)):
+        return value
+    if isinstance(row_value, bool):
+        return str(value).lower() in ('true', 't', '1')
+    if isinstance(row_value, (int, float)):
+        try:
+            return type(row_value)(value)
+        except (TypeError, ValueError):
+            return value
+    return str(value)
+
+def _compare(op: str, row_value: Any, value: Any) -> bool:
+    if op == 'is':
+        if value in (None, 'null'):
+            return row_value is None
+        return row_value is _coerce(True, value)
+    if op == 'in':
+        # Rows found through an index on the same filter match as they are; coerce only otherwise
+        return row_value is not None and (row_value in value or row_value in {_coerce(row_value, v) for v in value})
+    if row_value is None:
+        return False
+    if op in ('like', 'ilike'):
+        return _like_regex(str(value), op == 'ilike').match(str(row_value)) is not None
+    value = _coerce(row_value, value)
+    try:
+        if op == 'eq':
+            return row_value == value
+        if op == 'neq':
+            return row_value != value
+        if op == 'gt':
+            return row_value > value
+        if op == 'gte':
+            return row_value >= value
+        if op == 'lt':
+            return row_value < value
+        if op == 'lte':
+            return row_value <= value
+    except TypeError:
+        return False
+    raise APIError({'message': f'Unsupported operator: {op}', 'code': 'PGRST100'})
+
+def _split_top_level(expression: str) -> List[str]:
+    parts, depth, current = [], 0, []
+    for char in expression:
+        if char == ',' and depth == 0:
+            parts.append(''.join(current))
+            current = []
+            continue
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        current.append(char)
+    parts.append(''.join(current))
+    return [p.strip() for p in parts if p.strip()]
+
+def _parse_or(expression: str) -> List[tuple]:
+    """``a.eq.1,and(b.eq.2,c.ilike.%x%)`` -> ``[(a, eq, 1), (and, [...])]``"""
+    conditions: List[tuple] = []
+    for part in _split_top_level(expression):
+        for group in ('and', 'or'):
+            if part.startswith(f'{group}(') and part.endswith(')'):
+                conditions.append((group, _parse_or(part[len(group) + 1:-1])))
+                break
+        else:
+            column, op, value = part.split('.', 2)
+            if op == 'in':
+                value = [v.strip().strip('"') for v in value.strip('()').split(',')]
+            conditions.append((column, op, value))
+    return conditions
+
+def _holds(condition: tuple, get: Callable[[str], Any]) -> bool:
+    if len(condition) == 2:
+        group, members = condition
+        if group == 'and':
+            return all(_holds(c, get) for c in members)
+        return any(_holds(c, get) for c in members)
+    column, op, value = condition
+    return _compare(op, get(column), value)
+
+def _check_uuid(column: str, op: str, value: Any):
+    if column not in UUID_COLUMNS or op in ('is', 'like', 'ilike'):
+        return
+    for v in (value if op == 'in' else [value]):
+        if v is not None and not _UUID_RE.fullmatch(str(v)):
+            raise APIError({'message': f'invalid input syntax for type uuid: "{v}"', 'code': '22P02'})
+
+def _check_condition(condition: tuple):
+    if len(condition) == 2:
+        for member in condition[1]:
+            _check_condition(member)
+    else:
+        _check_uuid(*condition)
+
+class FakeQuery:
+    """Request builder covering the PostgREST subset the app uses.
+
+    Like the real builder it is chainable and does nothing until
+    :meth:`execute`. Filters are ANDed; each ``or_()`` adds one OR group,
+    which may nest ``and(...)``/``or(...)`` as in PostgREST.
+    """
+
+    def __init__(self, client: 'FakeSupabase', table_name: str):
+        self._client = client
+        self._table_name = table_name
+        self._op = 'select'
+        self._columns: Optional[List[str]] = None
+        self._payload: Any = None
+        self._count: Optional[str] = None
+        self._filters: List[Tuple[str, str, Any]] = []
+        self._or_groups: List[List[Tuple[str, str, Any]]] = []
+        self._order: List[Tuple[str, bool]] = []
+        self._limit: Optional[int] = None
+        self._offset = 0
+        self._single = False
+
+    # ---- operations ----
+
+    def select(self, *columns: str, count: Optional[str] = None, **kwargs) -> 'FakeQuery':
+        spec = ','.join(columns) if columns else '*'
+        self._columns = None if spec.strip() == '*' else [c.strip() for c in spec.split(',') if c.strip()]
+        self._count = count
+        return self
+
+    def insert(self, data, count: Optional[str] = None, upsert: bool = False, **kwargs) -> 'FakeQuery':
+        self._op = 'upsert' if upsert else 'insert'
+        self._payload = data
+        self._count = count
+        return self
+
+    def upsert(self, data, count: Optional[str] = None, **kwargs) -> 'FakeQuery':
+        return self.insert(data, count=count, upsert=True)
+
+    def update(self, data: Dict[str, Any], count: Optional[str] = None, **kwargs) -> 'FakeQuery':
+        self._op = 'update'
+        self._payload = data
+        self._count = count
+        return self
+
+    def delete(self, count: Optional[str] = None, **kwargs) -> 'FakeQuery':
+        self._op = 'delete'
+        self._count = count
+        return self
+
+    # ---- filters and modifiers ----
+
+    def _filter(self, column: str, op: str, value: Any) -> 'FakeQuery':
+        self._filters.append((column, op, value))
+        return self
+
+    def eq(self, column: str, value: Any) -> 'FakeQuery':
+        return self._filter(column, 'eq', value)
+
+    def neq(self, column: str, value: Any) -> 'FakeQuery':
+        return self._filter(column, 'neq', value)
+
+    def gt(self, column: str, value: Any) -> 'FakeQuery':
+        return self._filter(column, 'gt', value)
+
+    def gte(self, column: str, value: Any) -> 'FakeQuery':
+        return self._filter(column, 'gte', value)
+
+    def lt(self, column: str, value: Any) -> 'FakeQuery':
+        return self._filter(column, 'lt', value)
+
+    def lte(self, column: str, value: Any) -> 'FakeQuery':
+        return self._filter(column, 'lte', value)
+
+    def like(self, column: str, pattern: str) -> 'FakeQuery':
+        return self._filter(column, 'like', pattern)
+
+    def ilike(self, column: str, pattern: str) -> 'FakeQuery':
+        return self._filter(column, 'ilike', pattern)
+
+    def is_(self, column: str, value: Any) -> 'FakeQuery':
+        return self._filter(column, 'is', value)
+
+    def in_(self, column: str, values: Iterable[Any]) -> 'FakeQuery':
+        return self._filter(column, 'in', list(values))
+
+    def or_(self, filters: str, reference_table: Optional[str] = None) -> 'FakeQuery':
+        self._or_groups.append(_parse_or(filters))
+        return self
+
+    def order(self, column: str, desc: bool = False, nullsfirst: bool = False, **kwargs) -> 'FakeQuery':
+        # The real builder sends each call as its own order= parameter, and PostgREST applies only one
+        # of them; several sort columns have to go in one spec, e.g. order('updated_at,id')
+        if self._order:
+            raise APIError({'message': 'order() called more than once; pass every column in one spec',
+                            'code': 'PGRST100'})
+        # desc applies to the spec as a whole, so it ends up on the last column as in postgrest-py
+        spec = f"{column}{'.desc' if desc else ''}"
+        for part in spec.split(','):
+            name, *modifiers = part.strip().split('.')
+            self._order.append((name, 'desc' in modifiers))
+        return self
+
+    def limit(self, size: int, **kwargs) -> 'FakeQuery':
+        self._limit = size
+        return self
+
+    def range(self, start: int, end: int, **kwargs) -> 'FakeQuery':
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    def single(self) -> 'FakeQuery':
+        self._single = True
+        return self
+
+    def execute(self) -> FakeResponse:
+        for condition in self._filters:
+            _check_uuid(*condition)
+        for group in self._or_groups:
+            for condition in group:
+                _check_condition(condition)
+        return self._client._execute(self)
+
+    # ---- evaluation (called with the client lock held) ----
+
+    def matches(self, row: Dict[str, Any]) -> bool:
+        get = row.get
+        for column, op, value in self._filters:
+            if not _compare(op, get(column), value):
+                return False
+        for group in self._or_groups:
+            if not any(_holds(condition, get) for condition in group):
+                return False
+        return True
+
+    def candidate_ids(self, table: Table) -> Optional[Iterable[Any]]:
+        """Narrow the scan with an index when a filter allows it, else None (full scan)"""
+        indexes = table.indexes
+        for column, op, value in self._filters:
+            if op == 'eq' and column == table.primary_key:
+                return [value] if value in table.rows else []
+            if op == 'eq' and column in indexes:
+                return indexes[column].lookup(value)
+            if op == 'in' and column == table.primary_key:
+                return [v for v in value if v in table.rows]
+            if op == 'in' and column in indexes:
+                ids = set()
+                for v in value:
+                    ids.update(indexes[column].lookup(v))
+                return ids
+        for group in self._or_groups:
+            ids = set()
+            for condition in group:
+                found = self._condition_ids(table, condition)
+                if found is None:
+                    break
+                ids.update(found)
+            else:
+                return ids
+        return None
+
+    def _condition_ids(self, table: Table, condition: tuple) -> Optional[Iterable[Any]]:
+        """Ids that can satisfy one OR member, via an index; None if it needs a scan"""
+        if len(condition) == 2:
+            group, members = condition
+            if group == 'and':
+                for member in members:
+                    found = self._condition_ids(table, member)
+                    if found is not None:
+                        return found
+                return None
+            ids = set()
+            for member in members:
+                found = self._condition_ids(table, member)
+                if found is None:
+                    return None
+                ids.update(found)
+            return ids
+        column, op, value = condition
+        if op != 'eq':
+            return None
+        if column == table.primary_key:
+            return [value] if value in table.rows else []
+        if column in table.indexes and isinstance(table.indexes[column], HashIndex):
+            return table.indexes[column].lookup(value)
+        return None
+
+    def project(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        if self._columns is None:
+            return dict(row)
+        return {column: row.get(column) for column in self._columns}
+
+class FakeSupabase:
+    """In-process stand-in for the Supabase client, backed by indexed tables.
+
+    Implements the PostgREST subset ``app.py`` uses (``select``, ``eq``,
+    ``neq``, ``ilike``, ``or_``, ``order``, ``limit``, ``insert``,
+    ``update``, ``delete`` and a few more) over ``memory_store.Table`` with
+    hash indexes on the lookup columns in :data:`TABLE_INDEXES` and a
+    sorted ``created_at`` index, so the whole API can be benchmarked and
+    load-tested without network access.
+
+    Every ``execute()`` sleeps ``latency_ms`` plus a uniform ``jitter_ms``
+    drawn from a seeded generator, and at most ``max_connections`` calls
+    are "on the wire" at once (0 = unlimited), which roughly models a
+    remote database behind a connection pool. Inserts fill ``id`` and
+    ``created_at`` like the column defaults, and unique violations raise
+    ``postgrest.exceptions.APIError`` with code 23505.
+    """
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: int = 0,
+                 max_connections: int = 0, indexes: Optional[Dict[str, Dict[str, Any]]] = None,
+                 clock: Callable[[], datetime.datetime] = datetime.datetime.utcnow):
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.index_spec = TABLE_INDEXES if indexes is None else indexes
+        self.clock = clock
+        self.tables: Dict[str, Table] = {}
+        self.lock = threading.RLock()
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._connections = threading.BoundedSemaphore(max_connections) if max_connections > 0 else None
+
+    def table(self, table_name: str) -> FakeQuery:
+        return FakeQuery(self, table_name)
+
+    from_ = table
+
+    def rpc(self, fn: str, params: Optional[dict] = None):
+        raise APIError({'message': f'Function {fn} is not available in the fake client', 'code': 'PGRST202'})
+
+    def get_table(self, table_name: str) -> Table:
+        table = self.tables.get(table_name)
+        if table is None:
+            spec = self.index_spec.get(table_name, {})
+            indexes: Dict[str, Any] = {}
+            for column in spec.get('unique', ()):
+                indexes[column] = HashIndex(column, unique=True)
+            for column in spec.get('hash', ()):
+                indexes[column] = HashIndex(column)
+            for column in spec.get('sorted', ()):
+                indexes[f'{column}:sorted'] = SortedIndex(column)
+            table = self.tables[table_name] = Table(table_name, indexes=indexes)
+        return table
+
+    def load(self, table_name: str, rows: Iterable[Dict[str, Any]]):
+        """Bulk-load rows (no latency, no defaults beyond ``id``)"""
+        with self.lock:
+            table = self.get_table(table_name)
+            table.load(dict(row, id=row.get('id') or str(uuid.uuid4())) for row in rows)
+
+    def _wait(self):
+        if self.latency <= 0 and self.jitter <= 0:
+            return
+        with self._random_lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter > 0 else 0.0)
+        time.sleep(delay)
+
+    def _execute(self, query: FakeQuery) -> FakeResponse:
+        if self._connections is not None:
+            with self._connections:
+                self._wait()
+                return self._run(query)
+        self._wait()
+        return self._run(query)
+
+    def _run(self, query: FakeQuery) -> FakeResponse:
+        with self.lock:
+            self.calls += 1
+            table = self.get_table(query._table_name)
+            if query._op in ('insert', 'upsert'):
+                data = self._insert(table, query)
+                return FakeResponse(data, len(data) if query._count else None)
+
+            rows, total = self._select(table, query)
+            if query._op == 'update':
+                payload = dict(query._payload or {})
+                data = [self._guard(lambda: table.update(row[table.primary_key], payload)) for row in rows]
+                data = [query.project(row) for row in data if row is not None]
+            elif query._op == 'delete':
+                data = [query.project(table.delete(row[table.primary_key])) for row in rows]
+            else:
+                data = [query.project(row) for row in rows]
+
+            if query._single:
+                if len(data) != 1:
+                    raise APIError({'message': 'JSON object requested, multiple (or no) rows returned',
+                                    'code': 'PGRST116'})
+                return FakeResponse(data[0], total)
+            return FakeResponse(data, total if query._count else None)
+
+    def _select(self, table: Table, query: FakeQuery) -> Tuple[List[Dict[str, Any]], int]:
+        """Matching rows after order/offset/limit, plus the total before limiting"""
+        mutating = query._op in ('update', 'delete')
+        limit = None if mutating else query._limit
+        offset = 0 if mutating else query._offset
+        candidates = query.candidate_ids(table)
+
+        # Walk a sorted index and stop once the page is full, unless an index
+        # already narrowed the rows to few enough to sort
+        if candidates is not None and not isinstance(candidates, (list, set)):
+            candidates = list(candidates)
+        order = query._order
+        # The sorted index breaks ties by primary key, so ORDER BY col, id can walk it too
+        walkable = len(order) == 1 or (len(order) == 2 and order[1] == (table.primary_key, order[0][1]))
+        if (order and walkable and not query._count
+                and f'{order[0][0]}:sorted' in table.indexes
+                and (candidates is None or (limit is not None and len(candidates) > SORT_SCAN_THRESHOLD))):
+            column, desc = order[0]
+            # Start at a gt/gte bound on the sort column instead of the first row
+            start, inclusive = None, False
+            for filter_column, op, value in query._filters:
+                if filter_column == column and op in ('gt', 'gte') and (start is None or value > start):
+                    start, inclusive = value, op == 'gte'
+            matched = []
+            want = None if limit is None else offset + limit
+            for row in table.ordered(f'{column}:sorted', descending=desc, start=start, inclusive=inclusive):
+                if query.matches(row):
+                    matched.append(row)
+                    if want is not None and len(matched) >= want:
+                        break
+            return matched[offset:], len(matched)
+
+        rows_by_id = table.rows
+        if candidates is None:
+            matched = [row for row in rows_by_id.values() if query.matches(row)]
+        else:
+            matched = [rows_by_id[i] for i in candidates if i in rows_by_id and query.matches(rows_by_id[i])]
+        for column, desc in reversed(query._order):
+            # Postgres puts NULLs last ascending and first descending
+            matched.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+        total = len(matched)
+        end = None if limit is None else offset + limit
+        return matched[offset:end], total
+
+    def _insert(self, table: Table, query: FakeQuery) -> List[Dict[str, Any]]:
+        payload = query._payload
+        rows = payload if isinstance(payload, list) else [payload]
+        now = self.clock().isoformat()
+        prepared = []
+        for row in rows:
+            row = dict(row)
+            row.setdefault('id', str(uuid.uuid4()))
+            row.setdefault('created_at', now)
+            prepared.append(row)
+
+        inserted = []
+        if query._op == 'upsert':
+            for row in prepared:
+                if row['id'] in table:
+                    inserted.append(self._guard(lambda: table.update(row['id'], row)))
+                else:
+                    inserted.append(self._guard(lambda: table.insert(row)))
+            return [query.project(row) for row in inserted]
+
+        # A multi-row insert is one statement: all rows or none
+        try:
+            for row in prepared:
+                inserted.append(self._guard(lambda: table.insert(row)))
+        except APIError:
+            for row in inserted:
+                table.delete(row[table.primary_key])
+            raise
+        return [query.project(row) for row in inserted]
+
+    @staticmethod
+    def _guard(write: Callable[[], Any]) -> Any:
+        try:
+            return write()
+        except KeyError as e:
+            raise APIError({'message': f'duplicate key value violates unique constraint: {e}', 'code': '23505'})
@@ -0,0 +1,207 @@
+import csv
+import math
+import os
+import re
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Any, Tuple
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gazetteer_in.csv')
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+# Posts store the geohash cell of this precision (about 39 x 20 km) in geo_cell
+CELL_PRECISION = 4
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+_NOISE_RE = re.compile(r'\b(district|dist|city|town|mandal|taluk|tehsil)\b\.?')
+
+class Place(NamedTuple):
+    name: str
+    state: str
+    latitude: float
+    longitude: float
+
+def _normalize(text: str) -> str:
+    return ' '.join(_NOISE_RE.sub(' ', text.lower().replace('.', ' ')).split())
+
+class Gazetteer:
+    """Offline place-name lookup, loaded from a ``name,state,latitude,longitude,aliases`` CSV.
+
+    :meth:`geocode` takes free-text post locations such as ``"Guntur,
+    Andhra Pradesh"`` or ``"near Nasik"``. It tries each comma-separated
+    part, then each run of words, against names and aliases. A state named
+    in the text breaks ties between places of the same name.
+    """
+
+    def __init__(self, places: Iterable[Tuple[Place, Iterable[str]]]):
+        self.places: List[Place] = []
+        self._by_name: Dict[str, List[Place]] = {}
+        self._states = set()
+        for place, aliases in places:
+            self.places.append(place)
+            self._states.add(_normalize(place.state))
+            for name in (place.name, *aliases):
+                self._by_name.setdefault(_normalize(name), []).append(place)
+
+    @classmethod
+    def load(cls, path: str = GAZETTEER_PATH) -> 'Gazetteer':
+        with open(path, newline='', encoding='utf-8') as f:
+            return cls((Place(row['name'], row['state'], float(row['latitude']), float(row['longitude'])),
+                        [alias for alias in (row.get('aliases') or '').split('|') if alias])
+                       for row in csv.DictReader(f))
+
+    def geocode(self, text: Optional[str]) -> Optional[Place]:
+        if not text:
+            return None
+        parts = [_normalize(part) for part in text.split(',')]
+        states = {part for part in parts if part in self._states}
+        for part in parts:
+            found = self._match(part, states)
+            if found is not None:
+                return found
+        # "Tomato farm near Guntur": look for the longest run of words that is a place
+        words = ' '.join(parts).split()
+        for size in range(min(len(words), 4), 0, -1):
+            for start in range(len(words) - size + 1):
+                found = self._match(' '.join(words[start:start + size]), states)
+                if found is not None:
+                    return found
+        return None
+
+    def _match(self, name: str, states: set) -> Optional[Place]:
+        candidates = self._by_name.get(name)
+        if not candidates:
+            return None
+        for place in candidates:
+            if _normalize(place.state) in states:
+                return place
+        return candidates[0]
+
+_gazetteer: Optional[Gazetteer] = None
+
+def gazetteer() -> Gazetteer:
+    """The shipped gazetteer, loaded on first use"""
+    global _gazetteer
+    if _gazetteer is None:
+        _gazetteer = Gazetteer.load()
+    return _gazetteer
+
+def geocode(text: Optional[str]) -> Optional[Place]:
+    return gazetteer().geocode(text)
+
+def _cell_size(precision: int) -> Tuple[float, float]:
+    """(height, width) of a geohash cell in degrees"""
+    bits = 5 * precision
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** ((bits + 1) // 2)
+
+def geohash(latitude: float, longitude: float, precision: int = CELL_PRECISION) -> str:
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        # Bits alternate, longitude first
+        span, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (span[0] + span[1]) / 2
+        value <<= 1
+        if coordinate >= mid:
+            value |= 1
+            span[0] = mid
+        else:
+            span[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+def location_columns(location: Optional[str]) -> Dict[str, Any]:
+    """``latitude``/``longitude``/``geo_cell`` for a post's location text (all None if unknown)"""
+    place = geocode(location)
+    if place is None:
+        return {'latitude': None, 'longitude': None, 'geo_cell': None}
+    return {'latitude': place.latitude, 'longitude': place.longitude,
+            'geo_cell': geohash(place.latitude, place.longitude)}
+
+def distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle (haversine) distance"""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+def radius_bbox(latitude: float, longitude: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """(min_lat, min_lon, max_lat, max_lon) enclosing a circle"""
+    dlat = radius_km / KM_PER_DEGREE
+    dlon = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+    return (max(latitude - dlat, -90.0), max(longitude - dlon, -180.0),
+            min(latitude + dlat, 90.0), min(longitude + dlon, 180.0))
+
+def _cell_ranges(bbox: Tuple[float, float, float, float], precision: int) -> Tuple[range, range]:
+    min_lat, min_lon, max_lat, max_lon = bbox
+    height, width = _cell_size(precision)
+    rows = range(int((min_lat + 90) // height), int((min(max_lat, 89.999999) + 90) // height) + 1)
+    cols = range(int((min_lon + 180) // width), int((min(max_lon, 179.999999) + 180) // width) + 1)
+    return rows, cols
+
+def covering_cells(bbox: Tuple[float, float, float, float], precision: int = CELL_PRECISION) -> List[str]:
+    """Geohash cells that together cover ``bbox``"""
+    rows, cols = _cell_ranges(bbox, precision)
+    height, width = _cell_size(precision)
+    return [geohash(-90 + (row + 0.5) * height, -180 + (col + 0.5) * width, precision)
+            for row in rows for col in cols]
+
+def cell_count(bbox: Tuple[float, float, float, float], precision: int = CELL_PRECISION) -> int:
+    """How many cells :func:`covering_cells` would return, without building them"""
+    rows, cols = _cell_ranges(bbox, precision)
+    return len(rows) * len(cols)
+
+class Area(NamedTuple):
+    """A search area: a circle (``radius_km`` set) or a bounding box, with its centre"""
+    latitude: float
+    longitude: float
+    radius_km: Optional[float]
+    bbox: Tuple[float, float, float, float]
+    place: Optional[Place]
+
+    def contains(self, latitude: float, longitude: float) -> Optional[float]:
+        """Distance from the centre in km, or None if the point is outside"""
+        distance = distance_km(self.latitude, self.longitude, latitude, longitude)
+        if self.radius_km is not None:
+            return distance if distance <= self.radius_km else None
+        min_lat, min_lon, max_lat, max_lon = self.bbox
+        return distance if min_lat <= latitude <= max_lat and min_lon <= longitude <= max_lon else None
+
+def _coordinate(value: Any, low: float, high: float, name: str) -> float:
+    number = float(value)
+    if not math.isfinite(number) or not low <= number <= high:
+        raise ValueError(f"{name} must be between {low:g} and {high:g}")
+    return number
+
+def parse_area(args: Mapping[str, str], default_radius_km: float, max_radius_km: float) -> Area:
+    """Area from ``bbox=min_lat,min_lon,max_lat,max_lon``, or ``lat``/``lon`` or ``near`` plus ``radius_km``.
+
+    Raises ValueError with a message fit for a 400 response.
+    """
+    if args.get('bbox'):
+        parts = args['bbox'].split(',')
+        if len(parts) != 4:
+            raise ValueError('bbox must be min_lat,min_lon,max_lat,max_lon')
+        min_lat, max_lat = (_coordinate(parts[i], -90, 90, 'Latitude') for i in (0, 2))
+        min_lon, max_lon = (_coordinate(parts[i], -180, 180, 'Longitude') for i in (1, 3))
+        if min_lat > max_lat or min_lon > max_lon:
+            raise ValueError('bbox minimums must not exceed its maximums')
+        return Area((min_lat + max_lat) / 2, (min_lon + max_lon) / 2, None, (min_lat, min_lon, max_lat, max_lon), None)
+
+    place = None
+    if args.get('near'):
+        place = geocode(args['near'])
+        if place is None:
+            raise ValueError(f"Unknown place: {args['near']}")
+        latitude, longitude = place.latitude, place.longitude
+    elif args.get('lat') and args.get('lon'):
+        latitude = _coordinate(args['lat'], -90, 90, 'Latitude')
+        longitude = _coordinate(args['lon'], -180, 180, 'Longitude')
+    else:
+        raise ValueError('Give lat and lon, near, or bbox')
+    radius_km = float(args.get('radius_km') or default_radius_km)
+    if not 0 < radius_km <= max_radius_km:
+        raise ValueError(f"radius_km must be more than 0 and at most {max_radius_km:g}")
+    return Area(latitude, longitude, radius_km, radius_bbox(latitude, longitude, radius_km), place)
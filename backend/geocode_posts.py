@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Fill latitude/longitude/geo_cell of existing marketplace posts from their
+location text, using the shipped gazetteer (see geo.py). New and edited
+posts are geocoded by the API; this is for rows written before that.
+
+    python geocode_posts.py              # update Supabase
+    python geocode_posts.py --dry-run    # only report what would be matched
+
+Posts are grouped by location text, so there is one UPDATE per distinct
+location. ``updated_at`` is bumped so delta-feed clients pick up the
+coordinates. Locations the gazetteer does not know are listed at the end;
+add them (or an alias) to gazetteer_in.csv and run again.
+"""
+
+import argparse
+import datetime
+import os
+import sys
+from collections import Counter
+
+from geo import location_columns
+
+TABLE = 'marketplace_posts'
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    from supabase import create_client
+    load_dotenv()
+    url, key = os.environ.get('SUPABASE_URL'), os.environ.get('SUPABASE_SERVICE_KEY')
+    if not url or not key:
+        print("SUPABASE_URL and SUPABASE_SERVICE_KEY must be set")
+        sys.exit(1)
+    client = create_client(url, key)
+
+    seen, unknown, updated = set(), Counter(), 0
+    last_id = ''
+    while True:
+        query = client.table(TABLE).select('id, location').is_('geo_cell', 'null').order('id').limit(args.batch_size)
+        if last_id:
+            query = query.gt('id', last_id)
+        rows = query.execute().data or []
+        if not rows:
+            break
+        last_id = rows[-1]['id']
+        for row in rows:
+            location = row.get('location')
+            if location in seen:
+                if location in unknown:
+                    unknown[location] += 1
+                continue
+            seen.add(location)
+            columns = location_columns(location)
+            if columns['geo_cell'] is None:
+                unknown[location] += 1
+                continue
+            if args.dry_run:
+                continue
+            columns['updated_at'] = datetime.datetime.utcnow().isoformat()
+            result = client.table(TABLE).update(columns).eq('location', location).is_('geo_cell', 'null').execute()
+            updated += len(result.data or [])
+
+    print(f"{len(seen) - len(unknown)} locations matched, {updated} posts updated")
+    if unknown:
+        print(f"{len(unknown)} locations not in the gazetteer ({sum(unknown.values())} posts):")
+        for location, count in unknown.most_common(50):
+            print(f"  {count:>6}  {location}")
+
+if __name__ == '__main__':
+    main()
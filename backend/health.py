@@ -0,0 +1,123 @@
+import datetime
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+class HealthProber:
+    """Checks a dependency in the background and serves the cached verdict.
+
+    Load-balancer probes read :meth:`readiness`, which never touches the
+    database, so probe traffic does not scale with the number of instances
+    and a slow Supabase cannot make the probe itself hang. The probe runs
+    every ``interval`` seconds on a daemon thread (started lazily per
+    process, so it survives gunicorn forks). The call that starts it waits
+    up to ``first_probe_timeout`` seconds for the first result, so the
+    first probe after boot is not answered with ``unknown``.
+
+    The prober also acts as a simple circuit breaker for readiness: a single
+    failed probe does not take the instance out of rotation, but
+    ``failure_threshold`` consecutive failures open the circuit (not ready)
+    until the next success. A result older than ``stale_after``
+    seconds, e.g. a probe stuck on the network, counts as not ready.
+    """
+
+    def __init__(self, check: Callable[[], None], interval: float = 10.0,
+                 failure_threshold: int = 3, stale_after: Optional[float] = None,
+                 first_probe_timeout: float = 2.0):
+        self.check = check
+        self.interval = interval
+        self.first_probe_timeout = first_probe_timeout
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.stale_after = stale_after if stale_after is not None else interval * 3
+        self.components: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._first_probe = threading.Event()
+        self._last_ok: Optional[bool] = None
+        self._last_error: Optional[str] = None
+        self._last_checked: Optional[float] = None
+        self._last_duration: Optional[float] = None
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._ever_ok = False
+
+    def add_component(self, name: str, state: Callable[[], Dict[str, Any]]):
+        """Report extra state (e.g. a worker pool) alongside the readiness result"""
+        self.components[name] = state
+
+    def ensure_started(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._pid = os.getpid()
+                    self._first_probe = threading.Event()
+                    threading.Thread(target=self._run, args=(self._first_probe,), name='health-prober',
+                                     daemon=True).start()
+        # Returns at once after the first probe; a hung database costs at most the timeout
+        self._first_probe.wait(self.first_probe_timeout)
+
+    def _run(self, first_probe: threading.Event):
+        while True:
+            self.probe()
+            first_probe.set()
+            time.sleep(self.interval)
+
+    def probe(self):
+        started = time.monotonic()
+        error = None
+        try:
+            self.check()
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+        duration = time.monotonic() - started
+
+        with self._lock:
+            self._last_checked = time.monotonic()
+            self._last_duration = duration
+            self._last_ok = error is None
+            self._last_error = error
+            if error is None:
+                if self._opened_at is not None:
+                    logger.info('Database probe recovered; readiness circuit closed')
+                self._consecutive_failures = 0
+                self._opened_at = None
+                self._ever_ok = True
+            else:
+                self._consecutive_failures += 1
+                if self._consecutive_failures == self.failure_threshold:
+                    self._opened_at = time.monotonic()
+                    logger.warning(f"Database probe failed {self._consecutive_failures} times; readiness circuit open: {error}")
+
+    def readiness(self) -> Dict[str, Any]:
+        """Cached readiness report; ``ready`` is False until the first probe succeeds"""
+        now = time.monotonic()
+        with self._lock:
+            checked, ok = self._last_checked, self._last_ok
+            age = None if checked is None else now - checked
+            circuit = 'open' if self._opened_at is not None else 'closed'
+            report = {
+                'ready': self._ever_ok and circuit == 'closed' and age is not None and age <= self.stale_after,
+                'database': 'unknown' if ok is None else ('connected' if ok else 'error'),
+                'circuit': circuit,
+                'consecutive_failures': self._consecutive_failures,
+                'last_check_age_seconds': None if age is None else round(age, 3),
+                'last_check_duration_ms': None if self._last_duration is None else round(self._last_duration * 1000, 1),
+                'probe_interval_seconds': self.interval,
+            }
+            if self._last_error:
+                report['error'] = self._last_error
+            if age is not None and age > self.stale_after:
+                report['database'] = 'stale'
+
+        for name, state in self.components.items():
+            try:
+                report[name] = state()
+            except Exception as e:
+                report[name] = {'error': str(e)}
+        report['timestamp'] = datetime.datetime.utcnow().isoformat()
+        return report
@@ -0,0 +1,132 @@
+import hashlib
+import threading
+import time
+import logging
+from collections import OrderedDict
+from functools import wraps
+from typing import Dict, Any, Optional, Tuple
+
+from flask import request, jsonify, make_response, Response
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+class IdempotencyStore:
+    """In-memory TTL store of completed responses keyed by idempotency key.
+
+    Entries are bounded in number (oldest evicted first) and expire after
+    ``ttl_seconds``. The store is per process; under gunicorn each worker
+    keeps its own entries.
+    """
+
+    _IN_FLIGHT = object()
+
+    def __init__(self, ttl_seconds: float = 24 * 3600, max_entries: int = 10000):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _purge(self, now: float):
+        while self._entries:
+            key, (expires_at, _, _) = next(iter(self._entries.items()))
+            if expires_at > now and len(self._entries) <= self.max_entries:
+                break
+            self._entries.popitem(last=False)
+
+    def begin(self, key: str, fingerprint: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Claim a key for processing.
+
+        Returns ``('new', None)`` when the caller should run the request,
+        ``('replay', response)`` for a completed duplicate, ``('in_flight', None)``
+        while the original is still running and ``('mismatch', None)`` when
+        the key was used with a different request body.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._purge(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = (now + self.ttl, fingerprint, self._IN_FLIGHT)
+                return 'new', None
+            _, stored_fingerprint, stored = entry
+            if stored_fingerprint != fingerprint:
+                return 'mismatch', None
+            if stored is self._IN_FLIGHT:
+                return 'in_flight', None
+            return 'replay', stored
+
+    def complete(self, key: str, fingerprint: str, response: Dict[str, Any]):
+        """Record the finished response for a key"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, fingerprint, response)
+            self._entries.move_to_end(key)
+
+    def release(self, key: str):
+        """Forget a key so the request can be retried (used for failed requests)"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+def _scope() -> str:
+    """Identify the caller so keys from different users never collide"""
+    user_id = getattr(request, 'user_id', None)
+    if user_id:
+        return f"user:{user_id}"
+    return 'anonymous'
+
+def _fingerprint() -> str:
+    return hashlib.sha256(request.get_data(cache=True) or b'').hexdigest()
+
+def idempotent(store: IdempotencyStore):
+    """Decorator honoring the ``Idempotency-Key`` header on a POST route.
+
+    A retried request with the same key and body gets the recorded response
+    back (with ``Idempotent-Replayed: true``) without running the handler.
+    Server errors (5xx) are not recorded so the client can retry them. Place
+    it below ``require_auth`` so keys are scoped per user.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if not key:
+                return f(*args, **kwargs)
+            if len(key) > MAX_KEY_LENGTH:
+                return jsonify({'error': f'{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters'}), 400
+
+            store_key = f"{request.method}:{request.path}:{_scope()}:{key}"
+            fingerprint = _fingerprint()
+            state, stored = store.begin(store_key, fingerprint)
+
+            if state == 'replay':
+                response = Response(stored['body'], status=stored['status'], mimetype=stored['mimetype'])
+                response.headers[REPLAYED_HEADER] = 'true'
+                return response
+            if state == 'in_flight':
+                return jsonify({'error': 'A request with this idempotency key is already in progress'}), 409
+            if state == 'mismatch':
+                return jsonify({'error': f'{IDEMPOTENCY_HEADER} was already used with a different request body'}), 422
+
+            try:
+                response = make_response(f(*args, **kwargs))
+            except Exception:
+                store.release(store_key)
+                raise
+
+            if response.status_code >= 500:
+                store.release(store_key)
+            else:
+                store.complete(store_key, fingerprint, {
+                    'body': response.get_data(),
+                    'status': response.status_code,
+                    'mimetype': response.mimetype
+                })
+            return response
+        return decorated_function
+    return decorator
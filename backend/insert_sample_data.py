@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic FarmLink marketplace and bulk-load it.
+
+The data is deterministic: the same ``--seed`` and sizes always produce
+the same rows, ids and timestamps, so runs at different releases measure
+the same dataset. Each table has its own random stream, so changing the
+message count does not change the users or posts.
+
+- users: about 70% farmers, names and unique mobile numbers
+- user_profiles: for about 60% of users
+- marketplace_posts: farmer listings (crop, grade, quantity, mandi
+  location) and buyer requirements. A few authors post a lot (Pareto
+  weights), like a real marketplace.
+- user_chats: distinct buyer/farmer pairs, with popular farmers in more chats
+- chat_messages: heavy-tailed per chat. Most chats have a handful of
+  messages and a few have thousands.
+
+Every generated user can log in with ``--password`` (default farmlink123).
+
+Rows are streamed and never held in memory, except for the ids that later
+tables refer to. They go to one of three targets:
+
+- ``supabase``: batched upserts over PostgREST with ``--workers``
+  requests in flight. Re-running with the same seed updates the same rows.
+- ``csv``: one file per table for ``COPY ... FROM ... CSV HEADER``, the
+  fastest way to get millions of rows into Postgres.
+- ``fake``: an in-memory ``FakeSupabase``, to measure the generator itself.
+
+    python insert_sample_data.py --scale small --seed 42                 # Supabase from .env
+    python insert_sample_data.py --scale large --target csv --out /tmp/farmlink-data
+    python insert_sample_data.py --scale medium --messages 2000000 --target fake
+"""
+
+import argparse
+import bisect
+import csv
+import datetime
+import hashlib
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Tuple
+
+from geo import location_columns
+
+SCALES: Dict[str, Dict[str, int]] = {
+    'tiny': {'users': 100, 'posts': 300, 'chats': 150, 'messages': 1500},
+    'small': {'users': 1000, 'posts': 5000, 'chats': 2000, 'messages': 20000},
+    'medium': {'users': 20000, 'posts': 100000, 'chats': 50000, 'messages': 500000},
+    'large': {'users': 200000, 'posts': 1000000, 'chats': 500000, 'messages': 5000000},
+}
+
+# Load order: every table only refers to tables before it
+TABLE_ORDER = ('users', 'user_profiles', 'marketplace_posts', 'user_chats', 'chat_messages')
+
+COLUMNS: Dict[str, Tuple[str, ...]] = {
+    'users': ('id', 'name', 'email', 'password_hash', 'user_type', 'mobile', 'created_at', 'updated_at'),
+    'user_profiles': ('id', 'user_id', 'name', 'bio', 'location', 'created_at', 'updated_at'),
+    'marketplace_posts': ('id', 'user_type', 'author_id', 'crop_name', 'crop_details', 'quantity',
+                          'name', 'organization', 'requirements', 'location', 'latitude', 'longitude', 'geo_cell',
+                          'created_at', 'updated_at'),
+    'user_chats': ('id', 'user1_id', 'user2_id', 'created_at'),
+    'chat_messages': ('id', 'chat_id', 'sender_id', 'message', 'created_at'),
+}
+
+DEFAULT_END = datetime.datetime(2024, 6, 1)
+
+# crop -> (unit, min quantity, max quantity, step, price range per unit in rupees)
+CROPS: Dict[str, Tuple[str, int, int, int, Tuple[int, int]]] = {
+    'Tomatoes': ('kg', 50, 5000, 50, (8, 40)),
+    'Onions': ('quintal', 5, 500, 5, (1200, 3500)),
+    'Potatoes': ('quintal', 5, 800, 5, (900, 2200)),
+    'Basmati Rice': ('quintal', 10, 1000, 10, (3500, 6500)),
+    'Sona Masoori Rice': ('quintal', 10, 800, 10, (3000, 4800)),
+    'Wheat': ('quintal', 10, 2000, 10, (2100, 2900)),
+    'Cotton': ('quintal', 5, 600, 5, (6000, 8000)),
+    'Red Chillies': ('quintal', 2, 200, 2, (15000, 25000)),
+    'Turmeric': ('quintal', 2, 300, 2, (7000, 14000)),
+    'Groundnut': ('quintal', 5, 400, 5, (5500, 7000)),
+    'Soybean': ('quintal', 10, 800, 10, (4000, 5200)),
+    'Maize': ('quintal', 10, 1500, 10, (1800, 2400)),
+    'Sugarcane': ('tonne', 10, 500, 10, (2900, 3400)),
+    'Mangoes': ('crate', 20, 2000, 20, (600, 1800)),
+    'Bananas': ('dozen', 100, 10000, 100, (30, 70)),
+    'Grapes': ('kg', 100, 8000, 100, (40, 120)),
+    'Pomegranates': ('kg', 100, 5000, 100, (60, 180)),
+    'Coconuts': ('nut', 500, 20000, 500, (12, 30)),
+    'Cardamom': ('kg', 10, 500, 10, (1200, 2500)),
+    'Coffee Beans': ('kg', 100, 5000, 100, (180, 400)),
+    'Tur Dal': ('quintal', 5, 300, 5, (7000, 10000)),
+    'Moong': ('quintal', 5, 300, 5, (7500, 9500)),
+    'Mustard': ('quintal', 5, 500, 5, (5000, 6000)),
+    'Cauliflower': ('kg', 100, 4000, 100, (10, 35)),
+    'Okra': ('kg', 50, 2000, 50, (20, 50)),
+}
+GRADES = ('Grade A', 'Grade B', 'FAQ', 'Export quality', 'Organic certified', 'Sorted and graded')
+CROP_NOTES = ('harvested this week', 'stored in cold storage', 'pesticide-free', 'sun-dried',
+              'moisture below 12%', 'ready for pickup', 'can arrange transport', 'packed in 50 kg bags')
+
+# (city, state, weight): bigger mandi towns get more posts
+LOCATIONS: Tuple[Tuple[str, str, int], ...] = (
+    ('Guntur', 'Andhra Pradesh', 9), ('Vijayawada', 'Andhra Pradesh', 5), ('Kurnool', 'Andhra Pradesh', 3),
+    ('Hyderabad', 'Telangana', 7), ('Warangal', 'Telangana', 5), ('Nizamabad', 'Telangana', 3),
+    ('Nashik', 'Maharashtra', 9), ('Pune', 'Maharashtra', 6), ('Nagpur', 'Maharashtra', 5), ('Mumbai', 'Maharashtra', 4),
+    ('Ludhiana', 'Punjab', 7), ('Amritsar', 'Punjab', 4), ('Karnal', 'Haryana', 5), ('Hisar', 'Haryana', 3),
+    ('Indore', 'Madhya Pradesh', 7), ('Bhopal', 'Madhya Pradesh', 4), ('Ujjain', 'Madhya Pradesh', 3),
+    ('Rajkot', 'Gujarat', 6), ('Ahmedabad', 'Gujarat', 5), ('Unjha', 'Gujarat', 3),
+    ('Jaipur', 'Rajasthan', 5), ('Kota', 'Rajasthan', 4), ('Lucknow', 'Uttar Pradesh', 5),
+    ('Agra', 'Uttar Pradesh', 4), ('Meerut', 'Uttar Pradesh', 4), ('Patna', 'Bihar', 4),
+    ('Kolkata', 'West Bengal', 5), ('Bardhaman', 'West Bengal', 3), ('Cuttack', 'Odisha', 3),
+    ('Bengaluru', 'Karnataka', 6), ('Belgaum', 'Karnataka', 4), ('Hubli', 'Karnataka', 3),
+    ('Coimbatore', 'Tamil Nadu', 5), ('Madurai', 'Tamil Nadu', 4), ('Erode', 'Tamil Nadu', 3),
+    ('Kochi', 'Kerala', 3), ('Idukki', 'Kerala', 2),
+)
+
+FIRST_NAMES = ('Aarav', 'Anil', 'Anjali', 'Arjun', 'Bhavna', 'Deepak', 'Divya', 'Ganesh', 'Gurpreet', 'Harish',
+               'Jaspreet', 'Kavita', 'Kiran', 'Krishna', 'Lakshmi', 'Mahesh', 'Manoj', 'Meena', 'Mohan', 'Nandini',
+               'Naveen', 'Pooja', 'Prakash', 'Priya', 'Rahul', 'Rajesh', 'Ramesh', 'Ravi', 'Sandeep', 'Sanjay',
+               'Savita', 'Shankar', 'Sita', 'Srinivas', 'Sunita', 'Suresh', 'Swati', 'Venkat', 'Vijay', 'Yamini')
+LAST_NAMES = ('Reddy', 'Patil', 'Singh', 'Sharma', 'Yadav', 'Naidu', 'Patel', 'Kumar', 'Rao', 'Gowda',
+              'Deshmukh', 'Chauhan', 'Verma', 'Jadhav', 'Pillai', 'Nair', 'Iyer', 'Das', 'Ghosh', 'Mehta')
+ORGANIZATION_TYPES = ('Exporters', 'Traders', 'Agro Foods', 'Wholesale', 'Fresh Mart', 'Food Processing',
+                      'Hotels', 'Kitchens', 'Retail', 'Agri Ventures')
+BUYER_NEEDS = ('Need {qty} of {crop} every week', 'Looking for {qty} of {crop}, {grade}',
+               'Bulk requirement: {qty} of {crop} for export', 'Regular supply of {crop} needed, about {qty} per month',
+               'Want to buy {crop} directly from farmers, {qty}')
+FARMER_BIOS = ('Farming {acres} acres near {city}, mainly {crop}.', 'Third-generation farmer growing {crop}.',
+               'FPO member, {acres} acres under drip irrigation.', 'Growing {crop} and vegetables for local mandis.')
+BUYER_BIOS = ('Buying {crop} for our {org} business in {city}.', 'Procurement manager, sourcing {crop} across {state}.',
+              'We supply restaurants and hotels in {city}.')
+MESSAGES = ('Hello, is the {crop} still available?', 'What is your price per {unit}?', 'Can you share photos of the produce?',
+            'I can offer Rs {price} per {unit}.', 'Rs {price} per {unit} is my best price.', 'How soon can you deliver?',
+            'Transport can be arranged from {city}.', 'Okay, let us finalise {qty}.', 'Please send the moisture report.',
+            'Payment will be by bank transfer within 3 days.', 'Yes, it is available.', 'Thank you, will call you.',
+            'Can you do a trial order first?', 'Quality is {grade}.', 'Ok 👍')
+
+def _clamp_timestamp(moment: datetime.datetime, end: datetime.datetime) -> str:
+    return (moment if moment < end else end).isoformat()
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+def _cumulative(weights: Iterable[float]) -> List[float]:
+    return list(itertools.accumulate(weights))
+
+def password_hash(password: str, seed: int) -> str:
+    """werkzeug-compatible pbkdf2 hash with a salt derived from the seed (so rows stay deterministic)"""
+    salt = hashlib.sha256(f'farmlink-sample:{seed}'.encode()).hexdigest()[:16]
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 600000).hex()
+    return f'pbkdf2:sha256:600000${salt}${digest}'
+
+class MarketplaceGenerator:
+    """Deterministic row streams for every FarmLink table.
+
+    Ids, user types, join dates and popularity weights are computed up front
+    (they are needed by later tables). All other columns are produced while
+    streaming, so memory stays proportional to users + chats, not to posts
+    or messages.
+    """
+
+    def __init__(self, seed: int = 42, users: int = 1000, posts: int = 5000, chats: int = 2000,
+                 messages: int = 20000, farmer_ratio: float = 0.7, days: int = 365,
+                 end: datetime.datetime = DEFAULT_END, password: str = 'farmlink123'):
+        self.seed = seed
+        self.counts = {'users': users, 'posts': posts, 'chats': chats, 'messages': messages}
+        self.farmer_ratio = farmer_ratio
+        self.end = end
+        self.start = end - datetime.timedelta(days=days)
+        self.span = (self.end - self.start).total_seconds()
+        self.password = password
+        self._hash: Optional[str] = None
+        self._users: Optional[Dict[str, list]] = None
+        self._chats: Optional[Dict[str, list]] = None
+
+    def _rng(self, stream: str) -> random.Random:
+        return random.Random(f'{self.seed}:{stream}')
+
+    @property
+    def password_hash(self) -> str:
+        if self._hash is None:
+            self._hash = password_hash(self.password, self.seed)
+        return self._hash
+
+    # ------------------ Shared identity data ------------------
+
+    def user_index(self) -> Dict[str, list]:
+        """Ids, types, join times and Pareto popularity of every user"""
+        if self._users is None:
+            rng = self._rng('user-index')
+            count = self.counts['users']
+            ids, types, joined, weights, homes = [], [], [], [], []
+            location_cum = _cumulative(loc[2] for loc in LOCATIONS)
+            for i in range(count):
+                ids.append(_uuid(rng))
+                # Keep at least one user of each type so every table can be filled
+                if count >= 2 and i < 2:
+                    types.append('farmer' if i == 0 else 'buyer')
+                else:
+                    types.append('farmer' if rng.random() < self.farmer_ratio else 'buyer')
+                # Sign-ups accelerate over time (sqrt skews towards the end)
+                joined.append(self.start + datetime.timedelta(seconds=self.span * 0.9 * rng.random() ** 0.5))
+                weights.append(rng.paretovariate(1.2))
+                homes.append(LOCATIONS[bisect.bisect_right(location_cum, rng.random() * location_cum[-1])])
+            farmers = [i for i, t in enumerate(types) if t == 'farmer']
+            buyers = [i for i, t in enumerate(types) if t == 'buyer']
+            self._users = {
+                'ids': ids, 'types': types, 'joined': joined, 'homes': homes,
+                'farmers': farmers, 'buyers': buyers,
+                'farmer_cum': _cumulative(weights[i] for i in farmers),
+                'buyer_cum': _cumulative(weights[i] for i in buyers),
+            }
+        return self._users
+
+    def _pick(self, rng: random.Random, role: str) -> int:
+        index = self.user_index()
+        members, cum = index[f'{role}s'], index[f'{role}_cum']
+        return members[min(bisect.bisect_right(cum, rng.random() * cum[-1]), len(members) - 1)]
+
+    def _after(self, rng: random.Random, moment: datetime.datetime) -> datetime.datetime:
+        """A random time between ``moment`` and the end of the period"""
+        return moment + datetime.timedelta(seconds=(self.end - moment).total_seconds() * rng.random())
+
+    def chat_index(self) -> Dict[str, list]:
+        """Distinct buyer/farmer pairs with their start time and topic crop"""
+        if self._chats is None:
+            index = self.user_index()
+            rng = self._rng('chat-index')
+            ids, pairs, started, crops = [], [], [], []
+            seen = set()
+            crop_names = list(CROPS)
+            possible = len(index['farmers']) * len(index['buyers'])
+            target = min(self.counts['chats'], possible)
+            attempts = 0
+            while len(ids) < target and attempts < target * 20:
+                attempts += 1
+                farmer, buyer = self._pick(rng, 'farmer'), self._pick(rng, 'buyer')
+                if (buyer, farmer) in seen:
+                    continue
+                seen.add((buyer, farmer))
+                ids.append(_uuid(rng))
+                # Buyers usually open the chat; user1 is the one who started it
+                pairs.append((buyer, farmer) if rng.random() < 0.8 else (farmer, buyer))
+                started.append(self._after(rng, max(index['joined'][farmer], index['joined'][buyer])))
+                crops.append(rng.choice(crop_names))
+            self._chats = {'ids': ids, 'pairs': pairs, 'started': started, 'crops': crops}
+        return self._chats
+
+    # ------------------ Row streams ------------------
+
+    def users(self) -> Iterator[Dict[str, Any]]:
+        index = self.user_index()
+        rng = self._rng('users')
+        hashed = self.password_hash
+        for i, user_id in enumerate(index['ids']):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            created = index['joined'][i].isoformat()
+            yield {
+                'id': user_id,
+                'name': f'{first} {last}',
+                'email': f'{first.lower()}.{last.lower()}.{i}@farmlink.example',
+                'password_hash': hashed,
+                'user_type': index['types'][i],
+                'mobile': f"{rng.choice('6789')}{i:09d}",
+                'created_at': created,
+                'updated_at': created,
+            }
+
+    def user_profiles(self) -> Iterator[Dict[str, Any]]:
+        index = self.user_index()
+        rng = self._rng('user_profiles')
+        crop_names = list(CROPS)
+        for i, user_id in enumerate(index['ids']):
+            if rng.random() >= 0.6:
+                continue
+            city, state, _ = index['homes'][i]
+            template = rng.choice(FARMER_BIOS if index['types'][i] == 'farmer' else BUYER_BIOS)
+            bio = template.format(acres=rng.randint(1, 60), city=city, state=state, crop=rng.choice(crop_names).lower(),
+                                  org=rng.choice(ORGANIZATION_TYPES).lower())
+            created = self._after(rng, index['joined'][i]).isoformat()
+            yield {
+                'id': _uuid(rng),
+                'user_id': user_id,
+                'name': None,
+                'bio': bio,
+                'location': f'{city}, {state}',
+                'created_at': created,
+                'updated_at': created,
+            }
+
+    def marketplace_posts(self) -> Iterator[Dict[str, Any]]:
+        index = self.user_index()
+        rng = self._rng('marketplace_posts')
+        crop_names = list(CROPS)
+        location_cum = _cumulative(loc[2] for loc in LOCATIONS)
+        coordinates = {f'{city}, {state}': location_columns(f'{city}, {state}') for city, state, _ in LOCATIONS}
+        has_buyers = bool(index['buyers'])
+        for _ in range(self.counts['posts']):
+            role = 'buyer' if has_buyers and (not index['farmers'] or rng.random() < 0.2) else 'farmer'
+            author = self._pick(rng, role)
+            # Mostly the author's home mandi, sometimes a nearby market
+            city, state, _ = index['homes'][author] if rng.random() < 0.8 else \
+                LOCATIONS[bisect.bisect_right(location_cum, rng.random() * location_cum[-1])]
+            crop = rng.choice(crop_names)
+            unit, low, high, step, _prices = CROPS[crop]
+            quantity = f'{rng.randrange(low, high + 1, step)} {unit}'
+            created_at = self._after(rng, index['joined'][author])
+            updated_at = self._after(rng, created_at) if rng.random() < 0.15 else created_at
+            row = {
+                'id': _uuid(rng),
+                'user_type': role,
+                'author_id': index['ids'][author],
+                'crop_name': None, 'crop_details': None, 'quantity': None,
+                'name': None, 'organization': None, 'requirements': None,
+                'location': f'{city}, {state}',
+                **coordinates[f'{city}, {state}'],
+                'created_at': created_at.isoformat(),
+                'updated_at': updated_at.isoformat(),
+            }
+            grade = rng.choice(GRADES)
+            if role == 'farmer':
+                row['crop_name'] = crop
+                row['crop_details'] = f'{grade}, {rng.choice(CROP_NOTES)}'
+                row['quantity'] = quantity
+            else:
+                row['name'] = f'{rng.choice(LAST_NAMES)} {rng.choice(ORGANIZATION_TYPES)}'
+                row['organization'] = rng.choice(ORGANIZATION_TYPES)
+                row['requirements'] = rng.choice(BUYER_NEEDS).format(qty=quantity, crop=crop.lower(), grade=grade)
+            yield row
+
+    def user_chats(self) -> Iterator[Dict[str, Any]]:
+        index, chats = self.user_index(), self.chat_index()
+        for chat_id, (user1, user2), started in zip(chats['ids'], chats['pairs'], chats['started']):
+            yield {
+                'id': chat_id,
+                'user1_id': index['ids'][user1],
+                'user2_id': index['ids'][user2],
+                'created_at': started.isoformat(),
+            }
+
+    def message_counts(self) -> List[int]:
+        """Messages per chat: Pareto-distributed, summing to the requested total"""
+        chats = self.chat_index()
+        rng = self._rng('message-counts')
+        total = self.counts['messages'] if chats['ids'] else 0
+        weights = [rng.paretovariate(1.1) for _ in chats['ids']]
+        scale = total / sum(weights) if weights else 0.0
+        counts = [int(w * scale) for w in weights]
+        for _ in range(total - sum(counts)):
+            counts[rng.randrange(len(counts))] += 1
+        return counts
+
+    def chat_messages(self) -> Iterator[Dict[str, Any]]:
+        index, chats = self.user_index(), self.chat_index()
+        rng = self._rng('chat_messages')
+        end = self.end
+        for c, count in enumerate(self.message_counts()):
+            chat_id = chats['ids'][c]
+            user1, user2 = chats['pairs'][c]
+            crop = chats['crops'][c]
+            unit, low, high, step, (price_low, price_high) = CROPS[crop]
+            city = index['homes'][user2 if index['types'][user2] == 'farmer' else user1][0]
+            senders = (index['ids'][user1], index['ids'][user2])
+            moment = chats['started'][c]
+            # Busy chats are quick back-and-forth; quiet ones are spread over days
+            mean_gap = 600.0 if count > 50 else 6 * 3600.0
+            speaker = 0
+            for _ in range(count):
+                text = rng.choice(MESSAGES).format(crop=crop.lower(), unit=unit, city=city,
+                                                   price=rng.randint(price_low, price_high),
+                                                   qty=f'{rng.randrange(low, high + 1, step)} {unit}',
+                                                   grade=rng.choice(GRADES))
+                yield {
+                    'id': _uuid(rng),
+                    'chat_id': chat_id,
+                    'sender_id': senders[speaker],
+                    'message': text,
+                    'created_at': _clamp_timestamp(moment, end),
+                }
+                moment += datetime.timedelta(seconds=rng.expovariate(1.0 / mean_gap))
+                if rng.random() < 0.7:
+                    speaker = 1 - speaker
+
+    def rows(self, table: str) -> Iterator[Dict[str, Any]]:
+        return getattr(self, table)()
+
+# ------------------ Targets ------------------
+
+def batched(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    iterator = iter(rows)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+class SupabaseTarget:
+    """Batched upserts with a bounded number of requests in flight"""
+
+    def __init__(self, client, batch_size: int = 1000, workers: int = 4, retries: int = 3):
+        self.client = client
+        self.batch_size = batch_size
+        self.workers = max(1, workers)
+        self.retries = retries
+
+    def _send(self, table: str, batch: List[Dict[str, Any]]):
+        from postgrest.types import ReturnMethod
+        for attempt in range(self.retries + 1):
+            try:
+                self.client.table(table).upsert(batch, returning=ReturnMethod.minimal).execute()
+                return
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                time.sleep(0.5 * 2 ** attempt)
+
+    def write(self, table: str, rows: Iterable[Dict[str, Any]]) -> int:
+        written = 0
+        in_flight = threading.BoundedSemaphore(self.workers * 2)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = []
+            for batch in batched(rows, self.batch_size):
+                in_flight.acquire()
+                future = pool.submit(self._send, table, batch)
+                future.add_done_callback(lambda _: in_flight.release())
+                futures.append(future)
+                written += len(batch)
+                # Surface failures early instead of generating the whole table first
+                while futures and futures[0].done():
+                    futures.pop(0).result()
+            for future in futures:
+                future.result()
+        return written
+
+class CsvTarget:
+    """One ``<table>.csv`` per table, ready for ``COPY <table> FROM ... CSV HEADER``"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, table: str, rows: Iterable[Dict[str, Any]]) -> int:
+        columns = COLUMNS[table]
+        written = 0
+        with open(os.path.join(self.directory, f'{table}.csv'), 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for row in rows:
+                writer.writerow(['' if row[c] is None else row[c] for c in columns])
+                written += 1
+        return written
+
+class FakeTarget:
+    """Loads straight into a ``FakeSupabase`` (one index rebuild per table)"""
+
+    def __init__(self, fake):
+        self.fake = fake
+
+    def write(self, table: str, rows: Iterable[Dict[str, Any]]) -> int:
+        written = 0
+
+        def counted():
+            nonlocal written
+            for row in rows:
+                written += 1
+                yield row
+
+        self.fake.load(table, counted())
+        return written
+
+def populate(target, generator: MarketplaceGenerator, tables: Optional[Iterable[str]] = None,
+             report=None) -> Dict[str, int]:
+    """Stream every table (in foreign-key order) into ``target``; returns rows per table"""
+    wanted = set(tables or TABLE_ORDER)
+    written: Dict[str, int] = {}
+    for table in TABLE_ORDER:
+        if table not in wanted:
+            continue
+        started = time.perf_counter()
+        written[table] = target.write(table, generator.rows(table))
+        if report:
+            elapsed = time.perf_counter() - started
+            report(f'{table:<18} {written[table]:>10,} rows in {elapsed:7.1f}s '
+                   f'({written[table] / elapsed if elapsed else 0:,.0f} rows/s)')
+    return written
+
+def load_into_fake(fake, scale: str = 'small', seed: int = 42) -> Dict[str, int]:
+    """Fill a ``FakeSupabase`` with one of the :data:`SCALES` presets"""
+    return populate(FakeTarget(fake), MarketplaceGenerator(seed=seed, **SCALES[scale]))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--users', type=int)
+    parser.add_argument('--posts', type=int)
+    parser.add_argument('--chats', type=int)
+    parser.add_argument('--messages', type=int)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--farmer-ratio', type=float, default=0.7)
+    parser.add_argument('--days', type=int, default=365, help='history length, ending at --end')
+    parser.add_argument('--end', default=DEFAULT_END.date().isoformat(), help='last timestamp (YYYY-MM-DD)')
+    parser.add_argument('--password', default='farmlink123', help='password of every generated user')
+    parser.add_argument('--tables', nargs='+', choices=TABLE_ORDER, help='only these tables')
+    parser.add_argument('--target', choices=('supabase', 'csv', 'fake'), default='supabase')
+    parser.add_argument('--out', default='sample_data', help='directory for --target csv')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=4, help='concurrent insert requests (supabase)')
+    args = parser.parse_args()
+
+    counts = dict(SCALES[args.scale])
+    for key in counts:
+        if getattr(args, key) is not None:
+            counts[key] = getattr(args, key)
+    generator = MarketplaceGenerator(seed=args.seed, farmer_ratio=args.farmer_ratio, days=args.days,
+                                     end=datetime.datetime.fromisoformat(args.end), password=args.password, **counts)
+
+    if args.target == 'supabase':
+        from dotenv import load_dotenv
+        from supabase import create_client
+        load_dotenv()
+        url, key = os.environ.get('SUPABASE_URL'), os.environ.get('SUPABASE_SERVICE_KEY')
+        if not url or not key:
+            print("SUPABASE_URL and SUPABASE_SERVICE_KEY must be set (or use --target csv/fake)")
+            sys.exit(1)
+        target = SupabaseTarget(create_client(url, key), batch_size=args.batch_size, workers=args.workers)
+    elif args.target == 'csv':
+        target = CsvTarget(args.out)
+    else:
+        from fake_supabase import FakeSupabase
+        target = FakeTarget(FakeSupabase())
+
+    print(f"Generating {', '.join(f'{v:,} {k}' for k, v in counts.items())} (seed {args.seed}) -> {args.target}")
+    started = time.perf_counter()
+    written = populate(target, generator, args.tables, report=print)
+    elapsed = time.perf_counter() - started
+    total = sum(written.values())
+    print(f"{'total':<18} {total:>10,} rows in {elapsed:7.1f}s ({total / elapsed if elapsed else 0:,.0f} rows/s)")
+    if args.target == 'csv':
+        print(f"Load in this order with psql: \\copy <table> FROM '{args.out}/<table>.csv' CSV HEADER")
+        print(f"  {', '.join(TABLE_ORDER)}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+from operator import itemgetter
+from typing import Callable, Dict, List, Optional, Any, Iterable, Tuple
+
+from flask import Response, jsonify, request
+
+from records import Record, json_default
+
+try:
+    import msgpack
+except ImportError:  # pinned in requirements.txt; without it every client gets JSON
+    msgpack = None
+
+# ?format=columnar; anything else but "rows" (the default) is a 400
+LAYOUTS = ('rows', 'columnar')
+MSGPACK_MIMETYPE = 'application/msgpack'
+JSON_MIMETYPE = 'application/json'
+
+def to_columnar(rows: Iterable[Dict[str, Any]],
+                omit_null: Optional[Callable[[Dict[str, Any]], Iterable[str]]] = None) -> Dict[str, Any]:
+    """Rows as ``{'schemas': [[column, ...], ...], 'rows': [[schema, value, ...], ...]}``.
+
+    Column names are sent once per distinct schema instead of once per row.
+    Each row starts with the index of its schema. ``omit_null(row)`` names
+    columns that are dropped from a row's schema when they are null, such
+    as the other post type's columns. Rows usually share one or two schemas.
+    """
+    schemas: Dict[Tuple[str, ...], int] = {}
+    # Rows from one query share their keys, so the schema and getter are worked out once per shape
+    shapes: Dict[Tuple[Any, ...], Tuple[int, Callable[[Dict[str, Any]], Tuple[Any, ...]]]] = {}
+    out: List[List[Any]] = []
+    for row in rows:
+        if isinstance(row, Record):
+            row = row.to_dict()
+        skip = tuple(omit_null(row)) if omit_null is not None else ()
+        values = tuple(map(row.get, skip))
+        # True in the common case of all of them null, else which ones are
+        nulls = values.count(None) == len(values) or tuple([value is None for value in values])
+        shape_key = (tuple(row), skip, nulls)
+        shape = shapes.get(shape_key)
+        if shape is None:
+            dropped = {column for column, value in zip(skip, values) if value is None}
+            columns = tuple(key for key in row if key not in dropped)
+            index = schemas.setdefault(columns, len(schemas))
+            getter = itemgetter(*columns) if len(columns) > 1 else (lambda r, c=columns: tuple(r[k] for k in c))
+            shape = shapes[shape_key] = (index, getter)
+        out.append([shape[0], *shape[1](row)])
+    return {'schemas': [list(columns) for columns in schemas], 'rows': out}
+
+def requested_layout() -> str:
+    """``rows`` or ``columnar`` from ``?format=``; raises ValueError for anything else"""
+    layout = request.args.get('format') or 'rows'
+    if layout not in LAYOUTS:
+        raise ValueError(f"format must be one of {', '.join(LAYOUTS)}")
+    return layout
+
+def negotiated_mimetype() -> str:
+    """MessagePack if the client prefers it over JSON and ``msgpack`` is installed"""
+    if msgpack is None:
+        return JSON_MIMETYPE
+    return request.accept_mimetypes.best_match((JSON_MIMETYPE, MSGPACK_MIMETYPE), JSON_MIMETYPE)
+
+def representation() -> Tuple[str, str]:
+    """Cache-key part for the requested layout and encoding (unvalidated, never raises)"""
+    return request.args.get('format') or 'rows', negotiated_mimetype()
+
+def representation_etag(etag: str) -> str:
+    """``etag`` made distinct per representation; JSON and MessagePack share a URL"""
+    layout, mimetype = representation()
+    suffix = ('-c' if layout == 'columnar' else '') + ('-m' if mimetype == MSGPACK_MIMETYPE else '')
+    return etag + suffix
+
+def list_response(payload: Dict[str, Any], list_key: str,
+                  omit_null: Optional[Callable[[Dict[str, Any]], Iterable[str]]] = None) -> Response:
+    """``payload`` in the requested layout (``payload[list_key]`` is the list) and encoding.
+
+    Call :func:`requested_layout` first, so an invalid format is a 400.
+    """
+    layout, mimetype = representation()
+    if layout == 'columnar':
+        payload = {**payload, list_key: to_columnar(payload[list_key], omit_null), 'format': 'columnar'}
+    if mimetype == MSGPACK_MIMETYPE:
+        response = Response(msgpack.packb(payload, default=json_default), mimetype=MSGPACK_MIMETYPE)
+    else:
+        response = jsonify(payload)
+    if msgpack is not None:
+        response.vary.add('Accept')
+    return response
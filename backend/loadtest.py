@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Load test for the FarmLink API (app.py) with farmer and buyer journeys.
+
+Virtual users are started gradually over ``--ramp-up`` seconds and then
+loop through weighted journeys until ``--duration`` ends:
+
+- buyers browse and search posts, open a post (its author's profile),
+  start a chat with the farmer and exchange messages
+- farmers create and edit posts, check their listings and reply to chats
+
+Every request is timed per endpoint (route pattern). The report shows
+count, throughput, error rate and p50/p95/p99 latency. ``--output`` writes
+the same data as JSON, and ``--compare`` diffs a run against an earlier one.
+
+    # against a running server
+    python loadtest.py --base-url http://localhost:5000 --users 50 --ramp-up 10 --duration 60 --output run.json
+
+    # fully offline: app.py in-process on the fake Supabase client
+    SUPABASE_FAKE_LATENCY_MS=15 python loadtest.py --in-process --users 20 --duration 30
+
+    python loadtest.py --compare baseline.json run.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, List, Optional, Any
+
+CROPS = ['Tomatoes', 'Basmati Rice', 'Wheat', 'Cotton', 'Chillies', 'Turmeric', 'Onions', 'Mangoes', 'Groundnut', 'Maize']
+LOCATIONS = ['Guntur', 'Nashik', 'Ludhiana', 'Warangal', 'Indore', 'Coimbatore', 'Rajkot', 'Nagpur', 'Belgaum', 'Karnal']
+BUYER_TYPES = ['Exporter', 'Wholesaler', 'Food Processor', 'Retail Chain', 'Restaurant Group']
+PASSWORD = 'LoadTest#2024'
+
+# ------------------ Statistics ------------------
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+class Stats:
+    """Latencies and failures per endpoint, shared by all virtual users"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    def record(self, name: str, seconds: float, status: int, ok: bool):
+        with self.lock:
+            self.latencies[name].append(seconds)
+            self.statuses[name][status] += 1
+            if not ok:
+                self.errors[name] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        endpoints = {}
+        all_latencies: List[float] = []
+        total_errors = 0
+        with self.lock:
+            for name in sorted(self.latencies):
+                values = sorted(self.latencies[name])
+                all_latencies.extend(values)
+                total_errors += self.errors[name]
+                endpoints[name] = _describe(values, self.errors[name], elapsed)
+                endpoints[name]['statuses'] = {str(k): v for k, v in sorted(self.statuses[name].items())}
+        totals = _describe(sorted(all_latencies), total_errors, elapsed)
+        return {'elapsed_seconds': round(elapsed, 3), 'totals': totals, 'endpoints': endpoints}
+
+def _describe(values: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    count = len(values)
+    return {
+        'count': count,
+        'errors': errors,
+        'error_rate': round(errors / count, 4) if count else 0.0,
+        'rps': round(count / elapsed, 2) if elapsed > 0 else 0.0,
+        'mean_ms': round(sum(values) / count * 1000, 2) if count else 0.0,
+        'p50_ms': round(percentile(values, 50) * 1000, 2),
+        'p95_ms': round(percentile(values, 95) * 1000, 2),
+        'p99_ms': round(percentile(values, 99) * 1000, 2),
+        'max_ms': round(values[-1] * 1000, 2) if values else 0.0,
+    }
+
+# ------------------ HTTP clients ------------------
+
+class HttpClient:
+    """``requests.Session`` per virtual user (keep-alive connections)"""
+
+    def __init__(self, base_url: str, timeout: float):
+        import requests
+        self.session = requests.Session()
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def request(self, method: str, path: str, token: Optional[str] = None, json_body: Any = None):
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        response = self.session.request(method, self.base_url + path, json=json_body, headers=headers, timeout=self.timeout)
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        return response.status_code, body
+
+class InProcessClient:
+    """Calls app.py through Flask's test client; no server or network needed"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method: str, path: str, token: Optional[str] = None, json_body: Any = None):
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        response = self.client.open(path, method=method, json=json_body, headers=headers)
+        return response.status_code, response.get_json(silent=True)
+
+# ------------------ Virtual users ------------------
+
+class VirtualUser:
+    def __init__(self, index: int, role: str, client, stats: Stats, rng: random.Random, run_id: str, think_ms: float):
+        self.index = index
+        self.role = role
+        self.client = client
+        self.stats = stats
+        self.rng = rng
+        self.run_id = run_id
+        self.think = think_ms / 1000.0
+        self.token: Optional[str] = None
+        self.user_id: Optional[str] = None
+        self.my_posts: List[str] = []
+        self.chats: List[str] = []
+
+    def call(self, name: str, method: str, path: str, json_body: Any = None, expect=(200, 201)):
+        started = time.perf_counter()
+        try:
+            status, body = self.client.request(method, path, self.token, json_body)
+        except Exception:
+            status, body = 0, None
+        self.stats.record(name, time.perf_counter() - started, status, status in expect)
+        return status, body or {}
+
+    def pause(self):
+        if self.think > 0:
+            time.sleep(self.rng.expovariate(1.0 / self.think))
+
+    def sign_up(self) -> bool:
+        email = f'lt-{self.run_id}-{self.role}-{self.index}@loadtest.local'
+        contact = f'9{self.rng.randrange(10 ** 8, 10 ** 9)}'
+        self.call('POST /api/auth/register', 'POST', '/api/auth/register', {
+            'username': f'LT {self.role} {self.index}', 'email': email, 'password': PASSWORD,
+            'user_type': self.role, 'contact': contact
+        }, expect=(201, 409))
+        status, body = self.call('POST /api/auth/login', 'POST', '/api/auth/login', {'email': email, 'password': PASSWORD})
+        if status != 200:
+            return False
+        self.token = body['token']
+        self.user_id = body['user']['id']
+        return True
+
+    # ---- buyer journeys ----
+
+    def browse(self):
+        _, body = self.call('GET /api/posts', 'GET', '/api/posts?user_type=farmer')
+        self.pause()
+        crop = self.rng.choice(CROPS).split()[0]
+        self.call('GET /api/posts?search', 'GET', f'/api/posts?search={crop}')
+        self.pause()
+        self.call('GET /api/posts?location', 'GET', f'/api/posts?user_type=farmer&location={self.rng.choice(LOCATIONS)}')
+        posts = body.get('posts') or []
+        if posts:
+            post = self.rng.choice(posts[:50])
+            self.pause()
+            self.call('GET /api/users/:id/public', 'GET', f"/api/users/{post['author_id']}/public")
+            return post
+        return None
+
+    def contact_farmer(self):
+        post = self.browse()
+        if not post or post.get('author_id') == self.user_id:
+            return
+        self.pause()
+        status, body = self.call('POST /api/chats', 'POST', '/api/chats', {'other_user_id': post['author_id']})
+        chat = body.get('chat') if status in (200, 201) else None
+        if not chat:
+            return
+        self.chats.append(chat['id'])
+        self.exchange_messages(chat['id'], f"Is the {post.get('crop_name') or 'lot'} still available?")
+
+    def exchange_messages(self, chat_id: str, opener: str):
+        self.call('GET /api/chats/:id/messages', 'GET', f'/api/chats/{chat_id}/messages')
+        for text in (opener, 'What is your best price per quintal?', 'Can you deliver next week?')[:self.rng.randint(1, 3)]:
+            self.pause()
+            self.call('POST /api/chats/:id/messages', 'POST', f'/api/chats/{chat_id}/messages', {'message': text})
+
+    # ---- farmer journeys ----
+
+    def create_post(self):
+        status, body = self.call('POST /api/posts', 'POST', '/api/posts', {
+            'crop_name': self.rng.choice(CROPS),
+            'crop_details': 'Fresh harvest, graded and packed',
+            'quantity': f'{self.rng.randint(1, 200) * 10} kg',
+            'location': f'{self.rng.choice(LOCATIONS)}, India'
+        })
+        if status == 201 and body.get('post'):
+            self.my_posts.append(body['post']['id'])
+
+    def edit_post(self):
+        if not self.my_posts:
+            return self.create_post()
+        post_id = self.rng.choice(self.my_posts)
+        self.call('PUT /api/posts/:id', 'PUT', f'/api/posts/{post_id}', {'quantity': f'{self.rng.randint(1, 200) * 10} kg'})
+        if len(self.my_posts) > 5 and self.rng.random() < 0.2:
+            self.pause()
+            status, _ = self.call('DELETE /api/posts/:id', 'DELETE', f'/api/posts/{post_id}')
+            if status == 200:
+                self.my_posts.remove(post_id)
+
+    def my_listings(self):
+        self.call('GET /api/posts?author_id', 'GET', f'/api/posts?author_id={self.user_id}')
+
+    def reply_to_chats(self):
+        status, body = self.call('GET /api/chats', 'GET', '/api/chats')
+        chats = body.get('chats') or []
+        if chats:
+            chat = self.rng.choice(chats)
+            self.pause()
+            self.exchange_messages(chat['chat_id'], 'Yes, it is available.')
+
+    def journeys(self):
+        if self.role == 'buyer':
+            return [(self.browse, 5), (self.contact_farmer, 2), (self.reply_to_chats, 1)]
+        return [(self.create_post, 2), (self.edit_post, 2), (self.my_listings, 2), (self.reply_to_chats, 3), (self.browse, 1)]
+
+    def run(self, deadline: float, stop: threading.Event):
+        if not self.sign_up():
+            return
+        journeys = self.journeys()
+        actions = [j for j, _ in journeys]
+        weights = [w for _, w in journeys]
+        while not stop.is_set() and time.perf_counter() < deadline:
+            self.rng.choices(actions, weights)[0]()
+            self.pause()
+
+# ------------------ Runner ------------------
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(args) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    run_id = uuid.UUID(int=rng.getrandbits(128)).hex[:8] if args.seed is not None else uuid.uuid4().hex[:8]
+
+    if args.in_process:
+        os.environ.setdefault('SUPABASE_FAKE', 'true')
+        os.environ.setdefault('LOG_LEVEL', 'WARNING')
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        import app as backend
+        make_client = lambda: InProcessClient(backend.app)
+    else:
+        make_client = lambda: HttpClient(args.base_url, args.timeout)
+
+    stats = Stats()
+    stop = threading.Event()
+    farmers = max(1, int(round(args.users * args.farmer_ratio))) if args.users > 1 else 0
+    deadline = time.perf_counter() + args.ramp_up + args.duration
+    threads = []
+    for i in range(args.users):
+        role = 'farmer' if i < farmers else 'buyer'
+        user = VirtualUser(i, role, make_client(), stats, random.Random(rng.getrandbits(64)), run_id, args.think_ms)
+        thread = threading.Thread(target=user.run, args=(deadline, stop), name=f'vu-{i}', daemon=True)
+        threads.append(thread)
+
+    # Farmers first so buyers find posts; spread starts evenly over the ramp-up
+    stats.started = time.perf_counter()
+    try:
+        for i, thread in enumerate(threads):
+            thread.start()
+            if args.ramp_up > 0 and i < len(threads) - 1:
+                time.sleep(args.ramp_up / max(len(threads) - 1, 1))
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(0.5)
+    except KeyboardInterrupt:
+        stop.set()
+        for thread in threads:
+            thread.join(args.timeout)
+    stats.finished = time.perf_counter()
+
+    report = stats.summary()
+    report['meta'] = {
+        'timestamp': datetime.datetime.utcnow().isoformat() + 'Z',
+        'git_revision': git_revision(),
+        'target': 'in-process' if args.in_process else args.base_url,
+        'users': args.users,
+        'farmers': farmers,
+        'ramp_up_seconds': args.ramp_up,
+        'duration_seconds': args.duration,
+        'think_ms': args.think_ms,
+        'seed': args.seed,
+        'fake_latency_ms': os.environ.get('SUPABASE_FAKE_LATENCY_MS') if args.in_process else None,
+    }
+    return report
+
+def print_report(report: Dict[str, Any]):
+    meta = report['meta']
+    print(f"\n{meta['target']} @ {meta['git_revision'] or 'unknown'}: {meta['users']} users "
+          f"({meta['farmers']} farmers), {report['elapsed_seconds']:.1f}s")
+    header = f"{'endpoint':<34}{'count':>8}{'rps':>9}{'err%':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}"
+    print(header)
+    print('-' * len(header))
+    rows = list(report['endpoints'].items()) + [('TOTAL', report['totals'])]
+    for name, s in rows:
+        print(f"{name:<34}{s['count']:>8}{s['rps']:>9.1f}{s['error_rate'] * 100:>6.1f}%"
+              f"{s['p50_ms']:>9.1f}{s['p95_ms']:>9.1f}{s['p99_ms']:>9.1f}{s['max_ms']:>9.1f}")
+    print("(latencies in ms)")
+
+def compare(baseline_path: str, current_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    with open(current_path) as f:
+        current = json.load(f)
+    print(f"{'endpoint':<34}{'p95 before':>12}{'p95 after':>12}{'change':>9}{'rps before':>12}{'rps after':>11}")
+    names = sorted(set(baseline['endpoints']) | set(current['endpoints'])) + ['TOTAL']
+    for name in names:
+        before = baseline['totals'] if name == 'TOTAL' else baseline['endpoints'].get(name)
+        after = current['totals'] if name == 'TOTAL' else current['endpoints'].get(name)
+        if not before or not after:
+            print(f"{name:<34}{'(only in one run)':>24}")
+            continue
+        change = (after['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 if before['p95_ms'] else 0.0
+        print(f"{name:<34}{before['p95_ms']:>12.1f}{after['p95_ms']:>12.1f}{change:>+8.1f}%{before['rps']:>12.1f}{after['rps']:>11.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://localhost:5000')
+    parser.add_argument('--in-process', action='store_true', help='run app.py in-process (SUPABASE_FAKE) instead of over HTTP')
+    parser.add_argument('--users', type=int, default=20, help='concurrent virtual users')
+    parser.add_argument('--farmer-ratio', type=float, default=0.3)
+    parser.add_argument('--ramp-up', type=float, default=5.0, help='seconds over which users are started')
+    parser.add_argument('--duration', type=float, default=30.0, help='seconds to run after the ramp-up')
+    parser.add_argument('--think-ms', type=float, default=200.0, help='mean pause between requests (exponential)')
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--output', help='write the JSON report here')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'), help='compare two JSON reports and exit')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    report = run(args)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,451 @@
+import bisect
+import threading
+from typing import Dict, List, Optional, Any, Iterable, Iterator, Tuple, Union
+
+from records import RECORD_FACTORIES
+
+class HashIndex:
+    """Equality index mapping a field value to the ids of matching rows.
+
+    ``fields`` may name several columns (e.g. both chat participants); a row
+    is then indexed under each of their values.
+    """
+
+    def __init__(self, fields: Union[str, Tuple[str, ...]], unique: bool = False, normalize=None):
+        self.fields = (fields,) if isinstance(fields, str) else tuple(fields)
+        self.unique = unique
+        self.normalize = normalize
+        self._map: Dict[Any, Any] = {}
+
+    def _values(self, row: Dict[str, Any]) -> Iterable[Any]:
+        seen = set()
+        for field in self.fields:
+            value = row.get(field)
+            if value is None:
+                continue
+            if self.normalize:
+                value = self.normalize(value)
+            if value not in seen:
+                seen.add(value)
+                yield value
+
+    def check(self, row: Dict[str, Any], row_id: Any):
+        """Raise if adding the row would violate a unique constraint"""
+        if not self.unique:
+            return
+        for value in self._values(row):
+            existing = self._map.get(value)
+            if existing is not None and existing != row_id:
+                raise KeyError(f"Duplicate value for {'/'.join(self.fields)}: {value}")
+
+    def add(self, row: Dict[str, Any], row_id: Any):
+        for value in self._values(row):
+            if self.unique:
+                self._map[value] = row_id
+            else:
+                self._map.setdefault(value, set()).add(row_id)
+
+    def remove(self, row: Dict[str, Any], row_id: Any):
+        for value in self._values(row):
+            if self.unique:
+                if self._map.get(value) == row_id:
+                    del self._map[value]
+            else:
+                ids = self._map.get(value)
+                if ids:
+                    ids.discard(row_id)
+                    if not ids:
+                        del self._map[value]
+
+    def clear(self):
+        self._map = {}
+
+    def rebuild(self, rows: Dict[Any, Dict[str, Any]]):
+        self._map = {}
+        for row_id, row in rows.items():
+            self.add(row, row_id)
+
+    def lookup(self, value: Any) -> List[Any]:
+        if self.normalize:
+            value = self.normalize(value)
+        found = self._map.get(value)
+        if found is None:
+            return []
+        return [found] if self.unique else list(found)
+
+class SortedIndex:
+    """Ordered index on one field, optionally partitioned by another field.
+
+    Each partition keeps a sorted list of ``(value, id)`` pairs, so ordered
+    scans ("newest posts", "messages in a chat") need no sorting per request.
+    Rows are always also kept in the ``None`` partition unless ``group_by``
+    is set with ``include_all=False``.
+    """
+
+    def __init__(self, field: str, group_by: Optional[str] = None, include_all: bool = True):
+        self.field = field
+        self.group_by = group_by
+        self.include_all = include_all or group_by is None
+        self._parts: Dict[Any, List[Tuple[Any, Any]]] = {}
+
+    def _groups(self, row: Dict[str, Any]) -> List[Any]:
+        groups = []
+        if self.include_all:
+            groups.append(None)
+        if self.group_by is not None and row.get(self.group_by) is not None:
+            groups.append(row[self.group_by])
+        return groups
+
+    def check(self, row: Dict[str, Any], row_id: Any):
+        pass
+
+    def add(self, row: Dict[str, Any], row_id: Any):
+        key = (row.get(self.field) or '', row_id)
+        for group in self._groups(row):
+            bisect.insort(self._parts.setdefault(group, []), key)
+
+    def remove(self, row: Dict[str, Any], row_id: Any):
+        key = (row.get(self.field) or '', row_id)
+        for group in self._groups(row):
+            part = self._parts.get(group)
+            if not part:
+                continue
+            pos = bisect.bisect_left(part, key)
+            if pos < len(part) and part[pos] == key:
+                del part[pos]
+            if not part:
+                del self._parts[group]
+
+    def clear(self):
+        self._parts = {}
+
+    def rebuild(self, rows: Dict[Any, Dict[str, Any]]):
+        """Rebuild from scratch with one sort per partition instead of n insorts"""
+        parts: Dict[Any, List[Tuple[Any, Any]]] = {}
+        for row_id, row in rows.items():
+            key = (row.get(self.field) or '', row_id)
+            for group in self._groups(row):
+                parts.setdefault(group, []).append(key)
+        for part in parts.values():
+            part.sort()
+        self._parts = parts
+
+    def count(self, group: Any = None) -> int:
+        return len(self._parts.get(group, ()))
+
+    def scan(self, group: Any = None, descending: bool = False, start: Any = None,
+             inclusive: bool = False) -> Iterator[Any]:
+        """Yield ids in field order, optionally only those with value > ``start`` (>= if ``inclusive``)"""
+        part = self._parts.get(group, [])
+        if start is None:
+            bound = 0
+        elif inclusive:
+            bound = bisect.bisect_left(part, (start,))
+        else:
+            bound = bisect.bisect_right(part, (start, chr(0x10ffff)))
+        if descending:
+            for i in range(len(part) - 1, bound - 1, -1):
+                yield part[i][1]
+        else:
+            for i in range(bound, len(part)):
+                yield part[i][1]
+
+    def last(self, group: Any = None) -> Optional[Any]:
+        part = self._parts.get(group)
+        return part[-1][1] if part else None
+
+class Table:
+    """Rows keyed by primary key plus any number of maintained indexes.
+
+    ``row_factory`` converts rows on the way in (e.g. to compact records
+    from ``records.py``); stored rows only need ``get``/``[]``/``keys``.
+    """
+
+    def __init__(self, name: str, primary_key: str = 'id', indexes: Optional[Dict[str, Any]] = None,
+                 row_factory=None):
+        self.name = name
+        self.primary_key = primary_key
+        self.rows: Dict[Any, Dict[str, Any]] = {}
+        self.indexes: Dict[str, Any] = indexes or {}
+        self.row_factory = row_factory
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, row_id):
+        return row_id in self.rows
+
+    def get(self, row_id: Any) -> Optional[Dict[str, Any]]:
+        return self.rows.get(row_id)
+
+    def values(self) -> Iterable[Dict[str, Any]]:
+        return self.rows.values()
+
+    def insert(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        if self.row_factory:
+            row = self.row_factory(row)
+        row_id = row[self.primary_key]
+        if row_id in self.rows:
+            raise KeyError(f"Duplicate {self.name}.{self.primary_key}: {row_id}")
+        for index in self.indexes.values():
+            index.check(row, row_id)
+        self.rows[row_id] = row
+        for index in self.indexes.values():
+            index.add(row, row_id)
+        return row
+
+    def update(self, row_id: Any, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        old = self.rows.get(row_id)
+        if old is None:
+            return None
+        new = dict(old)
+        new.update(changes)
+        new[self.primary_key] = row_id
+        if self.row_factory:
+            new = self.row_factory(new)
+        for index in self.indexes.values():
+            index.check(new, row_id)
+        for index in self.indexes.values():
+            index.remove(old, row_id)
+        self.rows[row_id] = new
+        for index in self.indexes.values():
+            index.add(new, row_id)
+        return new
+
+    def delete(self, row_id: Any) -> Optional[Dict[str, Any]]:
+        old = self.rows.pop(row_id, None)
+        if old is not None:
+            for index in self.indexes.values():
+                index.remove(old, row_id)
+        return old
+
+    def clear(self):
+        self.rows.clear()
+        for index in self.indexes.values():
+            index.clear()
+
+    def load(self, rows: Iterable[Dict[str, Any]]):
+        """Bulk-add rows, then rebuild every index once (used on recovery)"""
+        factory = self.row_factory
+        for row in rows:
+            if factory:
+                row = factory(row)
+            self.rows[row[self.primary_key]] = row
+        for index in self.indexes.values():
+            index.rebuild(self.rows)
+
+    def find(self, index_name: str, value: Any) -> List[Dict[str, Any]]:
+        """Rows whose indexed value equals ``value``"""
+        return [self.rows[i] for i in self.indexes[index_name].lookup(value) if i in self.rows]
+
+    def find_one(self, index_name: str, value: Any) -> Optional[Dict[str, Any]]:
+        ids = self.indexes[index_name].lookup(value)
+        return self.rows.get(ids[0]) if ids else None
+
+    def ordered(self, index_name: str, group: Any = None, descending: bool = False, start: Any = None,
+                inclusive: bool = False) -> Iterator[Dict[str, Any]]:
+        """Rows in the order of a sorted index"""
+        for row_id in self.indexes[index_name].scan(group, descending=descending, start=start, inclusive=inclusive):
+            yield self.rows[row_id]
+
+def _lower(value: Any) -> str:
+    return str(value).lower()
+
+POST_SEARCH_FIELDS = ('crop_name', 'crop_details', 'requirements', 'organization')
+
+class MemoryStore:
+    """Indexed in-memory storage for demo mode (``app_simple.py``).
+
+    Indexes kept up to date on every write:
+
+    - users: email (unique, case-insensitive)
+    - posts: created_at, partitioned by user_type; author_id
+    - chats: participant (user1_id or user2_id)
+    - messages: created_at, partitioned by chat_id
+
+    With ``compact=True`` posts, chats and messages are held as ``__slots__``
+    records (``records.py``) instead of dicts, which uses several times less
+    memory per row; read methods then return records, which ``jsonify``
+    handles through the app's ``FastJSONProvider`` (a ``RecordJSONProvider``
+    that encodes with orjson when it is installed).
+
+    All public methods take the store lock, so one instance can be shared by
+    the threads of a Flask/gunicorn worker. Every write goes through
+    :meth:`apply`; when a ``journal`` is attached (see ``store_persistence``)
+    each applied write is also handed to it, in apply order.
+    """
+
+    def __init__(self, compact: bool = False):
+        factories = RECORD_FACTORIES if compact else {}
+        self.compact = compact
+        self.lock = threading.RLock()
+        self.users = Table('users', indexes={
+            'email': HashIndex('email', unique=True, normalize=_lower)
+        })
+        self.posts = Table('posts', indexes={
+            'created_at': SortedIndex('created_at', group_by='user_type'),
+            'author_id': HashIndex('author_id')
+        }, row_factory=factories.get('posts'))
+        self.chats = Table('chats', indexes={
+            'participant': HashIndex(('user1_id', 'user2_id'))
+        }, row_factory=factories.get('chats'))
+        self.messages = Table('messages', indexes={
+            'created_at': SortedIndex('created_at', group_by='chat_id', include_all=False)
+        }, row_factory=factories.get('messages'))
+        # Lower-cased text per post so filters don't re-lower every field per request
+        self._post_text: Dict[str, Tuple[str, str]] = {}
+        self.journal = None
+
+    @property
+    def tables(self) -> Dict[str, Table]:
+        return {'users': self.users, 'posts': self.posts, 'chats': self.chats, 'messages': self.messages}
+
+    def counts(self) -> Dict[str, int]:
+        with self.lock:
+            return {name: len(table) for name, table in self.tables.items()}
+
+    def refresh(self):
+        """Bring the store up to date with writes made elsewhere (no-op here)"""
+
+    def clear(self):
+        with self.lock:
+            for table in self.tables.values():
+                table.clear()
+            self._post_text.clear()
+
+    # ------------------ Writes ------------------
+
+    def apply(self, op: str, table_name: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Apply one write and journal it.
+
+        ``op`` is ``insert`` (``data`` is the row), ``update`` (``data`` is
+        ``{'id': ..., 'changes': {...}}``) or ``delete`` (``data`` is
+        ``{'id': ...}``). Returns the resulting row, the deleted row, or None
+        when the target row does not exist.
+        """
+        with self.lock:
+            result = self._apply(op, table_name, data)
+            if result is not None and self.journal is not None:
+                self.journal.append(op, table_name, data)
+            return result
+
+    def _apply(self, op: str, table_name: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        table = self.tables[table_name]
+        if op == 'insert':
+            result = table.insert(data)
+        elif op == 'update':
+            result = table.update(data['id'], data['changes'])
+        elif op == 'delete':
+            result = table.delete(data['id'])
+        else:
+            raise ValueError(f"Unknown store operation: {op}")
+
+        if table is self.posts and result is not None and op != 'insert':
+            self._post_text.pop(result['id'], None)
+        return result
+
+    def load(self, table_name: str, rows: Iterable[Dict[str, Any]]):
+        """Bulk-load rows into a table without journaling them"""
+        with self.lock:
+            self.tables[table_name].load(rows)
+
+    # ------------------ Users ------------------
+
+    def add_user(self, user: Dict[str, Any]) -> Dict[str, Any]:
+        return self.apply('insert', 'users', user)
+
+    def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            return self.users.get(user_id)
+
+    def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            return self.users.find_one('email', email)
+
+    # ------------------ Posts ------------------
+
+    def _text_of(self, post: Dict[str, Any]) -> Tuple[str, str]:
+        """Lower-cased (location, searchable text) of a post, computed on first use"""
+        text = self._post_text.get(post['id'])
+        if text is None:
+            searchable = '\n'.join(str(post.get(f) or '') for f in POST_SEARCH_FIELDS).lower()
+            text = (str(post.get('location') or '').lower(), searchable)
+            self._post_text[post['id']] = text
+        return text
+
+    def add_post(self, post: Dict[str, Any]) -> Dict[str, Any]:
+        return self.apply('insert', 'posts', post)
+
+    def get_post(self, post_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            return self.posts.get(post_id)
+
+    def update_post(self, post_id: str, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return self.apply('update', 'posts', {'id': post_id, 'changes': changes})
+
+    def delete_post(self, post_id: str) -> Optional[Dict[str, Any]]:
+        return self.apply('delete', 'posts', {'id': post_id})
+
+    def query_posts(self, user_type: Optional[str] = None, location: Optional[str] = None,
+                    search: Optional[str] = None, author_id: Optional[str] = None,
+                    limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        """Posts newest first, filtered like ``GET /api/posts``"""
+        location = location.lower() if location else None
+        search = search.lower() if search else None
+        with self.lock:
+            if author_id:
+                candidates = sorted(self.posts.find('author_id', author_id), key=lambda p: p['created_at'], reverse=True)
+                if user_type:
+                    candidates = [p for p in candidates if p.get('user_type') == user_type]
+            else:
+                candidates = self.posts.ordered('created_at', group=user_type or None, descending=True)
+
+            results = []
+            skipped = 0
+            for post in candidates:
+                if location or search:
+                    location_text, search_text = self._text_of(post)
+                    if location and location not in location_text:
+                        continue
+                    if search and search not in search_text:
+                        continue
+                if skipped < offset:
+                    skipped += 1
+                    continue
+                results.append(post)
+                if limit is not None and len(results) >= limit:
+                    break
+            return results
+
+    # ------------------ Chats & Messages ------------------
+
+    def add_chat(self, chat: Dict[str, Any]) -> Dict[str, Any]:
+        return self.apply('insert', 'chats', chat)
+
+    def get_chat(self, chat_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            return self.chats.get(chat_id)
+
+    def chats_for_user(self, user_id: str) -> List[Dict[str, Any]]:
+        with self.lock:
+            return self.chats.find('participant', user_id)
+
+    def chat_between(self, user1_id: str, user2_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            for chat in self.chats.find('participant', user1_id):
+                if user2_id in (chat['user1_id'], chat['user2_id']):
+                    return chat
+            return None
+
+    def add_message(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        return self.apply('insert', 'messages', message)
+
+    def messages_for_chat(self, chat_id: str, since: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Messages of a chat oldest first, optionally only those after ``since``"""
+        with self.lock:
+            return list(self.messages.ordered('created_at', group=chat_id, start=since))
+
+    def last_message(self, chat_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            message_id = self.messages.indexes['created_at'].last(chat_id)
+            return self.messages.get(message_id) if message_id else None
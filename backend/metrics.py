@@ -0,0 +1,321 @@
+import bisect
+import glob
+import json
+import logging
+import math
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+
+from flask import Flask, Response, request
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_START_KEY = 'farmlink.metrics.start'
+_DONE_KEY = 'farmlink.metrics.done'
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _labels(names: Tuple[str, ...], values: Iterable[Any], extra: str = '') -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[tuple, Any] = {}
+        self._lock = threading.Lock()
+
+    def state(self) -> List[list]:
+        with self._lock:
+            return [[list(k), v if not isinstance(v, list) else list(v)] for k, v in self._values.items()]
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, labels: tuple = (), amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+class Gauge(_Metric):
+    """Gauge; across processes values of live workers are summed"""
+    kind = 'gauge'
+
+    def inc(self, labels: tuple = (), amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, labels: tuple = (), amount: float = 1.0):
+        self.inc(labels, -amount)
+
+    def set(self, labels: tuple = (), value: float = 0.0):
+        with self._lock:
+            self._values[labels] = value
+
+class Histogram(_Metric):
+    """Histogram stored per label set as ``[count per bucket..., sum, count]``"""
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._size = len(self.buckets) + 1   # last slot is +Inf
+
+    def observe(self, labels: tuple, value: float):
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [0] * self._size + [0.0, 0]
+            entry[slot] += 1
+            entry[-2] += value
+            entry[-1] += 1
+
+class MetricsRegistry:
+    """Process-local metrics plus optional cross-process aggregation.
+
+    With ``multiproc_dir`` set (shared by all gunicorn workers), every
+    process periodically writes its state to ``<dir>/<pid>.json``; a scrape
+    on any worker merges all files. Counters and histograms from exited
+    workers are kept so totals never go backwards; gauges only count live
+    workers. Clear the directory before (re)starting the server.
+    """
+
+    def __init__(self, multiproc_dir: Optional[str] = None, flush_interval: float = 1.0):
+        self.metrics: Dict[str, _Metric] = {}
+        self.multiproc_dir = multiproc_dir
+        self.flush_interval = flush_interval
+        self._flusher: Optional[threading.Thread] = None
+        self._flusher_pid: Optional[int] = None
+        if multiproc_dir:
+            os.makedirs(multiproc_dir, exist_ok=True)
+            # Samples copied into a forked worker still belong to the parent's file
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        for metric in self.metrics.values():
+            metric._values = {}
+            metric._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    # ------------------ Multiprocess ------------------
+
+    def _state(self) -> Dict[str, Any]:
+        return {name: metric.state() for name, metric in self.metrics.items()}
+
+    def flush(self):
+        """Write this process's state to the shared directory"""
+        if not self.multiproc_dir:
+            return
+        path = os.path.join(self.multiproc_dir, f'{os.getpid()}.json')
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self._state(), f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    def ensure_flusher(self):
+        """Start the periodic flush thread (once per process, also after fork)"""
+        if not self.multiproc_dir or self._flusher_pid == os.getpid():
+            return
+        self._flusher_pid = os.getpid()
+        self._flusher = threading.Thread(target=self._run_flusher, name='metrics-flush', daemon=True)
+        self._flusher.start()
+
+    def _run_flusher(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Metrics flush failed: {e}")
+
+    def _merged_state(self) -> Dict[str, Dict[tuple, Any]]:
+        if not self.multiproc_dir:
+            return {name: {tuple(k): v for k, v in state} for name, state in self._state().items()}
+
+        self.flush()
+        merged: Dict[str, Dict[tuple, Any]] = {name: {} for name in self.metrics}
+        for path in glob.glob(os.path.join(self.multiproc_dir, '*.json')):
+            try:
+                pid = int(os.path.basename(path)[:-5])
+                with open(path) as f:
+                    state = json.load(f)
+            except (ValueError, OSError):
+                continue
+            alive = _pid_alive(pid)
+            for name, samples in state.items():
+                metric = self.metrics.get(name)
+                if metric is None or (metric.kind == 'gauge' and not alive):
+                    continue
+                target = merged[name]
+                for labels, value in samples:
+                    key = tuple(labels)
+                    if isinstance(value, list):
+                        existing = target.get(key)
+                        target[key] = value if existing is None else [a + b for a, b in zip(existing, value)]
+                    else:
+                        target[key] = target.get(key, 0.0) + value
+        return merged
+
+    # ------------------ Exposition ------------------
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        merged = self._merged_state()
+        lines: List[str] = []
+        for name, metric in self.metrics.items():
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            for labels, value in sorted(merged.get(name, {}).items()):
+                if isinstance(metric, Histogram):
+                    cumulative = 0
+                    for bound, count in zip(metric.buckets + (math.inf,), value[:-2]):
+                        cumulative += count
+                        le = 'le="' + _format_value(bound) + '"'
+                        lines.append(f'{name}_bucket{_labels(metric.labelnames, labels, le)} {cumulative}')
+                    lines.append(f'{name}_sum{_labels(metric.labelnames, labels)} {_format_value(value[-2])}')
+                    lines.append(f'{name}_count{_labels(metric.labelnames, labels)} {value[-1]}')
+                else:
+                    lines.append(f'{name}{_labels(metric.labelnames, labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class AppMetrics:
+    """HTTP and Supabase metrics for a Flask app, exposed at ``/metrics``.
+
+    Per request this costs two ``perf_counter()`` calls, one gauge update on
+    each side and a counter plus histogram update (a few microseconds). The
+    endpoint label is the route rule (``/api/posts/<post_id>``), so label
+    cardinality stays bounded.
+    """
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or MetricsRegistry()
+        r = self.registry
+        self.requests = r.counter('http_requests_total', 'HTTP requests by route, method and status',
+                                  ('method', 'endpoint', 'status'))
+        self.latency = r.histogram('http_request_duration_seconds', 'HTTP request latency by route',
+                                   ('method', 'endpoint'))
+        self.in_flight = r.gauge('http_requests_in_progress', 'HTTP requests currently being served')
+        self.query_latency = r.histogram('supabase_query_duration_seconds', 'Supabase call latency by table',
+                                         ('table', 'operation'))
+        self.query_errors = r.counter('supabase_query_errors_total', 'Failed Supabase calls by table',
+                                      ('table', 'operation'))
+        self.cache_events = r.counter('response_cache_events_total',
+                                      'Response cache hits, misses, expiries, evictions and invalidations',
+                                      ('cache', 'event'))
+        self.cache_entries = r.gauge('response_cache_entries', 'Entries held by each response cache', ('cache',))
+        self.singleflight_calls = r.counter('singleflight_calls_total',
+                                            'Coalesced reads: leaders ran the query, followers shared its result',
+                                            ('group', 'role'))
+        self.compressed_responses = r.counter('response_compression_total',
+                                              'Compressed responses; reused bodies came from a response cache',
+                                              ('encoding', 'source'))
+        self.compression_bytes = r.counter('response_compression_bytes_total',
+                                           'Response body bytes before (in) and after (out) compression',
+                                           ('encoding', 'stage'))
+
+    def init_app(self, app: Flask, path: str = '/metrics', token: Optional[str] = None):
+        app.before_request(self._before_request)
+        app.teardown_request(self._teardown_request)
+        app.after_request(self._after_request)
+
+        def metrics_endpoint():
+            if token and request.headers.get('Authorization') != f'Bearer {token}':
+                return Response('Unauthorized\n', status=401, mimetype='text/plain')
+            return Response(self.registry.render(), content_type=CONTENT_TYPE)
+
+        app.add_url_rule(path, 'metrics', metrics_endpoint, methods=['GET'])
+
+    def _before_request(self):
+        self.registry.ensure_flusher()
+        # Resolve the request proxy once per hook; LocalProxy lookups dominate otherwise
+        request._get_current_object().environ[_START_KEY] = time.perf_counter()
+        self.in_flight.inc()
+
+    def _after_request(self, response):
+        req = request._get_current_object()
+        start = req.environ.pop(_START_KEY, None)
+        if start is not None:
+            elapsed = time.perf_counter() - start
+            rule = req.url_rule
+            endpoint = rule.rule if rule is not None else '<unmatched>'
+            self.requests.inc((req.method, endpoint, str(response.status_code)))
+            self.latency.observe((req.method, endpoint), elapsed)
+            req.environ[_DONE_KEY] = True
+        return response
+
+    def _teardown_request(self, exc):
+        req = request._get_current_object()
+        environ = req.environ
+        if environ.pop(_DONE_KEY, None) is None:
+            if environ.pop(_START_KEY, None) is None:
+                return   # before_request never ran for this request
+            # after_request did not run (unhandled exception)
+            rule = req.url_rule
+            self.requests.inc((req.method, rule.rule if rule is not None else '<unmatched>', '500'))
+        self.in_flight.dec()
+
+    def observe_query(self, event):
+        """Observer for ``query_hooks.InstrumentedClient``"""
+        labels = (event.table, event.operation)
+        self.query_latency.observe(labels, event.duration)
+        if event.error is not None:
+            self.query_errors.inc(labels)
+
+    def observe_cache(self, cache, event: str, count: int = 1):
+        """Observer for ``response_cache.ResponseCache``; hit rate is hit / (hit + miss)"""
+        self.cache_events.inc((cache.name, event), count)
+        self.cache_entries.set((cache.name,), len(cache))
+
+    def observe_singleflight(self, group, role: str):
+        """Observer for ``singleflight.SingleFlight``"""
+        self.singleflight_calls.inc((group.name, role))
+
+    def observe_compression(self, compressor, encoding: str, raw: int, sent: int, reused: bool):
+        """Observer for ``compression.Compressor``"""
+        self.compressed_responses.inc((encoding, 'reused' if reused else 'compressed'))
+        self.compression_bytes.inc((encoding, 'in'), raw)
+        self.compression_bytes.inc((encoding, 'out'), sent)
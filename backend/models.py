@@ -1,8 +1,11 @@
 from datetime import datetime
 import uuid
+import logging
 from typing import Dict, List, Optional, Any
 from supabase import Client
 
+logger = logging.getLogger(__name__)
+
 class User:
     """User model for authentication and profile management"""
     
@@ -20,7 +23,7 @@ class User:
             result = self.supabase.table(self.table_name).insert(user_data).execute()
             return result.data[0] if result.data else None
         except Exception as e:
-            print(f"Error creating user: {e}")
+            logger.error(f"Error creating user: {e}")
             return None
     
     def get_by_email(self, email: str) -> Optional[Dict[str, Any]]:
@@ -29,7 +32,7 @@ class User:
             result = self.supabase.table(self.table_name).select('*').eq('email', email).execute()
             return result.data[0] if result.data else None
         except Exception as e:
-            print(f"Error getting user by email: {e}")
+            logger.error(f"Error getting user by email: {e}")
             return None
     
     def get_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
@@ -38,7 +41,7 @@ class User:
             result = self.supabase.table(self.table_name).select('*').eq('id', user_id).execute()
             return result.data[0] if result.data else None
         except Exception as e:
-            print(f"Error getting user by ID: {e}")
+            logger.error(f"Error getting user by ID: {e}")
             return None
     
     def update(self, user_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -48,7 +51,7 @@ class User:
             result = self.supabase.table(self.table_name).update(update_data).eq('id', user_id).execute()
             return result.data[0] if result.data else None
         except Exception as e:
-            print(f"Error updating user: {e}")
+            logger.error(f"Error updating user: {e}")
             return None
 
 class Profile:
@@ -66,7 +69,7 @@ class Profile:
             result = self.supabase.table(self.table_name).insert(profile_data).execute()
             return result.data[0] if result.data else None
         except Exception as e:
-            print(f"Error creating profile: {e}")
+            logger.error(f"Error creating profile: {e}")
             return None
     
     def get_by_user_id(self, user_id: str) -> Optional[Dict[str, Any]]:
@@ -75,7 +78,7 @@ class Profile:
             result = self.supabase.table(self.table_name).select('*').eq('user_id', user_id).execute()
             return result.data[0] if result.data else None
         except Exception as e:
-            print(f"Error getting profile: {e}")
+            logger.error(f"Error getting profile: {e}")
             return None
     
     def update(self, user_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -85,7 +88,7 @@ class Profile:
             result = self.supabase.table(self.table_name).update(update_data).eq('user_id', user_id).execute()
             return result.data[0] if result.data else None
         except Exception as e:
-            print(f"Error updating profile: {e}")
+            logger.error(f"Error updating profile: {e}")
             return None
 
 class Post:
@@ -105,7 +108,7 @@ class Post:
             result = self.supabase.table(self.table_name).insert(post_data).execute()
             return result.data[0] if result.data else None
         except Exception as e:
-            print(f"Error creating post: {e}")
+            logger.error(f"Error creating post: {e}")
             return None
     
     # Find this function in models.py (around line 111-129)
@@ -126,7 +129,7 @@ class Post:
             result = query.execute()
             return result.data if result.data else []
         except Exception as e:
-            print(f"Error getting posts: {e}")
+            logger.error(f"Error getting posts: {e}")
             return []
     
     def get_by_user(self, user_id: str) -> List[Dict[str, Any]]:
@@ -135,7 +138,7 @@ class Post:
             result = self.supabase.table(self.table_name).select('*').eq('author_id', user_id).order('created_at', desc=True).execute()
             return result.data if result.data else []
         except Exception as e:
-            print(f"Error getting user posts: {e}")
+            logger.error(f"Error getting user posts: {e}")
             return []
     
     def get_by_id(self, post_id: str) -> Optional[Dict[str, Any]]:
@@ -144,7 +147,7 @@ class Post:
             result = self.supabase.table(self.table_name).select('*').eq('id', post_id).execute()
             return result.data[0] if result.data else None
         except Exception as e:
-            print(f"Error getting post by ID: {e}")
+            logger.error(f"Error getting post by ID: {e}")
             return None
     
     def update(self, post_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -154,7 +157,7 @@ class Post:
             result = self.supabase.table(self.table_name).update(update_data).eq('id', post_id).execute()
             return result.data[0] if result.data else None
         except Exception as e:
-            print(f"Error updating post: {e}")
+            logger.error(f"Error updating post: {e}")
             return None
     
     def delete(self, post_id: str) -> bool:
@@ -163,7 +166,7 @@ class Post:
             result = self.supabase.table(self.table_name).delete().eq('id', post_id).execute()
             return bool(result.data)
         except Exception as e:
-            print(f"Error deleting post: {e}")
+            logger.error(f"Error deleting post: {e}")
             return False
 
 class Chat:
@@ -186,7 +189,7 @@ class Chat:
             result = self.supabase.table(self.table_name).insert(chat_data).execute()
             return result.data[0] if result.data else None
         except Exception as e:
-            print(f"Error creating chat: {e}")
+            logger.error(f"Error creating chat: {e}")
             return None
     
     def get_by_users(self, user1_id: str, user2_id: str) -> Optional[Dict[str, Any]]:
@@ -195,7 +198,7 @@ class Chat:
             result = self.supabase.table(self.table_name).select('*').or_(f"user1_id.eq.{user1_id}.and.user2_id.eq.{user2_id},user1_id.eq.{user2_id}.and.user2_id.eq.{user1_id}").execute()
             return result.data[0] if result.data else None
         except Exception as e:
-            print(f"Error getting chat by users: {e}")
+            logger.error(f"Error getting chat by users: {e}")
             return None
     
     def get_user_chats(self, user_id: str) -> List[Dict[str, Any]]:
@@ -204,7 +207,7 @@ class Chat:
             result = self.supabase.table(self.table_name).select('*').or_(f"user1_id.eq.{user_id},user2_id.eq.{user_id}").execute()
             return result.data if result.data else []
         except Exception as e:
-            print(f"Error getting user chats: {e}")
+            logger.error(f"Error getting user chats: {e}")
             return []
 
 class Message:
@@ -228,7 +231,7 @@ class Message:
             result = self.supabase.table(self.table_name).insert(message_data).execute()
             return result.data[0] if result.data else None
         except Exception as e:
-            print(f"Error creating message: {e}")
+            logger.error(f"Error creating message: {e}")
             return None
     
     def get_chat_messages(self, chat_id: str) -> List[Dict[str, Any]]:
@@ -237,7 +240,7 @@ class Message:
             result = self.supabase.table(self.table_name).select('*').eq('chat_id', chat_id).order('created_at', asc=True).execute()
             return result.data if result.data else []
         except Exception as e:
-            print(f"Error getting chat messages: {e}")
+            logger.error(f"Error getting chat messages: {e}")
             return []
     
     def get_last_message(self, chat_id: str) -> Optional[Dict[str, Any]]:
@@ -246,6 +249,6 @@ class Message:
             result = self.supabase.table(self.table_name).select('*').eq('chat_id', chat_id).order('created_at', desc=True).limit(1).execute()
             return result.data[0] if result.data else None
         except Exception as e:
-            print(f"Error getting last message: {e}")
+            logger.error(f"Error getting last message: {e}")
             return None
 
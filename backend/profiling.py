@@ -0,0 +1,179 @@
+import hmac
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+from flask import Flask, Response, request
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Profile'
+TOKEN_HEADER = 'X-Profile-Token'
+_PROFILER_KEY = 'farmlink.profiler'
+
+class StackSampler:
+    """Wall-clock sampling profiler for a single thread.
+
+    A background thread reads the target thread's current frame every
+    ``interval`` seconds and counts whole stacks. Waiting on Supabase shows
+    up as time in the HTTP client, which is usually what a slow route needs.
+    Output is the folded format (``a;b;c 12``) read by flamegraph.pl,
+    speedscope and similar tools.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.001, max_seconds: float = 30.0):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self.started = 0.0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._labels: Dict[object, str] = {}
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.elapsed = time.perf_counter() - self.started
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def _run(self):
+        deadline = self.started + self.max_seconds
+        frames = sys._current_frames
+        while not self._stop.wait(self.interval):
+            frame = frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            self.samples[tuple(stack)] += 1
+            self.sample_count += 1
+            if time.perf_counter() > deadline:
+                logger.warning(f"Profiling stopped after {self.max_seconds}s")
+                break
+
+    def folded(self) -> str:
+        lines = []
+        for stack, count in self.samples.most_common():
+            lines.append(';'.join(self._label(code) for code in reversed(stack)) + f' {count}')
+        return '\n'.join(lines) + '\n'
+
+class RequestProfiler:
+    """Profiles single requests on demand.
+
+    A request is profiled when it sends ``X-Profile: store`` (or ``1``) or
+    ``X-Profile: inline`` together with ``X-Profile-Token`` matching the
+    configured admin token; ``?__profile=store&__profile_token=...`` works
+    too. ``store`` writes ``<profile_dir>/<id>.folded`` and returns the id in
+    ``X-Profile-Id``; ``inline`` replaces the response body with the folded
+    stacks. Without a token nothing is registered on the app, so the
+    profiler costs nothing until it is configured.
+    """
+
+    def __init__(self, token: Optional[str], profile_dir: Optional[str] = None,
+                 interval_ms: float = 1.0, max_seconds: float = 30.0):
+        self.token = token
+        self.profile_dir = profile_dir or os.path.join(tempfile.gettempdir(), 'farmlink-profiles')
+        self.interval = interval_ms / 1000.0
+        self.max_seconds = max_seconds
+
+    def init_app(self, app: Flask):
+        if not self.token:
+            return
+        # Run first and finish last so other hooks are inside the profile
+        app.before_request_funcs.setdefault(None, []).insert(0, self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        logger.info(f"On-demand request profiling enabled (profiles in {self.profile_dir})")
+
+    def _requested_mode(self, req) -> Optional[str]:
+        mode = req.headers.get(PROFILE_HEADER) or req.args.get('__profile')
+        if not mode:
+            return None
+        token = req.headers.get(TOKEN_HEADER) or req.args.get('__profile_token') or ''
+        if not hmac.compare_digest(token.encode(), self.token.encode()):
+            logger.warning(f"Rejected profiling request for {req.path}: bad token")
+            return None
+        return 'inline' if mode == 'inline' else 'store'
+
+    def _before_request(self):
+        req = request._get_current_object()
+        mode = self._requested_mode(req)
+        if mode is None:
+            return
+        sampler = StackSampler(threading.get_ident(), self.interval, self.max_seconds)
+        req.environ[_PROFILER_KEY] = (sampler, mode)
+        sampler.start()
+
+    def _finish(self, req) -> Optional[Tuple[StackSampler, str]]:
+        entry = req.environ.pop(_PROFILER_KEY, None)
+        if entry is not None:
+            entry[0].stop()
+        return entry
+
+    def _after_request(self, response):
+        req = request._get_current_object()
+        entry = self._finish(req)
+        if entry is None:
+            return response
+        sampler, mode = entry
+        response.headers['X-Profile-Samples'] = str(sampler.sample_count)
+        response.headers['X-Profile-Duration-Ms'] = f'{sampler.elapsed * 1000:.1f}'
+
+        if mode == 'inline':
+            inline = Response(sampler.folded(), status=200, mimetype='text/plain')
+            inline.headers.extend(response.headers.items())
+            inline.headers['Content-Type'] = 'text/plain; charset=utf-8'
+            inline.headers['X-Profiled-Status'] = str(response.status_code)
+            # Describe the original body, not this one
+            for header in ('Content-Length', 'Content-Encoding', 'Vary'):
+                inline.headers.pop(header, None)
+            return inline
+
+        try:
+            profile_id = self.store(sampler, req)
+            response.headers['X-Profile-Id'] = profile_id
+        except OSError as e:
+            logger.error(f"Failed to store profile: {e}")
+        return response
+
+    def _teardown_request(self, exc):
+        # Unhandled exceptions skip after_request; make sure the sampler stops
+        entry = self._finish(request._get_current_object())
+        if entry is not None:
+            try:
+                self.store(entry[0], request._get_current_object())
+            except OSError as e:
+                logger.error(f"Failed to store profile: {e}")
+
+    def store(self, sampler: StackSampler, req) -> str:
+        os.makedirs(self.profile_dir, exist_ok=True)
+        endpoint = (req.url_rule.endpoint if req.url_rule is not None else 'unmatched')
+        profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{endpoint}-{uuid.uuid4().hex[:8]}"
+        path = os.path.join(self.profile_dir, f'{profile_id}.folded')
+        with open(path, 'w') as f:
+            f.write(sampler.folded())
+        logger.info(f"Stored profile of {req.method} {req.path} ({sampler.sample_count} samples): {path}")
+        return profile_id
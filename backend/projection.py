@@ -0,0 +1,35 @@
+from typing import Optional, Tuple
+
+from flask import request
+
+# Columns a client may ask for with ?fields=, per table, in select() order
+POST_FIELDS = ('id', 'user_type', 'author_id', 'crop_name', 'crop_details', 'quantity', 'name', 'organization',
+               'requirements', 'location', 'latitude', 'longitude', 'created_at', 'updated_at')
+MESSAGE_FIELDS = ('id', 'chat_id', 'sender_id', 'message', 'created_at')
+PROFILE_FIELDS = ('id', 'user_id', 'name', 'bio', 'location', 'profile_image_url', 'created_at', 'updated_at')
+
+# Always selected: ids, and the timestamps that ETags and delta watermarks are computed from
+POST_REQUIRED = ('id', 'created_at', 'updated_at')
+MESSAGE_REQUIRED = ('id', 'created_at')
+PROFILE_REQUIRED = ('id',)
+
+def requested_fields(allowed: Tuple[str, ...], required: Tuple[str, ...] = ()) -> Optional[Tuple[str, ...]]:
+    """Columns named by ``?fields=a,b`` plus ``required``, in ``allowed`` order.
+
+    ``None`` without the parameter (every column). Raises ValueError for a
+    column that is not in ``allowed``, so nothing but known column names
+    reaches ``select()``.
+    """
+    raw = request.args.get('fields')
+    if not raw:
+        return None
+    names = {name.strip() for name in raw.split(',') if name.strip()}
+    unknown = names.difference(allowed)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    names.update(required)
+    return tuple(name for name in allowed if name in names)
+
+def select_list(fields: Optional[Tuple[str, ...]]) -> str:
+    """Argument for ``select()``"""
+    return '*' if fields is None else ', '.join(fields)
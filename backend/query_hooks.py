@@ -0,0 +1,121 @@
+import time
+import logging
+from typing import Any, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+OPERATIONS = ('select', 'insert', 'update', 'upsert', 'delete', 'rpc')
+
+class QueryEvent:
+    """One executed Supabase/PostgREST query as seen by observers"""
+
+    __slots__ = ('table', 'operation', 'calls', 'duration', 'rows', 'error')
+
+    def __init__(self, table: str, operation: str, calls: List[Tuple[str, tuple]], duration: float,
+                 rows: Optional[int], error: Optional[BaseException]):
+        self.table = table
+        self.operation = operation
+        self.calls = calls
+        self.duration = duration
+        self.rows = rows
+        self.error = error
+
+    @property
+    def filters(self) -> List[str]:
+        """Builder calls after the operation, e.g. ``eq(id, 42)``"""
+        return [f"{name}({', '.join(str(a) for a in args)})" for name, args in self.calls if name not in OPERATIONS]
+
+class _QueryProxy:
+    """Wraps a postgrest request builder, remembering calls and timing ``execute()``"""
+
+    __slots__ = ('_builder', '_table', '_calls', '_client')
+
+    def __init__(self, builder, table: str, calls: List[Tuple[str, tuple]], client: 'InstrumentedClient'):
+        self._builder = builder
+        self._table = table
+        self._calls = calls
+        self._client = client
+
+    def __getattr__(self, name: str) -> Any:
+        if name == 'or_' and not hasattr(self._builder, 'or_'):
+            return self._or
+        attr = getattr(self._builder, name)
+        if name == 'execute':
+            return self._execute
+        if callable(attr):
+            def call(*args, **kwargs):
+                result = attr(*args, **kwargs)
+                if hasattr(result, 'execute'):
+                    return _QueryProxy(result, self._table, self._calls + [(name, args)], self._client)
+                return result
+            return call
+        if hasattr(attr, 'execute'):
+            # Properties such as ``not_`` return a builder too
+            return _QueryProxy(attr, self._table, self._calls + [(name, ())], self._client)
+        return attr
+
+    def _or(self, filters: str, reference_table: Optional[str] = None) -> '_QueryProxy':
+        """``or_()`` for postgrest-py releases without it (0.13, as pinned through supabase 2.0.2)"""
+        builder = self._builder
+        builder.params = builder.params.add(f'{reference_table}.or' if reference_table else 'or', f'({filters})')
+        return _QueryProxy(builder, self._table, self._calls + [('or_', (filters,))], self._client)
+
+    def _execute(self):
+        client = self._client
+        if not client.observers:
+            return self._builder.execute()
+        operation = next((name for name, _ in self._calls if name in OPERATIONS), 'select')
+        started = time.perf_counter()
+        error = None
+        result = None
+        try:
+            result = self._builder.execute()
+            return result
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            duration = time.perf_counter() - started
+            data = getattr(result, 'data', None)
+            rows = len(data) if isinstance(data, list) else (None if data is None else 1)
+            client.notify(QueryEvent(self._table, operation, self._calls, duration, rows, error))
+
+class InstrumentedClient:
+    """Supabase client wrapper that reports every ``.execute()`` to observers.
+
+    Observers are callables taking a :class:`QueryEvent`; they run on the
+    request thread right after the query, so they must be cheap and must
+    not raise (errors are logged and swallowed). Everything except
+    ``table()``/``from_()``/``rpc()`` is passed through to the real client.
+    """
+
+    def __init__(self, client):
+        self._client = client
+        self.observers: List[Callable[[QueryEvent], None]] = []
+
+    def add_observer(self, observer: Callable[[QueryEvent], None]):
+        self.observers.append(observer)
+
+    def notify(self, event: QueryEvent):
+        for observer in self.observers:
+            try:
+                observer(event)
+            except Exception as e:
+                logger.error(f"Query observer failed: {e}")
+
+    def table(self, table_name: str):
+        return _QueryProxy(self._client.table(table_name), table_name, [], self)
+
+    from_ = table
+
+    def rpc(self, fn: str, params: Optional[dict] = None):
+        return _QueryProxy(self._client.rpc(fn, params or {}), f"rpc:{fn}", [('rpc', (fn,))], self)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+def instrument_client(client) -> Optional[InstrumentedClient]:
+    """Wrap a Supabase client (None stays None)"""
+    if client is None or isinstance(client, InstrumentedClient):
+        return client
+    return InstrumentedClient(client)
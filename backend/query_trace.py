@@ -0,0 +1,162 @@
+import json
+import logging
+import time
+from typing import Dict, List, Optional, Any, Callable
+
+from flask import Flask, current_app, has_request_context, request
+
+from query_hooks import InstrumentedClient, QueryEvent
+
+logger = logging.getLogger(__name__)
+
+TRACE_KEY = 'farmlink.query_trace'
+CAPTURE_KEY = 'farmlink.query_trace.capture'
+DEBUG_HEADER = 'X-Query-Trace'
+
+def query_budget(max_queries: int):
+    """Declare how many Supabase round trips a route may make per request.
+
+    Exceeding the budget logs a warning at runtime, and
+    :func:`assert_query_budget` turns it into a test failure.
+    """
+    def decorator(f):
+        f.query_budget = max_queries
+        return f
+    return decorator
+
+class QueryTrace:
+    """Queries executed while serving one request"""
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.endpoint: Optional[str] = None
+        self.budget: Optional[int] = None
+        self.events: List[QueryEvent] = []
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    @property
+    def db_time(self) -> float:
+        return sum(e.duration for e in self.events)
+
+    @property
+    def total_time(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and len(self.events) > self.budget
+
+    def server_timing(self) -> str:
+        return (f'db;dur={self.db_time * 1000:.2f};desc="{len(self.events)} queries", '
+                f'app;dur={self.total_time * 1000:.2f}')
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'endpoint': self.endpoint,
+            'query_count': len(self.events),
+            'budget': self.budget,
+            'db_ms': round(self.db_time * 1000, 3),
+            'total_ms': round(self.total_time * 1000, 3),
+            'queries': [{
+                'table': e.table,
+                'operation': e.operation,
+                'filters': e.filters,
+                'rows': e.rows,
+                'duration_ms': round(e.duration * 1000, 3),
+                'error': None if e.error is None else str(e.error)
+            } for e in self.events]
+        }
+
+    def describe(self) -> str:
+        lines = [f"{self.method} {self.path} made {len(self.events)} queries (budget {self.budget}):"]
+        for e in self.events:
+            lines.append(f"  {e.operation} {e.table} {' '.join(e.filters)} -> {e.rows} rows")
+        return '\n'.join(lines)
+
+class QueryTracer:
+    """Collects a :class:`QueryTrace` per request from an instrumented client.
+
+    Every response gets a ``Server-Timing`` header (query count and time
+    spent in Supabase). With ``debug`` on, sending ``X-Query-Trace: 1``
+    adds the full trace to JSON object responses under ``_query_trace``;
+    keep it off in production since it exposes filters.
+    """
+
+    def __init__(self, server_timing: bool = True, debug: bool = False):
+        self.server_timing = server_timing
+        self.debug = debug
+
+    def init_app(self, app: Flask, client: Optional[InstrumentedClient]):
+        if client is not None:
+            client.add_observer(self.observe_query)
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    def observe_query(self, event: QueryEvent):
+        if not has_request_context():
+            return   # e.g. write-queue flush threads
+        trace = request.environ.get(TRACE_KEY)
+        if trace is not None:
+            trace.events.append(event)
+
+    def _before_request(self):
+        req = request._get_current_object()
+        trace = QueryTrace(req.method, req.path)
+        view = req.url_rule and req.url_rule.endpoint
+        trace.endpoint = view
+        trace.budget = getattr(_view_function(view), 'query_budget', None)
+        req.environ[TRACE_KEY] = trace
+
+    def _after_request(self, response):
+        req = request._get_current_object()
+        trace = req.environ.get(TRACE_KEY)
+        if trace is None:
+            return response
+        trace.finished = time.perf_counter()
+
+        if trace.over_budget:
+            logger.warning(trace.describe())
+        if self.server_timing:
+            response.headers.add('Server-Timing', trace.server_timing())
+        if self.debug and req.headers.get(DEBUG_HEADER) == '1' and response.is_json:
+            body = response.get_json(silent=True)
+            if isinstance(body, dict):
+                body['_query_trace'] = trace.to_dict()
+                response.set_data(json.dumps(body, default=str))
+
+        capture = req.environ.get(CAPTURE_KEY)
+        if capture is not None:
+            capture.append(trace)
+        return response
+
+def _view_function(endpoint: Optional[str]) -> Optional[Callable]:
+    if not endpoint:
+        return None
+    return current_app.view_functions.get(endpoint)
+
+def assert_query_budget(app: Flask, method: str, path: str, max_queries: Optional[int] = None, **kwargs):
+    """Make a test request and fail if it used more queries than allowed.
+
+    The limit is ``max_queries`` or else the route's ``@query_budget``;
+    routes without either fail, so new routes must declare one. Extra
+    keyword arguments go to ``app.test_client().open`` (``json``,
+    ``headers`` ...). Returns ``(response, trace)``.
+    """
+    captured: List[QueryTrace] = []
+    environ = dict(kwargs.pop('environ_overrides', {}), **{CAPTURE_KEY: captured})
+    response = app.test_client().open(path, method=method, environ_overrides=environ, **kwargs)
+    if not captured:
+        raise AssertionError(f"No query trace recorded for {method} {path}; is QueryTracer installed?")
+    trace = captured[-1]
+    limit = max_queries if max_queries is not None else trace.budget
+    if limit is None:
+        raise AssertionError(f"{method} {path} ({trace.endpoint}) has no @query_budget")
+    if len(trace) > limit:
+        trace.budget = limit
+        raise AssertionError(trace.describe())
+    return response, trace
@@ -0,0 +1,242 @@
+import datetime
+import uuid
+from decimal import Decimal
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # FastJSONProvider falls back to the stdlib encoder
+    orjson = None
+
+_UNSET = object()
+
+class Record:
+    """Compact, dict-compatible row backed by ``__slots__``.
+
+    A slot that was never assigned behaves like a missing key, so a record
+    round-trips the exact keys of the row it was built from. Keys without a
+    slot are kept in ``_extra`` (``None`` when there are none, which is the
+    common case). Records support ``row['field']``, ``row.get()``, ``in``,
+    ``keys()``/``items()`` and ``dict(row)``, so code written against plain
+    dict rows keeps working.
+    """
+
+    __slots__ = ('_extra',)
+    FIELDS: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> 'Record':
+        record = cls.__new__(cls)
+        extra = None
+        fields = cls._field_set
+        for key, value in row.items():
+            if key in fields:
+                object.__setattr__(record, key, value)
+            elif value is not None:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        object.__setattr__(record, '_extra', extra)
+        return record
+
+    def to_dict(self, omit_none: bool = False) -> Dict[str, Any]:
+        """Plain dict of the set fields, ready for ``json.dumps``"""
+        result = {}
+        for field in self.FIELDS:
+            value = getattr(self, field, _UNSET)
+            if value is _UNSET or (omit_none and value is None):
+                continue
+            result[field] = value
+        if self._extra:
+            result.update(self._extra)
+        return result
+
+    def keys(self) -> List[str]:
+        return list(self.to_dict())
+
+    def items(self) -> Iterable[Tuple[str, Any]]:
+        return self.to_dict().items()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key, _UNSET) if key in self._field_set else _UNSET
+        if value is _UNSET:
+            return self._extra.get(key, default) if self._extra else default
+        return value
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _UNSET)
+        if value is _UNSET:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _UNSET) is not _UNSET
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __eq__(self, other):
+        if isinstance(other, (Record, dict)):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._field_set = frozenset(cls.FIELDS)
+
+Record._field_set = frozenset()
+
+POST_COMMON_FIELDS = ('id', 'user_type', 'author_id', 'location', 'price', 'unit', 'status',
+                      'views', 'created_at', 'updated_at')
+FARMER_POST_FIELDS = ('crop_name', 'crop_details', 'quantity')
+BUYER_POST_FIELDS = ('name', 'organization', 'requirements')
+
+def post_null_columns(row: Dict[str, Any]) -> Tuple[str, ...]:
+    """The other post type's columns, which are always null for this row's type"""
+    user_type = row.get('user_type')
+    if user_type == 'farmer':
+        return BUYER_POST_FIELDS
+    if user_type == 'buyer':
+        return FARMER_POST_FIELDS
+    return ()
+
+class FarmerPostRecord(Record):
+    """Marketplace post by a farmer (no slots for the buyer-only columns)"""
+    FIELDS = POST_COMMON_FIELDS + FARMER_POST_FIELDS
+    __slots__ = FIELDS
+
+class BuyerPostRecord(Record):
+    """Marketplace post by a buyer (no slots for the farmer-only columns)"""
+    FIELDS = POST_COMMON_FIELDS + BUYER_POST_FIELDS
+    __slots__ = FIELDS
+
+class ChatRecord(Record):
+    """Conversation between two users"""
+    FIELDS = ('id', 'user1_id', 'user2_id', 'created_at', 'updated_at')
+    __slots__ = FIELDS
+
+class MessageRecord(Record):
+    """Single chat message"""
+    FIELDS = ('id', 'chat_id', 'sender_id', 'message', 'message_type', 'is_read', 'created_at')
+    __slots__ = FIELDS
+
+def post_record(row: Dict[str, Any]) -> Record:
+    """Build the post record type matching the row's ``user_type``"""
+    if isinstance(row, Record):
+        row = row.to_dict()
+    if row.get('user_type') == 'buyer':
+        return BuyerPostRecord.from_row(row)
+    return FarmerPostRecord.from_row(row)
+
+def chat_record(row: Dict[str, Any]) -> Record:
+    return ChatRecord.from_row(row.to_dict() if isinstance(row, Record) else row)
+
+def message_record(row: Dict[str, Any]) -> Record:
+    return MessageRecord.from_row(row.to_dict() if isinstance(row, Record) else row)
+
+# Factories per MemoryStore table name
+RECORD_FACTORIES = {
+    'posts': post_record,
+    'chats': chat_record,
+    'messages': message_record
+}
+
+def to_plain(value: Any) -> Any:
+    """Convert records (also inside lists) to plain dicts"""
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [v.to_dict() if isinstance(v, Record) else v for v in value]
+    return value
+
+def json_default(obj: Any) -> Any:
+    """``default`` hook for ``json.dumps`` understanding records and common scalars"""
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class RecordJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes records directly in ``jsonify``"""
+
+    @staticmethod
+    def default(o: Any) -> Any:
+        if isinstance(o, Record):
+            return o.to_dict()
+        return DefaultJSONProvider.default(o)
+
+def _orjson_default(obj: Any) -> Any:
+    # orjson handles datetime, UUID and dataclasses itself
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class FastJSONProvider(RecordJSONProvider):
+    """JSON provider that encodes with orjson when it is installed.
+
+    Output matches the stdlib provider's (sorted keys, compact unless in
+    debug), except that non-ASCII text is sent as UTF-8 instead of
+    ``\\u`` escapes, and dates are ISO 8601 as in :func:`json_default`
+    rather than HTTP dates. Without orjson, or for values orjson rejects
+    (integers beyond 64 bits, unusual ``dumps`` arguments), the stdlib
+    encoder is used. ``response()`` builds the body as bytes, skipping the
+    str round trip.
+    """
+
+    default = staticmethod(json_default)
+    enabled = orjson is not None
+
+    def _options(self, indent: Optional[int]) -> int:
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def _encode(self, obj: Any, indent: Optional[int] = None) -> Optional[bytes]:
+        try:
+            return orjson.dumps(obj, default=_orjson_default, option=self._options(indent))
+        except TypeError:
+            # orjson.JSONEncodeError subclasses TypeError; the stdlib either manages or raises the real error
+            return None
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        indent = kwargs.pop('indent', None)
+        separators = kwargs.pop('separators', None)
+        if self.enabled and not kwargs and indent in (None, 2) and separators in (None, (',', ':')):
+            encoded = self._encode(obj, indent)
+            if encoded is not None:
+                return encoded.decode()
+        if indent is not None:
+            kwargs['indent'] = indent
+        if separators is not None:
+            kwargs['separators'] = separators
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        if not self.enabled:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = 2 if (self.compact is None and self._app.debug) or self.compact is False else None
+        encoded = self._encode(obj, indent)
+        if encoded is None:
+            dump_args = {'indent': indent} if indent else {'separators': (',', ':')}
+            encoded = DefaultJSONProvider.dumps(self, obj, **dump_args).encode()
+        return self._app.response_class(encoded + b'\n', mimetype=self.mimetype)
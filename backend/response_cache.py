@@ -0,0 +1,175 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Any, Tuple
+
+from flask import Response, make_response, request
+
+from compression import VARIANTS_KEY
+from conditional import DEFER_KEY, matches, not_modified
+
+logger = logging.getLogger(__name__)
+
+CACHE_HEADER = 'X-Cache'
+CACHE_EVENTS = ('hit', 'miss', 'expired', 'evicted', 'invalidated')
+
+class ResponseCache:
+    """In-memory TTL + LRU cache of rendered responses.
+
+    Entries are bounded by count (``max_entries``) and total body size
+    (``max_bytes``); the least recently used entry is evicted first.
+    Compressed variants kept with an entry are not counted in ``max_bytes``.
+    :meth:`invalidate` drops everything and bumps a generation counter, so
+    a response computed before the invalidation cannot be stored after it.
+
+    The cache is per process; under gunicorn other workers only see a write
+    once their own entries expire, so ``ttl_seconds`` bounds staleness.
+    """
+
+    def __init__(self, name: str, ttl_seconds: float = 30.0, max_entries: int = 1000,
+                 max_bytes: int = 64 * 1024 * 1024):
+        self.name = name
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.generation = 0
+        self.observers: List[Callable[['ResponseCache', str, int], None]] = []
+        self.counts: Dict[str, int] = dict.fromkeys(CACHE_EVENTS, 0)
+        self._entries: "OrderedDict[Any, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def add_observer(self, observer: Callable[['ResponseCache', str, int], None]):
+        """Called with ``(cache, event, count)`` for the events in :data:`CACHE_EVENTS`"""
+        self.observers.append(observer)
+
+    def _notify(self, event: str, amount: int = 1):
+        self.counts[event] += amount
+        for observer in self.observers:
+            try:
+                observer(self, event, amount)
+            except Exception as e:
+                logger.error(f"Cache observer failed: {e}")
+
+    def get(self, key: Any) -> Optional[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                self._remove(key)
+                entry = None
+                event = 'expired'
+            elif entry is not None:
+                self._entries.move_to_end(key)
+                event = 'hit'
+            else:
+                event = 'miss'
+        if event == 'expired':
+            self._notify('expired')
+            event = 'miss'
+        self._notify(event)
+        return entry[1] if entry is not None else None
+
+    def put(self, key: Any, value: Dict[str, Any], generation: int):
+        """Store ``value`` unless the cache was invalidated since ``generation`` was read"""
+        size = len(value['body'])
+        if size > self.max_bytes:
+            return
+        evicted = 0
+        with self._lock:
+            if generation != self.generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                evicted += 1
+        if evicted:
+            self._notify('evicted', evicted)
+
+    def _remove(self, key: Any):
+        _, value = self._entries.pop(key)
+        self._bytes -= len(value['body'])
+
+    def invalidate(self):
+        """Drop every entry, e.g. after a write that could change any cached result"""
+        with self._lock:
+            self.generation += 1
+            dropped = len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+        self._notify('invalidated')
+        if dropped:
+            logger.debug(f"Cache {self.name} invalidated ({dropped} entries)")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = len(self._entries), self._bytes
+        lookups = self.counts['hit'] + self.counts['miss']
+        return {
+            'entries': entries,
+            'bytes': size,
+            'hit_rate': round(self.counts['hit'] / lookups, 4) if lookups else None,
+            **self.counts,
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+def cached_response(cache: Optional[ResponseCache], key: Callable[[], Any]):
+    """Serve a GET route from ``cache``, keyed by ``key()`` (computed from the request).
+
+    Only 200 responses are stored. The body is stored already serialized,
+    so a hit skips both the database and JSON encoding. Responses carry
+    ``X-Cache: HIT`` or ``MISS``. Requests with ``Cache-Control: no-cache``
+    bypass the lookup but still refresh the entry. With ``cache=None`` the
+    route is left undecorated.
+
+    If the view sets an ETag (see :mod:`conditional`), it is stored with the
+    body, and a matching ``If-None-Match`` gets a 304 on hits and misses alike.
+    Compressed bodies (see :mod:`compression`) are kept with the entry too.
+    """
+    def decorator(f):
+        if cache is None:
+            return f
+
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            cache_key = key()
+            if 'no-cache' not in request.headers.get('Cache-Control', ''):
+                stored = cache.get(cache_key)
+                if stored is not None:
+                    if matches(stored['etag']):
+                        response = not_modified(stored['etag'])
+                    else:
+                        response = Response(stored['body'], status=200, mimetype=stored['mimetype'])
+                        request._get_current_object().environ[VARIANTS_KEY] = stored['variants']
+                        if stored['etag']:
+                            response.set_etag(stored['etag'], weak=True)
+                            response.headers['Cache-Control'] = 'no-cache'
+                        if stored['vary']:
+                            response.headers['Vary'] = stored['vary']
+                    response.headers[CACHE_HEADER] = 'HIT'
+                    return response
+
+            generation = cache.generation
+            environ = request._get_current_object().environ
+            # The view must render the full body so it can be cached; the 304 is decided here
+            environ[DEFER_KEY] = True
+            response = make_response(f(*args, **kwargs))
+            etag = response.get_etag()[0]
+            if response.status_code == 200 and not response.direct_passthrough:
+                stored = {'body': response.get_data(), 'mimetype': response.mimetype, 'etag': etag,
+                          'vary': response.headers.get('Vary'), 'variants': {}}
+                cache.put(cache_key, stored, generation)
+                environ[VARIANTS_KEY] = stored['variants']
+                if matches(etag):
+                    response = not_modified(etag)
+            response.headers[CACHE_HEADER] = 'MISS'
+            return response
+        return decorated_function
+    return decorator
@@ -0,0 +1,244 @@
+import re
+from typing import Dict, List, Optional, Any, Callable, Iterable, Tuple
+
+# Patterns are compiled once at import time and shared by every schema
+EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+PHONE_RE = re.compile(r'^[0-9]{10}$')
+USERNAME_RE = re.compile(r'^[a-zA-Z0-9_]+$')
+QUANTITY_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)')
+UPPER_RE = re.compile(r'[A-Z]')
+LOWER_RE = re.compile(r'[a-z]')
+DIGIT_RE = re.compile(r'[0-9]')
+SPECIAL_RE = re.compile(r'[!@#$%^&*(),.?":{}|<>]')
+
+# A check gets (value, errors, warnings) and appends messages
+Check = Callable[[Any, List[str], List[str]], None]
+
+class Field:
+    """Declarative rules for one input field.
+
+    Rules are turned into a flat tuple of small check functions by
+    :meth:`compile`, so validating a value never rebuilds maps or regexes.
+    """
+
+    def __init__(self, name: str, label: Optional[str] = None, required: bool = False,
+                 pattern: Optional[re.Pattern] = None, pattern_message: Optional[str] = None,
+                 min_length: Optional[int] = None, max_length: Optional[int] = None,
+                 min_length_message: Optional[str] = None, max_length_message: Optional[str] = None,
+                 choices: Optional[Iterable[str]] = None, choices_message: Optional[str] = None,
+                 positive_number: bool = False, warn_shorter_than: Optional[int] = None,
+                 warn_message: Optional[str] = None, extra_checks: Tuple[Check, ...] = (),
+                 required_message: Optional[str] = None, empty_message: Optional[str] = None,
+                 strip: bool = False):
+        self.name = name
+        self.strip = strip
+        self.label = label or name.title()
+        self.required = required
+        self.required_message = required_message or f"{self.label} is required"
+        self.empty_message = empty_message or f"{self.label} cannot be empty"
+        self.pattern = pattern
+        self.pattern_message = pattern_message or f"Invalid {self.label.lower()} format"
+        self.min_length = min_length
+        self.max_length = max_length
+        self.min_length_message = min_length_message or f"{self.label} must be at least {min_length} characters long"
+        self.max_length_message = max_length_message or f"{self.label} must be less than {max_length} characters"
+        self.choices = frozenset(choices) if choices else None
+        self.choices_message = choices_message or f"{self.label} must be one of: {', '.join(sorted(self.choices or ()))}"
+        self.positive_number = positive_number
+        self.warn_shorter_than = warn_shorter_than
+        self.warn_message = warn_message
+        self.extra_checks = extra_checks
+
+    def compile(self) -> Tuple[Check, ...]:
+        checks: List[Check] = []
+
+        if self.min_length is not None or self.max_length is not None:
+            min_length, max_length, strip = self.min_length, self.max_length, self.strip
+            min_message, max_message = self.min_length_message, self.max_length_message
+
+            def check_length(value, errors, warnings):
+                value = str(value)
+                length = len(value.strip()) if strip else len(value)
+                if min_length is not None and length < min_length:
+                    errors.append(min_message)
+                if max_length is not None and length > max_length:
+                    errors.append(max_message)
+            checks.append(check_length)
+
+        if self.pattern is not None:
+            match = self.pattern.match
+            pattern_message, strip = self.pattern_message, self.strip
+
+            def check_pattern(value, errors, warnings):
+                if not isinstance(value, str) or match(value.strip() if strip else value) is None:
+                    errors.append(pattern_message)
+            checks.append(check_pattern)
+
+        if self.choices is not None:
+            choices, choices_message = self.choices, self.choices_message
+
+            def check_choices(value, errors, warnings):
+                if value not in choices:
+                    errors.append(choices_message)
+            checks.append(check_choices)
+
+        if self.positive_number:
+            number_match = QUANTITY_RE.match
+            label = self.label
+
+            def check_positive_number(value, errors, warnings):
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    number = value
+                else:
+                    found = number_match(str(value))
+                    if found is None:
+                        errors.append(f"{label} must be a valid number")
+                        return
+                    number = float(found.group(1))
+                if number <= 0:
+                    errors.append(f"{label} must be a positive number")
+            checks.append(check_positive_number)
+
+        if self.warn_shorter_than is not None:
+            threshold, warn_message = self.warn_shorter_than, self.warn_message
+
+            def check_warn_length(value, errors, warnings):
+                if isinstance(value, str) and len(value.strip()) < threshold:
+                    warnings.append(warn_message)
+            checks.append(check_warn_length)
+
+        checks.extend(self.extra_checks)
+        return tuple(checks)
+
+class Schema:
+    """A set of fields compiled once into ``(name, required, checks)`` entries"""
+
+    def __init__(self, name: str, fields: Iterable[Field]):
+        self.name = name
+        self.fields = tuple(fields)
+        self._compiled = tuple(
+            (f.name, f.required, f.required_message, f.empty_message, f.compile())
+            for f in self.fields
+        )
+        self.field_names = frozenset(f.name for f in self.fields)
+
+    def validate(self, data: Optional[Dict[str, Any]], partial: bool = False) -> Dict[str, Any]:
+        """Validate one record; ``partial`` skips required checks for absent fields (updates)"""
+        errors: List[str] = []
+        warnings: List[str] = []
+        if not isinstance(data, dict):
+            return {'valid': False, 'errors': ['Request body must be a JSON object'], 'warnings': []}
+
+        get = data.get
+        for name, required, required_message, empty_message, checks in self._compiled:
+            value = get(name)
+            if not value:
+                if required and not (partial and name not in data):
+                    errors.append(required_message)
+                continue
+            if isinstance(value, str) and not value.strip():
+                if required:
+                    errors.append(empty_message)
+                continue
+            for check in checks:
+                check(value, errors, warnings)
+
+        return {'valid': not errors, 'errors': errors, 'warnings': warnings}
+
+    def validate_many(self, records: Iterable[Dict[str, Any]], partial: bool = False) -> Dict[str, Any]:
+        """Validate a batch in one pass, collecting every error per record"""
+        validate = self.validate
+        results = []
+        invalid = 0
+        total = 0
+        for index, record in enumerate(records):
+            total += 1
+            result = validate(record, partial)
+            if not result['valid']:
+                invalid += 1
+            if result['errors'] or result['warnings']:
+                results.append({'index': index, **result})
+        return {
+            'valid': invalid == 0,
+            'total': total,
+            'valid_count': total - invalid,
+            'invalid_count': invalid,
+            'results': results
+        }
+
+    def first_error(self, data: Optional[Dict[str, Any]], partial: bool = False) -> Optional[Dict[str, Any]]:
+        """Error payload for a route (``{'error': ..., 'errors': [...]}``) or None when valid"""
+        result = self.validate(data, partial)
+        if result['valid']:
+            return None
+        return {'error': result['errors'][0], 'errors': result['errors']}
+
+def _password_strength(value, errors, warnings):
+    if not UPPER_RE.search(value):
+        warnings.append('Consider adding uppercase letters')
+    if not LOWER_RE.search(value):
+        warnings.append('Consider adding lowercase letters')
+    if not DIGIT_RE.search(value):
+        warnings.append('Consider adding numbers')
+    if not SPECIAL_RE.search(value):
+        warnings.append('Consider adding special characters')
+
+_USER_TYPE = dict(choices=('farmer', 'buyer'), choices_message='User type must be either "farmer" or "buyer"')
+_EMAIL = dict(pattern=EMAIL_RE, pattern_message='Invalid email format')
+_CONTACT = dict(pattern=PHONE_RE, pattern_message='Phone number must be 10 digits')
+_PASSWORD = dict(min_length=8, min_length_message='Password must be at least 8 characters long')
+
+# Full user validation (utils.validate_user_data)
+USER_SCHEMA = Schema('user', [
+    Field('username', required=True, strip=True, min_length=3, max_length=50,
+          min_length_message='Username must be at least 3 characters long',
+          max_length_message='Username must be less than 50 characters',
+          pattern=USERNAME_RE, pattern_message='Username can only contain letters, numbers, and underscores'),
+    Field('email', required=True, **_EMAIL),
+    Field('password', required=True, extra_checks=(_password_strength,), **_PASSWORD),
+    Field('user_type', label='User_Type', required=True, **_USER_TYPE),
+    Field('contact', required=True, **_CONTACT),
+])
+
+# POST /api/auth/register: display names may contain spaces, so no username charset rule
+REGISTER_SCHEMA = Schema('register', [
+    Field('username', required=True, strip=True, max_length=100, max_length_message='Username must be less than 100 characters'),
+    Field('email', required=True, **_EMAIL),
+    Field('password', required=True, **_PASSWORD),
+    Field('user_type', label='User type', required=True, **_USER_TYPE),
+    Field('contact', required=True, **_CONTACT),
+])
+
+LOGIN_SCHEMA = Schema('login', [
+    Field('email', required=True, required_message='Email and password are required'),
+    Field('password', required=True, required_message='Email and password are required'),
+])
+
+_LOCATION = dict(warn_shorter_than=3, warn_message='Location should be more specific')
+
+# Length limits on post fields match their VARCHAR widths in create_tables.sql
+FARMER_POST_SCHEMA = Schema('farmer_post', [
+    Field('crop_name', label='Crop Name', required=True, strip=True, max_length=100),
+    Field('crop_details', label='Crop Details', required=True),
+    Field('quantity', label='Quantity', required=True, positive_number=True),
+    Field('location', label='Location', required=True, strip=True, max_length=100, **_LOCATION),
+])
+
+BUYER_POST_SCHEMA = Schema('buyer_post', [
+    Field('name', label='Organization Name', required=True, strip=True, max_length=100),
+    Field('organization', label='Organization Type', required=True, strip=True, max_length=100),
+    Field('requirements', label='Requirements', required=True,
+          warn_shorter_than=10, warn_message='Requirements should be more detailed'),
+    Field('location', label='Location', required=True, strip=True, max_length=100, **_LOCATION),
+])
+
+MESSAGE_SCHEMA = Schema('message', [
+    Field('message', required=True, required_message='Message text is required'),
+])
+
+CHAT_SCHEMA = Schema('chat', [
+    Field('other_user_id', required=True, required_message='Missing other_user_id'),
+])
+
+def post_schema(user_type: str) -> Schema:
+    return FARMER_POST_SCHEMA if user_type == 'farmer' else BUYER_POST_SCHEMA
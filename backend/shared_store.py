@@ -0,0 +1,202 @@
+import fcntl
+import json
+import logging
+import mmap
+import os
+import struct
+from typing import Dict, Optional, Any, Tuple
+
+from memory_store import MemoryStore
+from records import json_default
+
+logger = logging.getLogger(__name__)
+
+SHARED_MAGIC = b'FLSHM02\n'
+_HEADER = struct.Struct('<8sQQ')   # magic, committed end offset, compaction epoch
+_STATE = struct.Struct('<QQ')
+_LENGTH = struct.Struct('<I')
+COMPACT_CHUNK_ROWS = 5000
+
+class SharedStoreFull(RuntimeError):
+    """Raised when the live rows alone leave no room in the shared segment for another write"""
+
+class SharedMemoryStore(MemoryStore):
+    """``MemoryStore`` whose writes are shared by every worker process.
+
+    All processes map the same file (``/dev/shm`` by default, i.e. shared
+    memory) holding an append-only sequence of length-prefixed writes and a
+    header with the committed end offset. Each process keeps its own indexed
+    replica and a cursor into the segment:
+
+    - Reads call :meth:`refresh` (once per request in ``app_simple``). When
+      the committed offset equals the local cursor, which is the common case,
+      this is a single lock-free 8-byte read; otherwise the new writes are
+      applied to the local replica first.
+    - Writes take the process lock and an exclusive ``flock`` on the segment,
+      catch up, validate and apply locally (so unique constraints such as
+      email see every worker's users), append the record and only then
+      publish the new end offset.
+
+    When a write does not fit, the writer compacts the segment under the
+    exclusive ``flock``: the live rows of its replica are rewritten from the
+    start as bulk ``load`` records and the epoch in the header is bumped.
+    Other processes see the new epoch, take a shared ``flock`` while
+    reading the segment, and rebuild their replica from it. Updates and
+    deletes therefore only use space until the next compaction;
+    :class:`SharedStoreFull` means the live rows alone fill the segment.
+
+    A user registered on one gunicorn worker can therefore log in on any
+    other, and reads scale across cores without a central server.
+    """
+
+    def __init__(self, path: str, capacity: int = 512 * 1024 * 1024, compact: bool = False):
+        super().__init__(compact=compact)
+        self.path = path
+        self.capacity = capacity
+        self._fd = -1
+        self._pid = None
+        self._cursor = _HEADER.size
+        self._epoch = 0
+        self.compactions = 0
+        self.mm: Optional[mmap.mmap] = None
+        self._open()
+        self.refresh()
+
+    def _open(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._pid = os.getpid()
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            size = os.fstat(self._fd).st_size
+            if size < _HEADER.size:
+                os.ftruncate(self._fd, self.capacity)
+                size = self.capacity
+                os.pwrite(self._fd, _HEADER.pack(SHARED_MAGIC, _HEADER.size, 0), 0)
+            if self.mm is None:
+                self.mm = mmap.mmap(self._fd, size)
+                self.capacity = size
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+        magic = _HEADER.unpack_from(self.mm, 0)[0]
+        if magic != SHARED_MAGIC:
+            raise ValueError(f"{self.path} is not a shared demo store segment (or one of an older format; delete it)")
+
+    def _ensure_process(self):
+        """Reopen the segment after fork so flock excludes sibling workers"""
+        if self._pid != os.getpid():
+            self._open()
+
+    def _state(self) -> Tuple[int, int]:
+        """(committed end offset, compaction epoch)"""
+        return _STATE.unpack_from(self.mm, len(SHARED_MAGIC))
+
+    def _committed(self) -> int:
+        return self._state()[0]
+
+    def _publish(self, end: int, epoch: int):
+        self.mm[len(SHARED_MAGIC):_HEADER.size] = _STATE.pack(end, epoch)
+
+    def _catch_up(self):
+        """Apply the segment's new records; call with the ``flock`` held (shared or exclusive)"""
+        end, epoch = self._state()
+        if epoch != self._epoch:
+            # Another process compacted the segment: rebuild the replica from its start
+            self.clear()
+            self._cursor = _HEADER.size
+            self._epoch = epoch
+        offset = self._cursor
+        mm = self.mm
+        while offset < end:
+            (length,) = _LENGTH.unpack_from(mm, offset)
+            offset += _LENGTH.size
+            op, table_name, data = json.loads(mm[offset:offset + length])
+            offset += length
+            if op == 'load':
+                self.load(table_name, data)
+                continue
+            try:
+                self._apply(op, table_name, data)
+            except KeyError as e:
+                logger.warning(f"Skipping conflicting shared write {op} {table_name}: {e}")
+        self._cursor = offset
+
+    def refresh(self):
+        """Apply writes made by other processes since the last call"""
+        if self._state() == (self._cursor, self._epoch):
+            return
+        with self.lock:
+            self._ensure_process()
+            # Shared lock: a compaction rewrites the bytes being read
+            fcntl.flock(self._fd, fcntl.LOCK_SH)
+            try:
+                self._catch_up()
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _compact(self) -> int:
+        """Rewrite the segment as the replica's live rows; call with the exclusive ``flock`` held"""
+        records = []
+        for table_name, table in self.tables.items():
+            rows = list(table.values())
+            for start in range(0, len(rows), COMPACT_CHUNK_ROWS):
+                records.append(json.dumps(['load', table_name, rows[start:start + COMPACT_CHUNK_ROWS]],
+                                          separators=(',', ':'), default=json_default).encode())
+        size = sum(_LENGTH.size + len(record) for record in records)
+        if _HEADER.size + size > self.capacity:
+            raise SharedStoreFull(f"Shared demo store {self.path} is full: live rows take {size} of {self.capacity} bytes")
+
+        epoch = self._epoch + 1
+        # Publish an empty segment first, so a crash part-way leaves an empty store rather than a torn one
+        self._publish(_HEADER.size, epoch)
+        offset = _HEADER.size
+        for record in records:
+            self.mm[offset:offset + _LENGTH.size] = _LENGTH.pack(len(record))
+            self.mm[offset + _LENGTH.size:offset + _LENGTH.size + len(record)] = record
+            offset += _LENGTH.size + len(record)
+        self._publish(offset, epoch)
+        self._cursor, self._epoch = offset, epoch
+        self.compactions += 1
+        logger.info(f"Compacted shared demo store {self.path} to {offset} bytes (epoch {epoch})")
+        return offset
+
+    def apply(self, op: str, table_name: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        record = json.dumps([op, table_name, data], separators=(',', ':'), default=json_default).encode()
+        with self.lock:
+            self._ensure_process()
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                self._catch_up()
+                end = self._cursor
+                if end + _LENGTH.size + len(record) > self.capacity:
+                    end = self._compact()
+                    if end + _LENGTH.size + len(record) > self.capacity:
+                        raise SharedStoreFull(f"Shared demo store {self.path} is full ({self.capacity} bytes)")
+
+                result = self._apply(op, table_name, data)
+                if result is None:
+                    return None
+
+                self.mm[end:end + _LENGTH.size] = _LENGTH.pack(len(record))
+                self.mm[end + _LENGTH.size:end + _LENGTH.size + len(record)] = record
+                new_end = end + _LENGTH.size + len(record)
+                # Publish only after the record bytes are in place
+                self._publish(new_end, self._epoch)
+                self._cursor = new_end
+                return result
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def segment_usage(self) -> Dict[str, int]:
+        end, epoch = self._state()
+        return {'used_bytes': end, 'capacity_bytes': self.capacity, 'epoch': epoch}
+
+    def close(self):
+        if self.mm is not None:
+            self.mm.close()
+            self.mm = None
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
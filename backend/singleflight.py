@@ -0,0 +1,99 @@
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Any, Hashable
+
+logger = logging.getLogger(__name__)
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'followers')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+class SingleFlight:
+    """Coalesces concurrent identical reads into one upstream call.
+
+    The first caller for a key (the leader) runs the function. Callers that
+    arrive with the same key while it is running (followers) wait for it
+    and get the same result, or the same exception. Once the call finishes,
+    the key is free again; nothing is cached.
+
+    Results are shared between threads, so callers must treat them as
+    read-only. After a write, call :meth:`forget` so that later readers
+    start a fresh call instead of joining one that may predate the write.
+    A follower that waits longer than ``wait_timeout`` seconds gives up and
+    runs the function itself.
+    """
+
+    def __init__(self, name: str, wait_timeout: Optional[float] = None):
+        self.name = name
+        self.wait_timeout = wait_timeout
+        self.observers: List[Callable[['SingleFlight', str], None]] = []
+        self.counts: Dict[str, int] = {'leader': 0, 'follower': 0, 'timeout': 0}
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def add_observer(self, observer: Callable[['SingleFlight', str], None]):
+        """Called with ``(group, role)``: ``leader``, ``follower`` or ``timeout``"""
+        self.observers.append(observer)
+
+    def _notify(self, role: str):
+        self.counts[role] += 1
+        for observer in self.observers:
+            try:
+                observer(self, role)
+            except Exception as e:
+                logger.error(f"Singleflight observer failed: {e}")
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+            else:
+                call.followers += 1
+                leader = False
+
+        if not leader:
+            if call.done.wait(self.wait_timeout):
+                self._notify('follower')
+                if call.error is not None:
+                    raise call.error
+                return call.result
+            self._notify('timeout')
+            return fn()
+
+        self._notify('leader')
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+
+    def forget(self, key: Optional[Hashable] = None):
+        """Stop new callers from joining in-flight calls (all keys, or one)"""
+        with self._lock:
+            if key is None:
+                self._calls.clear()
+            else:
+                self._calls.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight = len(self._calls)
+        total = self.counts['leader'] + self.counts['follower']
+        return {
+            'in_flight': in_flight,
+            'shared_rate': round(self.counts['follower'] / total, 4) if total else None,
+            **self.counts,
+        }
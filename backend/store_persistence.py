@@ -0,0 +1,281 @@
+import fcntl
+import glob
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Dict, List, Any, Optional, Tuple
+
+from records import json_default
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b'FLSNAP1\n'
+SNAPSHOT_CHUNK_ROWS = 5000
+_LENGTH = struct.Struct('<I')
+LOCK_FILE = 'LOCK'
+
+class DataDirLocked(RuntimeError):
+    """Raised when another process already has the data directory open"""
+
+class StorePersistence:
+    """Append-only write log plus periodic compact snapshots for ``MemoryStore``.
+
+    Files in ``data_dir``:
+
+    - ``snapshot-<gen>.bin``: every row as of the start of log generation
+      ``gen``, written after a header as length-prefixed JSON chunks of
+      ``[table, [row, ...]]`` so recovery decodes thousands of rows per call.
+    - ``wal-<gen>.log``: one JSON line per write applied after the snapshot
+      of the same or an earlier generation.
+
+    Taking a snapshot switches writes to a new log generation under the
+    store lock, serializes the rows outside the lock, atomically renames the
+    snapshot into place and then removes older logs and snapshots. Recovery
+    memory-maps the newest snapshot and replays every log of that generation
+    or later, so a crash at any point loses at most unflushed log lines.
+
+    The files are not safe to share: :meth:`open` takes an exclusive
+    ``flock`` on ``data_dir/LOCK`` and raises :class:`DataDirLocked` if
+    another process holds it. For several gunicorn workers use
+    ``SharedMemoryStore`` instead.
+    """
+
+    def __init__(self, store, data_dir: str, snapshot_every: int = 100000,
+                 snapshot_interval: float = 0, fsync_interval: float = 1.0):
+        self.store = store
+        self.data_dir = data_dir
+        self.snapshot_every = snapshot_every
+        self.snapshot_interval = snapshot_interval
+        self.fsync_interval = fsync_interval
+
+        self.generation = 0
+        self._log = None
+        self._lock_fd: Optional[int] = None
+        self._log_lock = threading.Lock()
+        self._records_since_snapshot = 0
+        self._snapshot_lock = threading.Lock()
+        self._snapshot_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._background: Optional[threading.Thread] = None
+
+        os.makedirs(data_dir, exist_ok=True)
+
+    # ------------------ Paths ------------------
+
+    def _snapshot_path(self, generation: int) -> str:
+        return os.path.join(self.data_dir, f'snapshot-{generation:08d}.bin')
+
+    def _log_path(self, generation: int) -> str:
+        return os.path.join(self.data_dir, f'wal-{generation:08d}.log')
+
+    def _generations(self, prefix: str, suffix: str) -> List[int]:
+        generations = []
+        for path in glob.glob(os.path.join(self.data_dir, f'{prefix}-*{suffix}')):
+            name = os.path.basename(path)[len(prefix) + 1:-len(suffix)]
+            if name.isdigit():
+                generations.append(int(name))
+        return sorted(generations)
+
+    # ------------------ Startup ------------------
+
+    def _acquire_dir_lock(self):
+        fd = os.open(os.path.join(self.data_dir, LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            raise DataDirLocked(f"{self.data_dir} is in use by another process; "
+                                "DEMO_DATA_DIR is single-process (use DEMO_SHARED_STORE for several workers)")
+        self._lock_fd = fd
+
+    def open(self) -> Dict[str, Any]:
+        """Recover the store from disk, attach the journal and start background work"""
+        started = time.monotonic()
+        self._acquire_dir_lock()
+        snapshot_rows = 0
+        snapshots = self._generations('snapshot', '.bin')
+        base = snapshots[-1] if snapshots else 0
+        if snapshots:
+            snapshot_rows = self._load_snapshot(self._snapshot_path(base))
+
+        replayed = 0
+        logs = [g for g in self._generations('wal', '.log') if g >= base]
+        for generation in logs:
+            replayed += self._replay_log(self._log_path(generation))
+
+        self.generation = logs[-1] if logs else base
+        self._log = open(self._log_path(self.generation), 'ab')
+        self._records_since_snapshot = replayed
+        self.store.journal = self
+
+        if self.fsync_interval or self.snapshot_interval:
+            self._background = threading.Thread(target=self._run_background, name='store-persistence', daemon=True)
+            self._background.start()
+
+        stats = {
+            'snapshot_rows': snapshot_rows,
+            'log_records': replayed,
+            'seconds': round(time.monotonic() - started, 3),
+            'generation': self.generation
+        }
+        logger.info(f"Recovered demo store from {self.data_dir}: {stats}")
+        return stats
+
+    def _load_snapshot(self, path: str) -> int:
+        loaded = 0
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return 0
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+                    raise ValueError(f"Not a store snapshot: {path}")
+                offset = len(SNAPSHOT_MAGIC)
+                size = len(mm)
+                decode = json.JSONDecoder().decode
+                unpack_from = _LENGTH.unpack_from
+                tables: Dict[str, List[Dict[str, Any]]] = {}
+                while offset + _LENGTH.size <= size:
+                    (length,) = unpack_from(mm, offset)
+                    offset += _LENGTH.size
+                    table_name, rows = decode(mm[offset:offset + length].decode('utf-8'))
+                    offset += length
+                    tables.setdefault(table_name, []).extend(rows)
+                    loaded += len(rows)
+        for table_name, rows in tables.items():
+            self.store.load(table_name, rows)
+        return loaded
+
+    def _replay_log(self, path: str) -> int:
+        replayed = 0
+        valid_bytes = 0
+        with open(path, 'rb') as f:
+            data = f.read()
+        with self.store.lock:
+            for line in data.splitlines(keepends=True):
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    op, table_name, payload = json.loads(line)
+                except ValueError:
+                    break
+                self.store._apply(op, table_name, payload)
+                valid_bytes += len(line)
+                replayed += 1
+        if valid_bytes < len(data):
+            # Drop a torn tail left by a crash mid-write
+            logger.warning(f"Truncating {len(data) - valid_bytes} trailing bytes of {path}")
+            with open(path, 'r+b') as f:
+                f.truncate(valid_bytes)
+        return replayed
+
+    # ------------------ Journal ------------------
+
+    def append(self, op: str, table_name: str, data: Dict[str, Any]):
+        """Called by the store, under its lock, for every applied write"""
+        line = json.dumps([op, table_name, data], separators=(',', ':'), default=json_default).encode() + b'\n'
+        with self._log_lock:
+            self._log.write(line)
+            self._log.flush()
+        self._records_since_snapshot += 1
+        if self.snapshot_every and self._records_since_snapshot >= self.snapshot_every:
+            self._start_snapshot()
+
+    def sync(self):
+        with self._log_lock:
+            if self._log and not self._log.closed:
+                self._log.flush()
+                os.fsync(self._log.fileno())
+
+    # ------------------ Snapshots ------------------
+
+    def _start_snapshot(self):
+        if self._snapshot_thread and self._snapshot_thread.is_alive():
+            return
+        self._snapshot_thread = threading.Thread(target=self.snapshot, name='store-snapshot', daemon=True)
+        self._snapshot_thread.start()
+
+    def snapshot(self) -> Optional[int]:
+        """Write a compact snapshot and drop the logs it covers; returns its generation"""
+        if not self._snapshot_lock.acquire(blocking=False):
+            return None
+        try:
+            rows = self._rotate()
+            generation = self.generation
+            path = self._snapshot_path(generation)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(SNAPSHOT_MAGIC)
+                dumps = json.dumps
+                pack = _LENGTH.pack
+                for table_name, table_rows in rows:
+                    for start in range(0, len(table_rows), SNAPSHOT_CHUNK_ROWS):
+                        chunk = table_rows[start:start + SNAPSHOT_CHUNK_ROWS]
+                        record = dumps([table_name, chunk], separators=(',', ':'), default=json_default).encode()
+                        f.write(pack(len(record)))
+                        f.write(record)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+
+            for old in self._generations('snapshot', '.bin'):
+                if old < generation:
+                    os.remove(self._snapshot_path(old))
+            for old in self._generations('wal', '.log'):
+                if old < generation:
+                    os.remove(self._log_path(old))
+            logger.info(f"Wrote demo store snapshot generation {generation}")
+            return generation
+        finally:
+            self._snapshot_lock.release()
+
+    def _rotate(self) -> List[Tuple[str, List[Dict[str, Any]]]]:
+        """Switch to a new log generation and capture the rows it starts from.
+
+        Rows are replaced rather than mutated on update, so holding on to
+        the current row objects is a consistent point-in-time copy.
+        """
+        with self.store.lock:
+            rows = [(name, list(table.values())) for name, table in self.store.tables.items()]
+            with self._log_lock:
+                self._log.flush()
+                os.fsync(self._log.fileno())
+                self._log.close()
+                self.generation += 1
+                self._log = open(self._log_path(self.generation), 'ab')
+            self._records_since_snapshot = 0
+        return rows
+
+    # ------------------ Background & shutdown ------------------
+
+    def _run_background(self):
+        last_snapshot = time.monotonic()
+        tick = min(t for t in (self.fsync_interval, self.snapshot_interval) if t)
+        while not self._stop.wait(tick):
+            try:
+                if self.fsync_interval:
+                    self.sync()
+                if self.snapshot_interval and time.monotonic() - last_snapshot >= self.snapshot_interval:
+                    last_snapshot = time.monotonic()
+                    if self._records_since_snapshot:
+                        self.snapshot()
+            except Exception as e:
+                logger.error(f"Demo store persistence error: {e}")
+
+    def close(self):
+        self._stop.set()
+        if self._background:
+            self._background.join()
+        if self._snapshot_thread:
+            self._snapshot_thread.join()
+        self.store.journal = None
+        self.sync()
+        with self._log_lock:
+            if self._log:
+                self._log.close()
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)   # releases the flock
+            self._lock_fd = None
@@ -0,0 +1,215 @@
+import atexit
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from typing import Dict, Optional, Any
+
+from flask import Flask, has_request_context, request
+
+REQUEST_ID_KEY = 'farmlink.request_id'
+SAMPLED_KEY = 'farmlink.log_sampled'
+REQUEST_ID_HEADER = 'X-Request-ID'
+_VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._:-]{1,128}$')
+
+# Attributes every LogRecord has; anything else was passed via ``extra=``
+_RESERVED = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message, request id and extras"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            'ts': datetime.datetime.utcfromtimestamp(record.created).isoformat(timespec='milliseconds') + 'Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and value is not None:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class RequestContextFilter(logging.Filter):
+    """Runs on the caller's thread: tags records and applies sampling and rate limits.
+
+    - Records logged while serving a request get ``request_id``, ``method``
+      and ``path``.
+    - INFO and DEBUG records from requests that lost the sampling draw
+      (``info_sample_rate``) are dropped; warnings and errors always pass.
+    - ERROR records are limited to ``error_burst`` per ``error_window``
+      seconds per call site; the next record that gets through carries a
+      ``suppressed`` count.
+    """
+
+    def __init__(self, info_sample_rate: float = 1.0, error_burst: int = 20, error_window: float = 60.0):
+        super().__init__()
+        self.info_sample_rate = info_sample_rate
+        self.error_burst = error_burst
+        self.error_window = error_window
+        self._windows: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if has_request_context():
+            environ = request.environ
+            if record.levelno < logging.WARNING and not environ.get(SAMPLED_KEY, True):
+                return False
+            record.request_id = environ.get(REQUEST_ID_KEY)
+            record.method = environ.get('REQUEST_METHOD')
+            record.path = environ.get('PATH_INFO')
+        if record.levelno >= logging.ERROR and self.error_burst > 0:
+            return self._allow_error(record)
+        return True
+
+    def _allow_error(self, record: logging.LogRecord) -> bool:
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.error_window:
+                suppressed = window[2] if window is not None else 0
+                if len(self._windows) > 10000:
+                    self._windows.clear()
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if window[1] < self.error_burst:
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """``QueueHandler`` that drops records instead of blocking when the queue is full.
+
+    Only ``getMessage()`` and the traceback text are computed on the caller's
+    thread; JSON encoding and the write to stdout happen on the listener
+    thread.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.message = record.getMessage()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        # Shallow copy without re-running LogRecord.__init__ (other handlers may see the original)
+        copied = logging.LogRecord.__new__(logging.LogRecord)
+        copied.__dict__.update(record.__dict__)
+        record = copied
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class LoggingPipeline:
+    """Root logging through a bounded in-memory queue drained by one thread.
+
+    Request handlers only pay for building the record and a ``put_nowait``;
+    a burst that fills the queue drops records (counted in
+    ``handler.dropped``) rather than stalling requests on stdout.
+    """
+
+    def __init__(self, level: int = logging.INFO, fmt: str = 'json', queue_size: int = 10000,
+                 info_sample_rate: float = 1.0, error_burst: int = 20, error_window: float = 60.0,
+                 stream=None):
+        self.info_sample_rate = info_sample_rate
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.handler = NonBlockingQueueHandler(self.queue)
+        self.handler.addFilter(RequestContextFilter(info_sample_rate, error_burst, error_window))
+
+        output = logging.StreamHandler(stream or sys.stdout)
+        if fmt == 'json':
+            output.setFormatter(JsonFormatter())
+        else:
+            output.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s',
+                                                  defaults={'request_id': '-'}))
+        self.listener = logging.handlers.QueueListener(self.queue, output, respect_handler_level=False)
+
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(self.handler)
+        root.setLevel(level)
+
+        self.listener.start()
+        atexit.register(self.stop)
+        # A forked worker inherits the queue but not the listener thread
+        os.register_at_fork(after_in_child=self._restart_listener)
+
+    def _restart_listener(self):
+        # Fresh queue too: the parent's listener may have held its lock at fork time
+        self.queue = queue.Queue(maxsize=self.queue.maxsize)
+        self.handler.queue = self.listener.queue = self.queue
+        self.listener._thread = None
+        self.listener.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Flush queued records and stop the listener thread"""
+        thread = self.listener._thread
+        if thread is None:
+            return
+        try:
+            # Blocking put: a full queue must drain before the sentinel fits
+            self.queue.put(self.listener._sentinel, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+        self.listener._thread = None
+
+    def init_app(self, app: Flask):
+        """Assign request ids, decide info-log sampling and echo ``X-Request-ID``"""
+        app.before_request_funcs.setdefault(None, []).insert(0, self._before_request)
+        app.after_request(self._after_request)
+
+    def _before_request(self):
+        environ = request._get_current_object().environ
+        incoming = environ.get('HTTP_X_REQUEST_ID')
+        environ[REQUEST_ID_KEY] = incoming if incoming and _VALID_REQUEST_ID.match(incoming) else uuid.uuid4().hex
+        environ[SAMPLED_KEY] = self.info_sample_rate >= 1.0 or random.random() < self.info_sample_rate
+
+    def _after_request(self, response):
+        request_id = request._get_current_object().environ.get(REQUEST_ID_KEY)
+        if request_id:
+            response.headers[REQUEST_ID_HEADER] = request_id
+        return response
+
+_pipeline: Optional[LoggingPipeline] = None
+
+def configure_logging(app: Optional[Flask] = None) -> LoggingPipeline:
+    """Install the pipeline once per process from LOG_* environment variables"""
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = LoggingPipeline(
+            level=getattr(logging, os.environ.get('LOG_LEVEL', 'INFO').upper(), logging.INFO),
+            fmt=os.environ.get('LOG_FORMAT', 'json').lower(),
+            queue_size=int(os.environ.get('LOG_QUEUE_SIZE', 10000)),
+            info_sample_rate=float(os.environ.get('LOG_INFO_SAMPLE_RATE', 1.0)),
+            error_burst=int(os.environ.get('LOG_ERROR_BURST', 20)),
+            error_window=float(os.environ.get('LOG_ERROR_WINDOW', 60))
+        )
+    if app is not None:
+        _pipeline.init_app(app)
+    return _pipeline
@@ -0,0 +1,162 @@
+"""
+Delta feed (GET /api/posts/changes) against the in-process fake Supabase
+client: paging by watermark, the (updated_at, id) tiebreak, edits and
+tombstones. No server or database is needed:
+
+    python -m pytest test_delta_feed.py
+"""
+
+import datetime
+import os
+
+os.environ.setdefault('SUPABASE_FAKE', 'true')
+
+from postgrest import SyncPostgrestClient
+from postgrest.exceptions import APIError
+
+import app as backend
+from delta_feed import Watermark, format_watermark, next_position, parse_watermark
+from fake_supabase import FakeSupabase
+from query_hooks import instrument_client
+
+AUTHOR_ID = '11111111-1111-1111-1111-111111111111'
+STAMP = '2024-01-01T00:00:00'
+
+def post_id(n: int) -> str:
+    return f'33333333-3333-3333-3333-{n:012d}'
+
+def install_fake(count: int = 7):
+    """``count`` posts, all but the last sharing one updated_at so pages split inside a tie"""
+    fake = FakeSupabase()
+    fake.load('marketplace_posts', [
+        {'id': post_id(n), 'author_id': AUTHOR_ID, 'user_type': 'farmer', 'crop_name': f'Crop {n}',
+         'quantity': '10', 'location': 'Guntur', 'created_at': STAMP,
+         'updated_at': STAMP if n < count - 1 else '2024-01-02T00:00:00'}
+        # Loaded out of id order so the test does not pass on insertion order alone
+        for n in reversed(range(count))
+    ])
+    backend.supabase = instrument_client(fake)
+    backend.invalidate_posts_cache()
+
+def auth_headers():
+    return {'Authorization': f"Bearer {backend.generate_jwt_token(AUTHOR_ID, 'farmer')}"}
+
+def poll(client, since=None, **params):
+    if since is not None:
+        params['since'] = since
+    response = client.get('/api/posts/changes', query_string=params)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return response.get_json()
+
+def full_sync(client, limit):
+    ids, pages, since = [], 0, None
+    while True:
+        body = poll(client, since, limit=limit)
+        ids.extend(post['id'] for post in body['posts'])
+        pages += 1
+        since = body['watermark']
+        if not body['has_more']:
+            return ids, pages, since
+
+def test_paging_through_ties_returns_every_post_once_in_order():
+    install_fake(7)
+    ids, pages, _ = full_sync(backend.app.test_client(), limit=2)
+    assert ids == [post_id(n) for n in range(7)]
+    assert pages == 4
+
+def test_caught_up_poll_returns_nothing():
+    install_fake(3)
+    client = backend.app.test_client()
+    _, _, since = full_sync(client, limit=10)
+    body = poll(client, since)
+    assert body['posts'] == [] and body['deleted'] == []
+    assert body['has_more'] is False and body['reset'] is False
+
+def test_edits_and_deletions_show_up_in_the_next_poll():
+    install_fake(3)
+    client = backend.app.test_client()
+    _, _, since = full_sync(client, limit=10)
+
+    response = client.put(f'/api/posts/{post_id(0)}', json={'quantity': '20'}, headers=auth_headers())
+    assert response.status_code == 200
+    response = client.delete(f'/api/posts/{post_id(1)}', headers=auth_headers())
+    assert response.status_code == 200
+
+    body = poll(client, since)
+    assert [(post['id'], post['quantity']) for post in body['posts']] == [(post_id(0), '20')]
+    assert [deleted['id'] for deleted in body['deleted']] == [post_id(1)]
+    # The edit is within the lag, so the watermark is a bare timestamp; polling from it still works
+    assert parse_watermark(body['watermark']).row_id == ''
+    assert [post['id'] for post in poll(client, body['watermark'])['posts']] == [post_id(0)]
+
+def test_tombstone_write_failure_does_not_fail_the_delete():
+    install_fake(2)
+    client = backend.app.test_client()
+    original = backend.record_post_deletion
+
+    def failing(post):
+        raise RuntimeError('insert failed')
+    backend.record_post_deletion = failing
+    try:
+        response = client.delete(f'/api/posts/{post_id(0)}', headers=auth_headers())
+    finally:
+        backend.record_post_deletion = original
+    assert response.status_code == 200
+
+def test_watermark_older_than_the_deletions_log_resets():
+    install_fake(2)
+    old = datetime.datetime.utcnow() - datetime.timedelta(days=backend.POST_TOMBSTONE_RETENTION_DAYS + 1)
+    body = poll(backend.app.test_client(), format_watermark(Watermark(STAMP, '', old.isoformat())))
+    assert body['reset'] is True and body['watermark'] is None
+
+def test_malformed_watermark_is_rejected():
+    install_fake(1)
+    client = backend.app.test_client()
+    for since in ('garbage', f'{STAMP}~x,y~{STAMP}', f'{STAMP}~{post_id(0)}', f'{STAMP}~abc~{STAMP}',
+                  f'{STAMP}~{post_id(0)}\n~{STAMP}'):
+        assert client.get('/api/posts/changes', query_string={'since': since}).status_code == 400
+
+def test_watermark_round_trip():
+    watermark = Watermark(STAMP, post_id(4), '2024-01-03T00:00:00')
+    assert parse_watermark(format_watermark(watermark)) == watermark
+    assert parse_watermark(None) is None
+
+def test_next_position_holds_back_recent_changes():
+    now = datetime.datetime(2024, 1, 1, 12, 0, 0)
+    recent = (now - datetime.timedelta(seconds=1)).isoformat()
+    # Mid-page: resume exactly after the last row
+    assert next_position(None, (recent, 'b'), True, [recent], now, 5) == (recent, 'b')
+    # Caught up but within the lag: resume from now - lag, so late commits are not skipped
+    assert next_position(None, (recent, 'b'), False, [recent], now, 5) == ('2024-01-01T11:59:55', '')
+    # Never moves back behind the client's position
+    since = ('2024-01-01T11:59:58', '')
+    assert next_position(since, None, False, [], now, 5) == since
+
+def test_query_parameters_sent_by_the_real_builder():
+    original = backend.supabase
+    backend.supabase = instrument_client(SyncPostgrestClient('http://localhost/rest/v1'))
+    try:
+        mid_page = backend.post_changes_query(Watermark(STAMP, post_id(3), STAMP), 11, 'farmer')._builder.params
+        caught_up = backend.post_changes_query(Watermark(STAMP, '', STAMP), 11)._builder.params
+    finally:
+        backend.supabase = original
+    # One order= parameter carries the tiebreak; PostgREST would apply only one of several
+    assert mid_page.get_list('order') == ['updated_at,id']
+    assert mid_page['updated_at'] == f'gte.{STAMP}'
+    assert mid_page['or'] == f'(updated_at.gt.{STAMP},and(updated_at.eq.{STAMP},id.gt.{post_id(3)}))'
+    assert mid_page['user_type'] == 'eq.farmer'
+    # No id comparison without a row id: '' is not a UUID
+    assert caught_up.get_list('order') == ['updated_at,id']
+    assert caught_up['updated_at'] == f'gte.{STAMP}'
+    assert 'or' not in caught_up and 'id' not in caught_up
+
+def test_fake_rejects_queries_postgrest_would_not_run_as_written():
+    install_fake(1)
+    for build in (lambda q: q.order('updated_at').order('id'),
+                  lambda q: q.gt('id', ''),
+                  lambda q: q.or_('updated_at.gt.x,and(updated_at.eq.x,id.gt.)')):
+        try:
+            build(backend.supabase.table('marketplace_posts').select('*')).execute()
+        except APIError:
+            continue
+        raise AssertionError('accepted')
@@ -0,0 +1,131 @@
+"""
+Geocoding, geohash cells and "near me" search (geo.py, GET /api/posts/nearby)
+against the in-process fake Supabase client. No server or database is needed:
+
+    python -m pytest test_geo.py
+"""
+
+import os
+import random
+
+os.environ.setdefault('SUPABASE_FAKE', 'true')
+
+import app as backend
+from fake_supabase import FakeSupabase
+from geo import (CELL_PRECISION, Area, cell_count, covering_cells, distance_km, geocode, geohash,
+                 location_columns, parse_area, radius_bbox)
+from query_hooks import instrument_client
+
+def test_geohash_matches_reference_values():
+    assert geohash(57.64911, 10.40744, 11) == 'u4pruydqqvj'
+    assert geohash(42.605, -5.603, 5) == 'ezs42'
+    assert geohash(-25.382708, -49.265506, 8) == '6gkzwgjz'
+    # Cells include their south and west edges
+    assert geohash(0.0, 0.0, 1) == 's'
+    assert geohash(-0.000001, -0.000001, 1) == '7'
+
+def test_covering_cells_contain_every_point_of_the_bbox():
+    rng = random.Random(7)
+    for bbox in [radius_bbox(16.3067, 80.4365, 50), radius_bbox(28.6139, 77.2090, 5), (10.0, 70.0, 12.0, 73.0)]:
+        cells = set(covering_cells(bbox))
+        assert len(cells) == cell_count(bbox)
+        min_lat, min_lon, max_lat, max_lon = bbox
+        corners = [(lat, lon) for lat in (min_lat, max_lat) for lon in (min_lon, max_lon)]
+        points = corners + [(rng.uniform(min_lat, max_lat), rng.uniform(min_lon, max_lon)) for _ in range(500)]
+        for lat, lon in points:
+            assert geohash(lat, lon) in cells
+
+def test_covering_cells_on_cell_edges():
+    height, width = 180 / 2 ** 10, 360 / 2 ** 10   # precision 4
+    # A bbox whose edges are exactly cell edges takes in the cells beyond its max edges too,
+    # since points on those edges belong to them
+    bbox = (-90 + height * 600, -180 + width * 740, -90 + height * 601, -180 + width * 741)
+    cells = covering_cells(bbox)
+    assert len(cells) == 4
+    assert geohash(bbox[2], bbox[3]) in cells
+    # Bboxes reaching the poles or the antimeridian stay inside the grid
+    assert cell_count((89.9, 179.9, 90.0, 180.0)) == 1
+    assert covering_cells((89.9, 179.9, 90.0, 180.0)) == [geohash(89.95, 179.95, CELL_PRECISION)]
+
+def test_distance_km():
+    assert distance_km(16.3067, 80.4365, 16.3067, 80.4365) == 0
+    # Guntur to Vijayawada is about 31 km; one degree of latitude about 111 km
+    assert 28 < distance_km(16.3067, 80.4365, 16.5062, 80.6480) < 34
+    assert abs(distance_km(10.0, 75.0, 11.0, 75.0) - 111.2) < 0.5
+
+def test_area_radius_cutoff():
+    area = parse_area({'lat': '16.3067', 'lon': '80.4365', 'radius_km': '30'}, 50, 200)
+    vijayawada = (16.5062, 80.6480)
+    assert area.contains(*vijayawada) is None
+    wider = area._replace(radius_km=35.0)
+    assert 30 < wider.contains(*vijayawada) <= 35
+    box = Area(16.0, 80.0, None, (15.0, 79.0, 17.0, 81.0), None)
+    assert box.contains(16.9, 80.9) is not None and box.contains(17.1, 80.0) is None
+
+def test_parse_area_rejects_bad_input():
+    for args in ({}, {'lat': '91', 'lon': '80'}, {'lat': 'nan', 'lon': '80'}, {'near': 'Atlantis'},
+                 {'lat': '16', 'lon': '80', 'radius_km': '500'}, {'bbox': '1,2,3'}, {'bbox': '17,80,16,81'}):
+        try:
+            parse_area(args, 50, 200)
+        except ValueError:
+            continue
+        raise AssertionError(f"accepted {args}")
+
+def test_geocode_free_text():
+    assert geocode('Guntur, Andhra Pradesh').name == 'Guntur'
+    assert geocode('Tomato farm near Nasik').name == 'Nashik'
+    assert geocode('Somewhere unknown') is None
+    assert location_columns(None) == {'latitude': None, 'longitude': None, 'geo_cell': None}
+
+# Vijayawada is the oldest post, so it can move into a window without changing the newest timestamp
+PLACES = ['Vijayawada', 'Guntur', 'Guntur', 'Hyderabad', 'Pune']
+
+def install_fake():
+    fake = FakeSupabase()
+    fake.load('marketplace_posts', [
+        {'id': f'33333333-3333-3333-3333-{n:012d}', 'author_id': '11111111-1111-1111-1111-111111111111',
+         'user_type': 'farmer', 'crop_name': f'Crop {n}', 'quantity': '10', 'location': place,
+         'created_at': f'2024-01-0{n + 1}T00:00:00', 'updated_at': f'2024-01-0{n + 1}T00:00:00',
+         **location_columns(place)}
+        for n, place in enumerate(PLACES)
+    ] + [{'id': '33333333-3333-3333-3333-999999999999', 'user_type': 'farmer', 'crop_name': 'Unplaced',
+          'location': 'Nowhere', 'created_at': '2024-01-09T00:00:00', **location_columns('Nowhere')}])
+    backend.supabase = instrument_client(fake)
+    backend.invalidate_posts_cache()
+
+def test_nearby_posts_are_within_radius_nearest_first():
+    install_fake()
+    response = backend.app.test_client().get('/api/posts/nearby?near=Guntur&radius_km=50')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [post['location'] for post in body['posts']] == ['Guntur', 'Guntur', 'Vijayawada']
+    # Same place: newest first
+    assert body['posts'][0]['created_at'] > body['posts'][1]['created_at']
+    assert [post['distance_km'] for post in body['posts']] == sorted(post['distance_km'] for post in body['posts'])
+    assert all(post['distance_km'] <= 50 for post in body['posts'])
+    assert body['center']['place'] == 'Guntur, Andhra Pradesh'
+
+def test_nearby_posts_radius_cutoff_and_limit():
+    install_fake()
+    client = backend.app.test_client()
+    body = client.get('/api/posts/nearby?near=Guntur&radius_km=20').get_json()
+    assert [post['location'] for post in body['posts']] == ['Guntur', 'Guntur']
+    body = client.get('/api/posts/nearby?near=Guntur&radius_km=200&limit=1').get_json()
+    assert body['count'] == 1
+    assert client.get('/api/posts/nearby?lat=16.3&lon=80.4&radius_km=1000').status_code == 400
+
+def test_nearby_etag_changes_when_a_post_in_the_window_is_replaced():
+    install_fake()
+    client = backend.app.test_client()
+    url = '/api/posts/nearby?near=Guntur&radius_km=50&limit=2'
+    first = client.get(url)
+    assert [post['location'] for post in first.get_json()['posts']] == ['Guntur', 'Guntur']
+    etag = first.headers['ETag']
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+
+    # Same count and the same newest post, but Vijayawada moves up into the window
+    older = first.get_json()['posts'][1]['id']
+    backend.supabase.table('marketplace_posts').delete().eq('id', older).execute()
+    second = client.get(url, headers={'If-None-Match': etag})
+    assert second.status_code == 200
+    assert [post['location'] for post in second.get_json()['posts']] == ['Guntur', 'Vijayawada']
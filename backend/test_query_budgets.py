@@ -0,0 +1,91 @@
+"""
+Query budgets for the Supabase-backed API (app.py).
+
+Runs every route with a declared @query_budget against the in-process
+fake Supabase client (fake_supabase.py) and fails if a route makes more
+round trips than it declares. No server or database is needed:
+
+    python -m pytest test_query_budgets.py
+"""
+
+import datetime
+import os
+
+from werkzeug.security import generate_password_hash
+
+os.environ.setdefault('SUPABASE_FAKE', 'true')
+
+import app as backend
+from delta_feed import Watermark, format_watermark
+from fake_supabase import FakeSupabase
+from geo import location_columns
+from query_hooks import instrument_client
+from query_trace import assert_query_budget
+
+USER_ID = '11111111-1111-1111-1111-111111111111'
+OTHER_ID = '22222222-2222-2222-2222-222222222222'
+POST_ID = '33333333-3333-3333-3333-333333333333'
+CHAT_ID = '44444444-4444-4444-4444-444444444444'
+CREATED = '2024-01-01T00:00:00'
+# Delta-feed watermarks (caught up, and mid-page after a row) recent enough to be inside the deletions log's retention window
+SINCE = format_watermark(Watermark(CREATED, '', datetime.datetime.utcnow().isoformat()))
+SINCE_ROW = format_watermark(Watermark(CREATED, POST_ID, datetime.datetime.utcnow().isoformat()))
+
+def install_fake():
+    fake = FakeSupabase()
+    password_hash = generate_password_hash('Secure#Pass123')
+    fake.load('users', [
+        {'id': USER_ID, 'name': 'Test Farmer', 'email': 'test@farm.com', 'user_type': 'farmer',
+         'mobile': '9876543210', 'password_hash': password_hash, 'created_at': CREATED},
+        {'id': OTHER_ID, 'name': 'Test Buyer', 'email': 'buyer@farm.com', 'user_type': 'buyer',
+         'mobile': '9876543211', 'password_hash': password_hash, 'created_at': CREATED},
+    ])
+    fake.load('user_profiles', [{'user_id': USER_ID, 'bio': 'Rice farmer', 'created_at': CREATED}])
+    fake.load('marketplace_posts', [{'id': POST_ID, 'author_id': USER_ID, 'user_type': 'farmer', 'crop_name': 'Rice',
+                                     'crop_details': 'Basmati', 'quantity': '10', 'location': 'Guntur', 'created_at': CREATED,
+                                     'updated_at': CREATED, **location_columns('Guntur')}])
+    fake.load('user_chats', [{'id': CHAT_ID, 'user1_id': USER_ID, 'user2_id': OTHER_ID, 'created_at': CREATED}])
+    fake.load('chat_messages', [{'chat_id': CHAT_ID, 'sender_id': OTHER_ID, 'message': 'Hello', 'created_at': CREATED}])
+
+    client = instrument_client(fake)
+    client.add_observer(backend.app_metrics.observe_query)
+    client.add_observer(backend.query_tracer.observe_query)
+    backend.supabase = client
+    backend.health_prober.probe()
+
+def auth_headers():
+    return {'Authorization': f"Bearer {backend.generate_jwt_token(USER_ID, 'farmer')}"}
+
+ROUTES = [
+    ('GET', '/api/health', {}),
+    ('GET', '/api/health/live', {}),
+    ('GET', '/api/health/ready', {}),
+    ('GET', '/api/posts?user_type=farmer', {}),
+    ('GET', '/api/posts/changes', {}),
+    ('GET', f'/api/posts/changes?since={SINCE}', {}),
+    ('GET', f'/api/posts/changes?since={SINCE_ROW}', {}),
+    ('GET', '/api/posts/nearby?near=Guntur&radius_km=50', {}),
+    ('GET', f'/api/users/{USER_ID}', {}),
+    ('GET', f'/api/users/{OTHER_ID}/public', {}),
+    ('POST', '/api/auth/login', {'json': {'email': 'test@farm.com', 'password': 'Secure#Pass123'}}),
+    ('POST', '/api/auth/register', {'json': {'username': 'New Farmer', 'email': 'new@farm.com', 'password': 'Secure#Pass123',
+                                             'user_type': 'farmer', 'contact': '9876543212'}}),
+    ('POST', '/api/posts', {'json': {'crop_name': 'Wheat', 'crop_details': 'Durum', 'quantity': '10', 'location': 'Guntur'}}),
+    ('PUT', f'/api/posts/{POST_ID}', {'json': {'quantity': '20'}}),
+    ('POST', '/api/chats', {'json': {'other_user_id': OTHER_ID}}),
+    ('GET', f'/api/chats/{CHAT_ID}/messages', {}),
+    ('POST', f'/api/chats/{CHAT_ID}/messages', {'json': {'message': 'Hello'}}),
+    ('DELETE', f'/api/posts/{POST_ID}', {}),
+    ('GET', '/api/profile', {}),
+]
+
+def test_routes_stay_within_query_budget():
+    install_fake()
+    for method, path, kwargs in ROUTES:
+        response, trace = assert_query_budget(backend.app, method, path, headers=auth_headers(), **kwargs)
+        assert response.status_code < 400, f"{method} {path} returned {response.status_code}"
+        assert response.headers.get('Server-Timing', '').startswith('db;dur=')
+
+if __name__ == '__main__':
+    test_routes_stay_within_query_budget()
+    print("✅ All routes within their query budget")
@@ -1,8 +1,10 @@
 import jwt
-import re
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Iterable
 from werkzeug.security import generate_password_hash, check_password_hash
+from schemas import (
+    EMAIL_RE, PHONE_RE, UPPER_RE, LOWER_RE, DIGIT_RE, SPECIAL_RE, USER_SCHEMA, post_schema
+)
 
 def generate_jwt_token(user_id: str, user_type: str, secret_key: str, expiration_hours: int = 24) -> str:
     """Generate JWT token for user authentication"""
@@ -34,13 +36,11 @@ def verify_password(password: str, hashed_password: str) -> bool:
 
 def validate_email(email: str) -> bool:
     """Validate email format"""
-    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(email_pattern, email) is not None
+    return EMAIL_RE.match(email) is not None
 
 def validate_phone(phone: str) -> bool:
     """Validate phone number format (10 digits)"""
-    phone_pattern = r'^[0-9]{10}$'
-    return re.match(phone_pattern, phone) is not None
+    return PHONE_RE.match(phone) is not None
 
 def validate_password_strength(password: str) -> Dict[str, Any]:
     """Validate password strength and return detailed feedback"""
@@ -54,16 +54,16 @@ def validate_password_strength(password: str) -> Dict[str, Any]:
         feedback['valid'] = False
         feedback['errors'].append('Password must be at least 8 characters long')
     
-    if not re.search(r'[A-Z]', password):
+    if not UPPER_RE.search(password):
         feedback['warnings'].append('Consider adding uppercase letters')
     
-    if not re.search(r'[a-z]', password):
+    if not LOWER_RE.search(password):
         feedback['warnings'].append('Consider adding lowercase letters')
     
-    if not re.search(r'[0-9]', password):
+    if not DIGIT_RE.search(password):
         feedback['warnings'].append('Consider adding numbers')
     
-    if not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
+    if not SPECIAL_RE.search(password):
         feedback['warnings'].append('Consider adding special characters')
     
     return feedback
@@ -85,55 +85,11 @@ def sanitize_input(text: str) -> str:
 
 def validate_post_data(data: Dict[str, Any], user_type: str) -> Dict[str, Any]:
     """Validate marketplace post data"""
-    errors = []
-    warnings = []
-    
-    if user_type == 'farmer':
-        required_fields = ['crop_name', 'crop_details', 'quantity', 'location']
-        field_names = {
-            'crop_name': 'Crop Name',
-            'crop_details': 'Crop Details',
-            'quantity': 'Quantity',
-            'location': 'Location'
-        }
-    else:  # buyer
-        required_fields = ['name', 'organization', 'requirements', 'location']
-        field_names = {
-            'name': 'Organization Name',
-            'organization': 'Organization Type',
-            'requirements': 'Requirements',
-            'location': 'Location'
-        }
-    
-    # Check required fields
-    for field in required_fields:
-        if not data.get(field):
-            errors.append(f"{field_names[field]} is required")
-        elif isinstance(data[field], str) and len(data[field].strip()) == 0:
-            errors.append(f"{field_names[field]} cannot be empty")
-    
-    # Validate specific fields
-    if 'location' in data and data['location']:
-        if len(data['location'].strip()) < 3:
-            warnings.append('Location should be more specific')
-    
-    if 'quantity' in data and data['quantity']:
-        try:
-            quantity = int(data['quantity'])
-            if quantity <= 0:
-                errors.append('Quantity must be a positive number')
-        except ValueError:
-            errors.append('Quantity must be a valid number')
-    
-    if 'requirements' in data and data['requirements']:
-        if len(data['requirements'].strip()) < 10:
-            warnings.append('Requirements should be more detailed')
-    
-    return {
-        'valid': len(errors) == 0,
-        'errors': errors,
-        'warnings': warnings
-    }
+    return post_schema(user_type).validate(data)
+
+def validate_posts_bulk(posts: Iterable[Dict[str, Any]], user_type: str) -> Dict[str, Any]:
+    """Validate many posts (e.g. an import) in one pass, collecting all errors per post"""
+    return post_schema(user_type).validate_many(posts)
 
 def format_timestamp(timestamp: str) -> str:
     """Format timestamp for display"""
@@ -205,51 +161,4 @@ def paginate_results(results: list, page: int = 1, per_page: int = 20) -> Dict[s
 
 def validate_user_data(data: Dict[str, Any]) -> Dict[str, Any]:
     """Validate user registration/login data"""
-    errors = []
-    warnings = []
-    
-    # Required fields
-    required_fields = ['username', 'email', 'password', 'user_type', 'contact']
-    for field in required_fields:
-        if not data.get(field):
-            errors.append(f"{field.title()} is required")
-    
-    # Email validation
-    if 'email' in data and data['email']:
-        if not validate_email(data['email']):
-            errors.append('Invalid email format')
-    
-    # Phone validation
-    if 'contact' in data and data['contact']:
-        if not validate_phone(data['contact']):
-            errors.append('Phone number must be 10 digits')
-    
-    # Password validation
-    if 'password' in data and data['password']:
-        password_feedback = validate_password_strength(data['password'])
-        if not password_feedback['valid']:
-            errors.extend(password_feedback['errors'])
-        warnings.extend(password_feedback['warnings'])
-    
-    # Username validation
-    if 'username' in data and data['username']:
-        username = data['username'].strip()
-        if len(username) < 3:
-            errors.append('Username must be at least 3 characters long')
-        if len(username) > 50:
-            errors.append('Username must be less than 50 characters')
-        if not re.match(r'^[a-zA-Z0-9_]+$', username):
-            errors.append('Username can only contain letters, numbers, and underscores')
-    
-    # User type validation
-    if 'user_type' in data and data['user_type']:
-        valid_types = ['farmer', 'buyer']
-        if data['user_type'] not in valid_types:
-            errors.append('User type must be either "farmer" or "buyer"')
-    
-    return {
-        'valid': len(errors) == 0,
-        'errors': errors,
-        'warnings': warnings
-    }
-
+    return USER_SCHEMA.validate(data)
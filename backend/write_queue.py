@@ -0,0 +1,144 @@
+import threading
+import time
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+class GroupCommitQueue:
+    """Write-behind queue that coalesces single-row inserts into multi-row inserts.
+
+    Rows submitted within ``max_latency_ms`` of each other (up to ``max_batch``
+    rows) are written with one ``insert([...])`` round trip. Each caller still
+    blocks until its own row is stored and receives that row back, so route
+    handlers keep their request/response semantics. Coalescing only happens
+    when requests are served concurrently (threaded dev server or gunicorn
+    ``gthread`` workers); with one request at a time it behaves like a
+    single-row insert plus the latency window. Up to ``flush_workers`` batches
+    are in flight at once so the next batch fills while the previous one is
+    still on the wire.
+    """
+
+    def __init__(self, supabase_client, table_name: str, max_batch: int = 50,
+                 max_latency_ms: float = 5.0, flush_workers: int = 2, key_field: str = 'id'):
+        self.supabase = supabase_client
+        self.table_name = table_name
+        self.max_batch = max(1, int(max_batch))
+        self.max_latency = max(0.0, float(max_latency_ms)) / 1000.0
+        self.key_field = key_field
+
+        self._pending: List[tuple] = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self.stats = {'rows': 0, 'batches': 0, 'fallback_rows': 0}
+        self._stats_lock = threading.Lock()
+        self.flush_workers = max(1, int(flush_workers))
+        self._busy = 0
+        self._executor = ThreadPoolExecutor(max_workers=self.flush_workers, thread_name_prefix=f"group-commit-{table_name}-flush")
+        self._in_flight = threading.Semaphore(self.flush_workers)
+        self._thread = threading.Thread(target=self._run, name=f"group-commit-{table_name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, row: Dict[str, Any]) -> Future:
+        """Queue a row for insertion and return a future resolving to the stored row"""
+        future: Future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError('Write queue is closed')
+            self._pending.append((row, future))
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch:
+                self._cond.notify()
+        return future
+
+    def insert(self, row: Dict[str, Any], timeout: Optional[float] = 30.0) -> Optional[Dict[str, Any]]:
+        """Insert a row through the queue and wait for the stored row"""
+        return self.submit(row).result(timeout=timeout)
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Flush outstanding rows and stop the background writer"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+        self._executor.shutdown(wait=True)
+
+    def pool_state(self) -> Dict[str, Any]:
+        """Snapshot of queue depth, busy flush workers and counters (for readiness checks)"""
+        with self._cond:
+            pending = len(self._pending)
+        with self._stats_lock:
+            return {
+                'pending_rows': pending,
+                'busy_workers': self._busy,
+                'flush_workers': self.flush_workers,
+                'closed': self._closed,
+                **self.stats
+            }
+
+    def _take_batch(self) -> List[tuple]:
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+            if not self._pending:
+                return []
+
+            # Give concurrent writers a short window to join this batch
+            deadline = time.monotonic() + self.max_latency
+            while len(self._pending) < self.max_batch and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch = self._pending[:self.max_batch]
+            del self._pending[:self.max_batch]
+            return batch
+
+    def _run(self):
+        while True:
+            # Wait for a free flush slot first so rows keep accumulating meanwhile
+            self._in_flight.acquire()
+            batch = self._take_batch()
+            if not batch:
+                self._in_flight.release()
+                return
+            self._executor.submit(self._flush, batch)
+
+    def _flush(self, batch: List[tuple]):
+        with self._stats_lock:
+            self._busy += 1
+        try:
+            self._write(batch)
+        finally:
+            with self._stats_lock:
+                self._busy -= 1
+            self._in_flight.release()
+
+    def _write(self, batch: List[tuple]):
+        rows = [row for row, _ in batch]
+        try:
+            result = self.supabase.table(self.table_name).insert(rows).execute()
+        except Exception as e:
+            logger.warning(f"Batched insert into {self.table_name} failed ({len(rows)} rows), retrying individually: {e}")
+            self._flush_individually(batch)
+            return
+
+        with self._stats_lock:
+            self.stats['rows'] += len(rows)
+            self.stats['batches'] += 1
+
+        stored = {r.get(self.key_field): r for r in (result.data or [])}
+        for row, future in batch:
+            future.set_result(stored.get(row.get(self.key_field)))
+
+    def _flush_individually(self, batch: List[tuple]):
+        """Insert rows one by one so a single bad row only fails its own caller"""
+        for row, future in batch:
+            try:
+                result = self.supabase.table(self.table_name).insert(row).execute()
+                with self._stats_lock:
+                    self.stats['fallback_rows'] += 1
+                future.set_result(result.data[0] if result.data else None)
+            except Exception as e:
+                future.set_exception(e)